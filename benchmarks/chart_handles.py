@@ -0,0 +1,103 @@
+"""Per-bar plotting cost with chart names formatted per call vs precomputed per-symbol handles.
+
+Initializes ``v2 Multi Symbol.py`` with every chart enabled and decimation
+off, then replays the per-bar plot calls of the default indicator set (price,
+MA, MACD, K/D, MFI and volume lines) for ``--bars`` bars: once building the
+chart names with f-strings as the strategy used to, once through the
+``SymbolCharts`` handles it now builds in ``Initialize``. With
+``--decimation`` the handle run goes through the series decimators, which
+plot each bucket as it closes.
+
+    python benchmarks/chart_handles.py --symbols 8 100 1000 --bars 200
+    python benchmarks/chart_handles.py --decimation LTTB --bars 2000
+"""
+import argparse
+import os
+import sys
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from local_engine.loader import load_strategy
+
+STRATEGY = os.path.join(ROOT, "v2 Multi Symbol.py")
+OVERRIDES = {
+    "ENABLE_MA_CHART": True,
+    "ENABLE_STOCH_CHART": True,
+    "ENABLE_LBR_CHART": True,
+    "ENABLE_MFI_CHART": True,
+    "ENABLE_VOL_CHART": True,
+    "ENABLE_TRADE_CHART": True,
+    "CHART_DECIMATION": "NONE",
+}
+
+
+def make_algorithm(n_symbols, decimation="NONE"):
+    tickers = [f"SYM{i:04d}" for i in range(n_symbols)]
+    algorithm = load_strategy(STRATEGY, dict(OVERRIDES, SYMBOLS=tickers, CHART_DECIMATION=decimation))()
+    algorithm.Initialize()
+    algorithm._time = datetime(2024, 1, 2)
+    for symbol in algorithm.symbols:
+        algorithm.charts_for(symbol)
+    return algorithm
+
+
+def formatted(algorithm, bars):
+    plot = algorithm.plot
+    symbols = algorithm.symbols
+    started = time.perf_counter()
+    for i in range(bars):
+        value = float(i)
+        for symbol in symbols:
+            plot(f"{symbol.Value}_TradeSignals", "Price", value)
+            plot(f"{symbol.Value}_MA", "9 Period Value", value)
+            plot(f"{symbol.Value}_MA", "20 Period Value", value)
+            plot(f"{symbol.Value}_STOCHRSI", "K Value", value)
+            plot(f"{symbol.Value}_STOCHRSI", "D Value", value)
+            plot(f"{symbol.Value}_LBROSC", "MACD Value", value)
+            plot(f"{symbol.Value}_LBROSC", "MACD Signal Value", value)
+            plot(f"{symbol.Value}_MFI", "MFI Value", value)
+            plot(f"{symbol.Value}_VOLUME", "Volume", value)
+            plot(f"{symbol.Value}_VOLUME", "SMA Volume * Multiplier", value)
+            plot(f"{symbol.Value}_MA", f"{'BUY'.capitalize()} Signal", value)
+    return time.perf_counter() - started
+
+
+def with_handles(algorithm, bars):
+    plot, plot_line = algorithm.plot, algorithm.plot_line
+    handles = [algorithm.chart_handles[symbol] for symbol in algorithm.symbols]
+    signal_series = sys.modules[type(algorithm).__module__].SIGNAL_SERIES
+    started = time.perf_counter()
+    for i in range(bars):
+        value = float(i)
+        for h in handles:
+            plot_line(h.price, value)
+            plot_line(h.ma_fast, value)
+            plot_line(h.ma_slow, value)
+            plot_line(h.stoch_k, value)
+            plot_line(h.stoch_d, value)
+            plot_line(h.macd, value)
+            plot_line(h.macd_signal, value)
+            plot_line(h.mfi_value, value)
+            plot_line(h.volume_bar, value)
+            plot_line(h.volume_threshold, value)
+            plot(h.ma, signal_series["BUY"], value)
+    return time.perf_counter() - started
+
+
+def main(args):
+    print(f"{'symbols':>8} {'formatted us/bar':>17} {'handles us/bar':>15} {'saving':>7}")
+    for n_symbols in args.symbols:
+        base = formatted(make_algorithm(n_symbols), args.bars) / args.bars * 1e6
+        fast = with_handles(make_algorithm(n_symbols, args.decimation), args.bars) / args.bars * 1e6
+        print(f"{n_symbols:8d} {base:17.1f} {fast:15.1f} {1.0 - fast / base:7.1%}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, nargs="+", default=[8, 100, 1000])
+    parser.add_argument("--bars", type=int, default=200)
+    parser.add_argument("--decimation", default="NONE", choices=("NONE", "LTTB", "MIN_MAX"))
+    main(parser.parse_args())
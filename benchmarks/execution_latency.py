@@ -0,0 +1,68 @@
+"""Signal-loop latency with inline order placement vs the queued execution worker.
+
+Runs ``v2 Multi Symbol.py`` under the live runner against a fake broker whose
+acknowledgements take each of ``--ack-latencies`` seconds, once with orders
+placed inline (LEAN-style blocking calls) and once through the execution
+worker, and prints per-bar signal-step and bar-processed latency.
+
+    python benchmarks/execution_latency.py --symbols 200 --ack-latencies 0 0.01 0.05 0.2
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from local_engine.data import MemoryBarStore, synthetic_series
+from local_engine.feed import ReplayServer
+from local_engine.live import LiveRunner, percentile
+
+STRATEGY = os.path.join(ROOT, "v2 Multi Symbol.py")
+OVERRIDES = {
+    "MA_FAST_PERIOD": 3,
+    "MA_SLOW_PERIOD": 10,
+    "MACD_FAST": 3,
+    "MACD_SLOW": 10,
+    "MACD_SIGNAL": 5,
+    "REQUIRED_ENTRY_SIGNALS": 1,
+    "REQUIRED_EXIT_SIGNALS": 1,
+    "ENABLE_CHARTING": False,
+}
+
+
+def ms(samples, q):
+    value = percentile(samples, q)
+    return float("nan") if value is None else value * 1000.0
+
+
+async def run_once(store, tickers, args, mode, ack_latency):
+    async with ReplayServer(store, tickers, interval=args.interval) as server:
+        runner = LiveRunner(STRATEGY, server.host, server.port, dict(OVERRIDES, SYMBOLS=tickers),
+                            ack_latency=ack_latency, execution=mode, warm_up_frames=args.warm_up)
+        return await runner.run()
+
+
+async def main(args):
+    tickers = [f"SYM{i:04d}" for i in range(args.symbols)]
+    store = MemoryBarStore(synthetic_series(ticker, args.warm_up + args.bars, start="2024-01-02", step=1,
+                                            seed=i, volatility=0.01) for i, ticker in enumerate(tickers))
+    print(f"{args.symbols} symbols, {args.bars} bars each, {args.interval:g}s between bars")
+    print(f"{'ack ms':>7} {'mode':>7} {'orders':>7} {'step p50':>9} {'step p99':>9} {'bar p50':>9} {'bar p99':>9}")
+    for ack_latency in args.ack_latencies:
+        for mode in ("inline", "worker"):
+            report = await run_once(store, tickers, args, mode, ack_latency)
+            print(f"{ack_latency * 1000:7.0f} {mode:>7} {report.orders:7d} "
+                  f"{ms(report.step_latency, 50):9.3f} {ms(report.step_latency, 99):9.3f} "
+                  f"{ms(report.bar_latency, 50):9.3f} {ms(report.bar_latency, 99):9.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=200)
+    parser.add_argument("--bars", type=int, default=20)
+    parser.add_argument("--warm-up", type=int, default=12)
+    parser.add_argument("--interval", type=float, default=0.25)
+    parser.add_argument("--ack-latencies", type=float, nargs="+", default=[0.0, 0.01, 0.05, 0.2])
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,59 @@
+"""Bar-to-order latency of the asyncio live runner under a simulated symbol load.
+
+Replays synthetic 1-second bars for ``--symbols`` tickers through the local
+replay server and runs ``v2 Multi Symbol.py`` against them with a broker that
+takes ``--ack-latency`` seconds to acknowledge each order. Short indicator
+periods keep the strategy trading so the order path is exercised.
+
+    python benchmarks/live_latency.py --symbols 1000 --seconds 30 --ack-latency 0.05 --instrument
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from local_engine.data import MemoryBarStore, synthetic_series
+from local_engine.feed import ReplayServer
+from local_engine.live import LiveRunner
+
+STRATEGY = os.path.join(ROOT, "v2 Multi Symbol.py")
+OVERRIDES = {
+    "MA_FAST_PERIOD": 3,
+    "MA_SLOW_PERIOD": 10,
+    "MACD_FAST": 3,
+    "MACD_SLOW": 10,
+    "MACD_SIGNAL": 5,
+    "REQUIRED_ENTRY_SIGNALS": 1,
+    "REQUIRED_EXIT_SIGNALS": 1,
+    "ENABLE_CHARTING": False,
+}
+
+
+async def main(args):
+    tickers = [f"SYM{i:04d}" for i in range(args.symbols)]
+    store = MemoryBarStore(synthetic_series(ticker, args.warm_up + args.seconds, start="2024-01-02", step=1,
+                                            seed=i, volatility=0.01) for i, ticker in enumerate(tickers))
+    async with ReplayServer(store, tickers, interval=args.interval) as server:
+        runner = LiveRunner(STRATEGY, server.host, server.port, dict(OVERRIDES, SYMBOLS=tickers),
+                            ack_latency=args.ack_latency, workers=args.workers, warm_up_frames=args.warm_up,
+                            instrument=args.instrument)
+        report = await runner.run()
+    print(f"{args.symbols} symbols, {args.interval:g}s bars, ack latency {args.ack_latency * 1000:g} ms, {args.workers} workers")
+    print(report.summary())
+    if runner.instrumentation is not None:
+        print(runner.instrumentation.format_summary())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--symbols", type=int, default=1000)
+    parser.add_argument("--seconds", type=int, default=30)
+    parser.add_argument("--warm-up", type=int, default=10)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--ack-latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, default=256)
+    parser.add_argument("--instrument", action="store_true", help="print per-stage latency histograms")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,65 @@
+"""Throughput of a parameter sweep: one engine run per config vs one shared ``MultiEngine`` pass.
+
+Sweeps ``--configs`` variants of ``v2 Multi Symbol.py`` (trailing stop, fast
+MA period and entry threshold; the slow MA and the other indicators are the
+same in all of them) over synthetic daily bars. The baseline loads the
+strategy and replays the bars once per config, like a one-process-per-config
+sweep without the interpreter start-up. The shared pass is run with and
+without indicator sharing.
+
+    python benchmarks/multi_config.py --configs 10 50 200 --symbols 20 --bars 1500
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from local_engine.data import MemoryBarStore, synthetic_series
+from local_engine.engine import run_backtest
+from local_engine.loader import load_strategy, strategy_config
+from local_engine.multi import MultiEngine
+
+STRATEGY = os.path.join(ROOT, "v2 Multi Symbol.py")
+OVERRIDES = {"ENABLE_CHARTING": False, "ENABLE_STOCH": True, "ENABLE_MFI": True, "ENABLE_VOL": True,
+             "START_DATE": "2015-06-01", "END_DATE": "2030-01-01"}
+
+
+def sweep(base, n_configs):
+    grid = itertools.product((0.05, 0.08, 0.1, 0.12, 0.15), (10, 20, 30, 50, 70, 90, 120, 150), (1, 2, 3, 4, 5))
+    return [base.replace(trailing_stop_percent=stop, ma_fast_period=fast, required_entry_signals=entry)
+            for stop, fast, entry in itertools.islice(grid, n_configs)]
+
+
+def main(args):
+    tickers = [f"SYM{i:04d}" for i in range(args.symbols)]
+    store = MemoryBarStore([synthetic_series(ticker, args.bars, seed=i) for i, ticker in enumerate(tickers)])
+    overrides = dict(OVERRIDES, SYMBOLS=tickers)
+    strategy = load_strategy(STRATEGY, overrides)
+    print(f"{'configs':>8} {'per-config s':>13} {'shared s':>9} {'shared+pool s':>14} {'speed-up':>9} {'indicators':>11}")
+    for n_configs in args.configs:
+        configs = sweep(strategy_config(strategy), n_configs)
+        started = time.perf_counter()
+        solo = [run_backtest(STRATEGY, store, overrides=overrides, config=config).final_equity for config in configs]
+        per_config = time.perf_counter() - started
+        started = time.perf_counter()
+        MultiEngine(strategy, store, configs, share_indicators=False).run()
+        shared = time.perf_counter() - started
+        started = time.perf_counter()
+        engine = MultiEngine(strategy, store, configs)
+        pooled = [result.final_equity for result in engine.run()]
+        shared_pool = time.perf_counter() - started
+        assert pooled == solo
+        print(f"{n_configs:8d} {per_config:13.2f} {shared:9.2f} {shared_pool:14.2f} {per_config / shared_pool:8.2f}x "
+              f"{len(engine.pool):5d}/{engine.pool.requested}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--configs", type=int, nargs="+", default=[10, 50, 200])
+    parser.add_argument("--symbols", type=int, default=20)
+    parser.add_argument("--bars", type=int, default=1500)
+    main(parser.parse_args())
@@ -0,0 +1,121 @@
+"""Order throughput of the paper brokerage, and of the execution pipeline on top of it.
+
+``orders`` fires ``--orders`` asynchronous market orders at random symbols of a
+bare algorithm and reports how fast they are accepted and how fast their
+(partial, slipped) fills come back. ``intents`` loads ``v2 Multi Symbol.py``
+and pushes random buy/sell order intents through the execution worker into
+the same broker, so the full liquidate / set_holdings / trailing stop path is
+loaded.
+
+    python benchmarks/paper_broker_throughput.py --orders 200000 --latency 0.001 --fill-parts 3
+"""
+import argparse
+import os
+import random
+import sys
+import threading
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from local_engine.algorithm_imports import QCAlgorithm
+from local_engine.brokerage import PaperBrokerage
+from local_engine.execution import ExecutionWorker
+from local_engine.loader import load_strategy
+
+STRATEGY = os.path.join(ROOT, "v2 Multi Symbol.py")
+
+
+def make_brokerage(args, lock=None):
+    return PaperBrokerage(latency=args.latency, jitter=args.jitter, fill_parts=args.fill_parts,
+                          part_interval=args.part_interval, slippage_bps=args.slippage_bps,
+                          slippage_noise_bps=args.slippage_noise_bps, fee_per_share=0.005, lock=lock)
+
+
+def wait_until(predicate, timeout=60.0):
+    deadline = time.perf_counter() + timeout
+    while not predicate() and time.perf_counter() < deadline:
+        time.sleep(0.001)
+
+
+def bench_orders(args, tickers):
+    algorithm = QCAlgorithm()
+    algorithm.set_cash(1e12)
+    algorithm._time = datetime(2024, 1, 2)
+    lock = threading.Lock()
+    brokerage = make_brokerage(args, lock)
+    algorithm._attach_brokerage(brokerage)
+    symbols = [algorithm.add_equity(ticker).symbol for ticker in tickers]
+    for symbol in symbols:
+        algorithm.securities[symbol].price = 100.0
+    choice = random.Random(1).choice
+    started = time.perf_counter()
+    for i in range(args.orders):
+        with lock:
+            algorithm.market_order(choice(symbols), 100 if i % 2 else -100, asynchronous=True)
+    submitted = time.perf_counter()
+    expected = args.orders * min(args.fill_parts, 100)
+    wait_until(lambda: brokerage.fills >= expected)
+    filled = time.perf_counter()
+    brokerage.close()
+    print(f"orders:  {args.orders} submitted in {submitted - started:.2f}s ({args.orders / (submitted - started):,.0f}/s), "
+          f"{brokerage.fills} fills done after {filled - started:.2f}s ({brokerage.fills / (filled - started):,.0f} fills/s)")
+
+
+def bench_intents(args, tickers):
+    module_overrides = {"SYMBOLS": tickers, "ENABLE_CHARTING": False}
+    strategy_class = load_strategy(STRATEGY, module_overrides)
+    module = sys.modules[strategy_class.__module__]
+    algorithm = strategy_class()
+    lock = threading.Lock()
+    brokerage = make_brokerage(args, lock)
+    algorithm._attach_brokerage(brokerage)
+    worker = ExecutionWorker(algorithm, capacity=args.capacity, threads=args.threads, lock=lock)
+    algorithm.execution = worker
+    algorithm.Initialize()
+    algorithm.set_cash(1e12)
+    algorithm._time = datetime(2024, 1, 2)
+    symbols = list(algorithm.securities)
+    for symbol in symbols:
+        algorithm.securities[symbol].price = 100.0
+    rng = random.Random(2)
+    started = time.perf_counter()
+    for _ in range(args.intents):
+        with lock:
+            worker.submit(module.OrderIntent(rng.choice(symbols), rng.choice((1, -1)), 2, ["MA", "LBR"]))
+    submitted = time.perf_counter()
+    worker.close()
+    brokerage.close()
+    finished = time.perf_counter()
+    print(f"intents: {args.intents} submitted in {submitted - started:.2f}s ({args.intents / (submitted - started):,.0f}/s), "
+          f"{worker.executed} executed ({worker.coalesced} coalesced), {brokerage.orders_submitted} orders, "
+          f"{brokerage.fills} fills in {finished - started:.2f}s ({brokerage.orders_submitted / (finished - started):,.0f} orders/s)")
+
+
+def main(args):
+    tickers = [f"SYM{i:04d}" for i in range(args.symbols)]
+    print(f"{args.symbols} symbols, latency {args.latency * 1000:g} ms (+{args.jitter * 1000:g} ms jitter), "
+          f"{args.fill_parts} fill parts, {args.slippage_bps:g} bps slippage")
+    if args.mode in ("orders", "all"):
+        bench_orders(args, tickers)
+    if args.mode in ("intents", "all"):
+        bench_intents(args, tickers)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("mode", nargs="?", choices=("orders", "intents", "all"), default="all")
+    parser.add_argument("--symbols", type=int, default=1000)
+    parser.add_argument("--orders", type=int, default=200000)
+    parser.add_argument("--intents", type=int, default=50000)
+    parser.add_argument("--latency", type=float, default=0.001)
+    parser.add_argument("--jitter", type=float, default=0.001)
+    parser.add_argument("--fill-parts", type=int, default=3)
+    parser.add_argument("--part-interval", type=float, default=0.0005)
+    parser.add_argument("--slippage-bps", type=float, default=1.0)
+    parser.add_argument("--slippage-noise-bps", type=float, default=0.5)
+    parser.add_argument("--capacity", type=int, default=1024)
+    parser.add_argument("--threads", type=int, default=64)
+    main(parser.parse_args())
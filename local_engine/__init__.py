@@ -0,0 +1,6 @@
+"""Local runtime for the strategy files in this repo.
+
+Runs the QuantConnect strategy sources outside LEAN: ``algorithm_imports``
+stands in for LEAN's API, ``engine`` replays a bar store as a backtest and
+``live`` drives the same code from a socket feed under asyncio.
+"""
@@ -0,0 +1,1243 @@
+"""Local stand-in for LEAN's ``AlgorithmImports`` namespace.
+
+Implements the subset of the QuantConnect API the strategy files in this repo
+use (equity subscriptions, ``history[TradeBar]``, the SMA/SRSI/MACD/MFI indicators, RollingWindow,
+charts, portfolio state and the market / trailing stop order calls), so the
+same strategy source runs unchanged on QuantConnect and on the local engine.
+Indicator maths follows LEAN's implementations; order fills are delegated to a
+brokerage object attached by the engine (see ``local_engine.brokerage``).
+"""
+import math
+import os
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+
+
+class Resolution:
+    TICK = "TICK"
+    SECOND = "SECOND"
+    MINUTE = "MINUTE"
+    HOUR = "HOUR"
+    DAILY = "DAILY"
+    Tick = TICK
+    Second = SECOND
+    Minute = MINUTE
+    Hour = HOUR
+    Daily = DAILY
+
+
+class BrokerageName:
+    QUANT_CONNECT_BROKERAGE = "QuantConnectBrokerage"
+    QuantConnectBrokerage = QUANT_CONNECT_BROKERAGE
+
+
+class MovingAverageType:
+    SIMPLE = "SIMPLE"
+    EXPONENTIAL = "EXPONENTIAL"
+    WILDERS = "WILDERS"
+    Simple = SIMPLE
+    Exponential = EXPONENTIAL
+    Wilders = WILDERS
+
+
+class Field:
+    @staticmethod
+    def OPEN(bar):
+        return bar.Open
+
+    @staticmethod
+    def HIGH(bar):
+        return bar.High
+
+    @staticmethod
+    def LOW(bar):
+        return bar.Low
+
+    @staticmethod
+    def CLOSE(bar):
+        return bar.Close
+
+    @staticmethod
+    def VOLUME(bar):
+        return bar.Volume
+
+    Open = OPEN
+    High = HIGH
+    Low = LOW
+    Close = CLOSE
+    Volume = VOLUME
+
+
+# Bar-store column a selector reads, for bulk indicator warm-up.
+_FIELD_COLUMNS = {Field.OPEN: "open", Field.HIGH: "high", Field.LOW: "low", Field.CLOSE: "close", Field.VOLUME: "volume"}
+
+
+class OrderStatus:
+    NEW = "NEW"
+    SUBMITTED = "SUBMITTED"
+    PARTIALLY_FILLED = "PARTIALLY_FILLED"
+    FILLED = "FILLED"
+    CANCELED = "CANCELED"
+    INVALID = "INVALID"
+    New = NEW
+    Submitted = SUBMITTED
+    PartiallyFilled = PARTIALLY_FILLED
+    Filled = FILLED
+    Canceled = CANCELED
+    Invalid = INVALID
+
+
+class OrderDirection:
+    BUY = "BUY"
+    SELL = "SELL"
+    HOLD = "HOLD"
+    Buy = BUY
+    Sell = SELL
+    Hold = HOLD
+
+
+class OrderType:
+    MARKET = "MARKET"
+    TRAILING_STOP = "TRAILING_STOP"
+    Market = MARKET
+    TrailingStop = TRAILING_STOP
+
+
+class SeriesType:
+    LINE = "LINE"
+    SCATTER = "SCATTER"
+    BAR = "BAR"
+    Line = LINE
+    Scatter = SCATTER
+    Bar = BAR
+
+
+class ScatterMarkerSymbol:
+    NONE = "NONE"
+    CIRCLE = "CIRCLE"
+    TRIANGLE = "TRIANGLE"
+    TRIANGLE_DOWN = "TRIANGLE_DOWN"
+    Circle = CIRCLE
+    Triangle = TRIANGLE
+    TriangleDown = TRIANGLE_DOWN
+
+
+class Color:
+    WHITE = "WHITE"
+    GREEN = "GREEN"
+    RED = "RED"
+    BLUE = "BLUE"
+    ORANGE = "ORANGE"
+    PURPLE = "PURPLE"
+    White = WHITE
+    Green = GREEN
+    Red = RED
+    Blue = BLUE
+    Orange = ORANGE
+    Purple = PURPLE
+
+
+class Symbol(str):
+    """Ticker symbol; a ``str`` subclass so dictionary lookups stay on the fast path."""
+    __slots__ = ()
+
+    @property
+    def Value(self):
+        return str.__str__(self)
+
+    value = Value
+
+
+class TradeBar:
+    __slots__ = ("Symbol", "Time", "EndTime", "Open", "High", "Low", "Close", "Volume")
+
+    def __init__(self, symbol, end_time, open_, high, low, close, volume, period=None):
+        self.Symbol = symbol
+        self.EndTime = end_time
+        self.Time = end_time - period if period is not None else end_time
+        self.Open = open_
+        self.High = high
+        self.Low = low
+        self.Close = close
+        self.Volume = volume
+
+    @property
+    def Price(self):
+        return self.Close
+
+
+class Slice:
+    __slots__ = ("Time", "Bars")
+
+    def __init__(self, time, bars):
+        self.Time = time
+        self.Bars = bars
+
+    def __contains__(self, symbol):
+        return symbol in self.Bars
+
+    def __getitem__(self, symbol):
+        return self.Bars[symbol]
+
+    def contains_key(self, symbol):
+        return symbol in self.Bars
+
+    ContainsKey = contains_key
+    bars = property(lambda self: self.Bars)
+    time = property(lambda self: self.Time)
+
+
+class RollingWindow:
+    """Fixed-size window indexed newest-first, like LEAN's ``RollingWindow<T>``."""
+    __slots__ = ("_items", "_size", "_count", "_tail", "_default")
+
+    def __class_getitem__(cls, item):
+        default = item() if item in (float, int, bool) else None
+        return lambda size: cls(size, default)
+
+    def __init__(self, size, default=None):
+        self._items = [default] * size
+        self._size = size
+        self._count = 0
+        self._tail = 0
+        self._default = default
+
+    def add(self, item):
+        self._items[self._tail] = item
+        self._tail = (self._tail + 1) % self._size
+        if self._count < self._size:
+            self._count += 1
+
+    Add = add
+
+    def __getitem__(self, i):
+        if i < 0 or i >= self._size:
+            raise IndexError(f"Index {i} is out of range for a RollingWindow of size {self._size}")
+        if i >= self._count:
+            return self._default
+        return self._items[(self._tail - 1 - i) % self._size]
+
+    def __iter__(self):
+        for i in range(self._count):
+            yield self._items[(self._tail - 1 - i) % self._size]
+
+    def __len__(self):
+        return self._count
+
+    def reset(self):
+        self._items = [self._default] * self._size
+        self._count = 0
+        self._tail = 0
+
+    Reset = reset
+    count = property(lambda self: self._count)
+    Count = count
+    size = property(lambda self: self._size)
+    Size = size
+    is_ready = property(lambda self: self._count == self._size)
+    IsReady = is_ready
+
+
+class IndicatorDataPoint:
+    __slots__ = ("Time", "Value")
+
+    def __init__(self, time=None, value=0.0):
+        self.Time = time
+        self.Value = value
+
+    time = property(lambda self: self.Time)
+    value = property(lambda self: self.Value)
+
+    def __float__(self):
+        return float(self.Value)
+
+
+class IndicatorBase:
+    """Scalar-input indicator with LEAN's ``Current`` / ``IsReady`` / ``Samples`` surface."""
+    warm_up_period = 1
+
+    def __init__(self, name):
+        self.Name = name
+        self.Current = IndicatorDataPoint()
+        self.Samples = 0
+
+    @property
+    def IsReady(self):
+        return self.Samples >= self.warm_up_period
+
+    is_ready = IsReady
+    current = property(lambda self: self.Current)
+    samples = property(lambda self: self.Samples)
+
+    def update(self, time, value):
+        self.Samples += 1
+        self.Current.Time = time
+        self.Current.Value = self.compute_next_value(value)
+        return self.IsReady
+
+    Update = update
+
+    def compute_next_value(self, value):
+        raise NotImplementedError
+
+    def seed(self, values, time):
+        """Bring a fresh indicator to its state after ``update``-ing each of ``values``.
+
+        Returns the indicator value after every input. Subclasses compute the
+        state in bulk with NumPy instead of one ``update`` per value.
+        """
+        if self.Samples:
+            raise ValueError(f"{self.Name} has already been updated and cannot be seeded")
+        values = np.asarray(values, dtype=np.float64)
+        if not len(values):
+            return values
+        series = self._seed(values, time)
+        self.Samples = len(values)
+        self.Current.Time = time
+        self.Current.Value = float(series[-1])
+        return series
+
+    def _seed(self, values, time):
+        series = np.empty(len(values))
+        for i, value in enumerate(values.tolist()):
+            self.update(time, value)
+            series[i] = self.Current.Value
+        return series
+
+    def __float__(self):
+        return float(self.Current.Value)
+
+
+class Sum(IndicatorBase):
+    def __init__(self, period, name=None):
+        super().__init__(name or f"SUM({period})")
+        self.period = period
+        self.warm_up_period = period
+        self._ring = [0.0] * period
+        self._index = 0
+        self._sum = 0.0
+
+    def compute_next_value(self, value):
+        self._sum += value - self._ring[self._index]
+        self._ring[self._index] = value
+        self._index = (self._index + 1) % self.period
+        return self._sum
+
+    def _seed(self, values, time):
+        tail = values[-self.period:]
+        self._ring = tail.tolist() + [0.0] * (self.period - len(tail))
+        self._index = len(tail) % self.period
+        self._sum = float(tail.sum())
+        series = _window_sums(values, self.period)
+        series[-1] = self._sum
+        return series
+
+
+class SimpleMovingAverage(Sum):
+    def __init__(self, period, name=None):
+        super().__init__(period, name or f"SMA({period})")
+
+    def compute_next_value(self, value):
+        total = Sum.compute_next_value(self, value)
+        return total / min(self.Samples, self.period)
+
+    def _seed(self, values, time):
+        sums = Sum._seed(self, values, time)
+        return sums / np.minimum(np.arange(1, len(values) + 1), self.period)
+
+
+class WilderMovingAverage(IndicatorBase):
+    def __init__(self, period, name=None):
+        super().__init__(name or f"WWMA({period})")
+        self.period = period
+        self.warm_up_period = period
+        self._sma = SimpleMovingAverage(period)
+
+    def compute_next_value(self, value):
+        if self.Samples <= self.period:
+            self._sma.update(self.Current.Time, value)
+            return self._sma.Current.Value
+        return (value + self.Current.Value * (self.period - 1)) / self.period
+
+    def _seed(self, values, time):
+        self._sma.seed(values[:self.period], time)
+        return _wilder_series(values, self.period)
+
+
+def _window_sums(values, period):
+    """Sum of the last ``period`` values (fewer at the start) after each value."""
+    totals = np.concatenate(([0.0], np.cumsum(values)))
+    ends = np.arange(1, len(values) + 1)
+    return totals[ends] - totals[np.maximum(ends - period, 0)]
+
+
+# Wilder smoothing is a linear recurrence; it is evaluated in blocks of this
+# many values with one matrix product each.
+_WILDER_BLOCK = 64
+
+
+def _wilder_series(values, period):
+    """``WilderMovingAverage`` value after each of ``values``."""
+    series = np.empty(len(values))
+    head = min(period, len(values))
+    series[:head] = np.cumsum(values[:head]) / np.arange(1, head + 1)
+    if len(values) <= period:
+        return series
+    decay = (period - 1) / period
+    lags = np.arange(_WILDER_BLOCK)
+    weights = np.tril(decay ** np.maximum(lags[:, None] - lags[None, :], 0)) / period
+    carry = decay ** (lags + 1)
+    previous = series[period - 1]
+    for start in range(period, len(values), _WILDER_BLOCK):
+        block = values[start:start + _WILDER_BLOCK]
+        n = len(block)
+        series[start:start + n] = carry[:n] * previous + weights[:n, :n] @ block
+        previous = series[start + n - 1]
+    return series
+
+
+def _moving_average(ma_type, period):
+    if ma_type == MovingAverageType.WILDERS:
+        return WilderMovingAverage(period)
+    if ma_type in (None, MovingAverageType.SIMPLE):
+        return SimpleMovingAverage(period)
+    raise NotImplementedError(f"Moving average type {ma_type} is not supported by the local engine")
+
+
+class RelativeStrengthIndex(IndicatorBase):
+    def __init__(self, period, ma_type=MovingAverageType.WILDERS, name=None):
+        super().__init__(name or f"RSI({period})")
+        self.period = period
+        self.warm_up_period = period + 1
+        self.AverageGain = _moving_average(ma_type, period)
+        self.AverageLoss = _moving_average(ma_type, period)
+        self._previous = None
+
+    def compute_next_value(self, value):
+        previous = self._previous
+        if previous is not None:
+            time = self.Current.Time
+            if value >= previous:
+                self.AverageGain.update(time, value - previous)
+                self.AverageLoss.update(time, 0.0)
+            else:
+                self.AverageGain.update(time, 0.0)
+                self.AverageLoss.update(time, previous - value)
+        self._previous = value
+        average_loss = self.AverageLoss.Current.Value
+        if average_loss == 0:
+            return 100.0
+        rs = self.AverageGain.Current.Value / average_loss
+        return 100.0 - 100.0 / (1.0 + rs)
+
+    def _seed(self, values, time):
+        self._previous = float(values[-1])
+        series = np.full(len(values), 100.0)
+        if len(values) < 2:
+            return series
+        changes = np.diff(values)
+        gains = self.AverageGain.seed(np.where(changes >= 0, changes, 0.0), time)
+        losses = self.AverageLoss.seed(np.where(changes >= 0, 0.0, -changes), time)
+        nonzero = losses != 0
+        series[1:][nonzero] = 100.0 - 100.0 / (1.0 + gains[nonzero] / losses[nonzero])
+        return series
+
+
+class StochasticRelativeStrengthIndex(IndicatorBase):
+    def __init__(self, rsi_period, stoch_period, k_smoothing, d_smoothing, ma_type=MovingAverageType.SIMPLE, name=None):
+        super().__init__(name or f"SRSI({rsi_period},{stoch_period},{k_smoothing},{d_smoothing})")
+        self.warm_up_period = rsi_period + stoch_period + max(k_smoothing, d_smoothing)
+        self._rsi = RelativeStrengthIndex(rsi_period)
+        self._recent_rsi = RollingWindow(stoch_period, 0.0)
+        self.K = _moving_average(ma_type, k_smoothing)
+        self.D = _moving_average(ma_type, d_smoothing)
+        self.k = self.K
+        self.d = self.D
+
+    def compute_next_value(self, value):
+        time = self.Current.Time
+        self._rsi.update(time, value)
+        rsi = self._rsi.Current.Value
+        self._recent_rsi.add(rsi)
+        if not self._rsi.IsReady:
+            return 0.0
+        highest = max(self._recent_rsi)
+        lowest = min(self._recent_rsi)
+        k = 100.0 if highest == lowest else 100.0 * (rsi - lowest) / (highest - lowest)
+        self.K.update(time, k)
+        self.D.update(time, self.K.Current.Value)
+        return self.K.Current.Value
+
+    def _seed(self, values, time):
+        rsi = self._rsi.seed(values, time)
+        window = self._recent_rsi
+        for value in rsi[-window.size:].tolist():
+            window.add(value)
+        series = np.zeros(len(values))
+        ready = self._rsi.warm_up_period - 1
+        if len(values) <= ready:
+            return series
+        padded = np.concatenate((np.full(window.size - 1, np.nan), rsi))
+        windows = np.lib.stride_tricks.sliding_window_view(padded, window.size)[ready:]
+        highest, lowest = np.nanmax(windows, axis=1), np.nanmin(windows, axis=1)
+        span = highest - lowest
+        flat = span == 0
+        raw_k = np.full(len(span), 100.0)
+        raw_k[~flat] = 100.0 * (rsi[ready:][~flat] - lowest[~flat]) / span[~flat]
+        k = self.K.seed(raw_k, time)
+        self.D.seed(k, time)
+        series[ready:] = k
+        return series
+
+
+class MovingAverageConvergenceDivergence(IndicatorBase):
+    def __init__(self, fast_period, slow_period, signal_period, ma_type=MovingAverageType.EXPONENTIAL, name=None):
+        super().__init__(name or f"MACD({fast_period},{slow_period},{signal_period})")
+        self.warm_up_period = slow_period + signal_period - 1
+        self.Fast = _moving_average(ma_type, fast_period)
+        self.Slow = _moving_average(ma_type, slow_period)
+        self.Signal = _moving_average(ma_type, signal_period)
+        self.Histogram = IndicatorDataPoint()
+        self.fast = self.Fast
+        self.slow = self.Slow
+        self.signal = self.Signal
+        self.histogram = self.Histogram
+
+    def compute_next_value(self, value):
+        time = self.Current.Time
+        self.Fast.update(time, value)
+        self.Slow.update(time, value)
+        macd = self.Fast.Current.Value - self.Slow.Current.Value
+        if self.Fast.IsReady and self.Slow.IsReady:
+            self.Signal.update(time, macd)
+            self.Histogram.Time = time
+            self.Histogram.Value = macd - self.Signal.Current.Value
+        return macd
+
+    def _seed(self, values, time):
+        series = self.Fast.seed(values, time) - self.Slow.seed(values, time)
+        ready = max(self.Fast.warm_up_period, self.Slow.warm_up_period) - 1
+        if len(values) > ready:
+            self.Signal.seed(series[ready:], time)
+            self.Histogram.Time = time
+            self.Histogram.Value = float(series[-1]) - self.Signal.Current.Value
+        return series
+
+
+class MoneyFlowIndex(IndicatorBase):
+    """Bar-input indicator; the engine feeds it through ``update_bar``."""
+
+    def __init__(self, period, name=None):
+        super().__init__(name or f"MFI({period})")
+        self.period = period
+        self.warm_up_period = period
+        self.PositiveMoneyFlow = Sum(period)
+        self.NegativeMoneyFlow = Sum(period)
+        self.PreviousTypicalPrice = 0.0
+
+    def update_bar(self, bar):
+        self.Samples += 1
+        time = bar.EndTime
+        self.Current.Time = time
+        typical_price = (bar.High + bar.Low + bar.Close) / 3.0
+        money_flow = typical_price * bar.Volume
+        self.PositiveMoneyFlow.update(time, money_flow if typical_price > self.PreviousTypicalPrice else 0.0)
+        self.NegativeMoneyFlow.update(time, money_flow if typical_price < self.PreviousTypicalPrice else 0.0)
+        self.PreviousTypicalPrice = typical_price
+        positive = self.PositiveMoneyFlow.Current.Value
+        negative = self.NegativeMoneyFlow.Current.Value
+        self.Current.Value = 100.0 if negative == 0 else 100.0 - 100.0 / (1.0 + positive / negative)
+        return self.IsReady
+
+    def seed_bars(self, bars, time):
+        """``seed`` for a bar-input indicator; ``bars`` has ``high``/``low``/``close``/``volume`` arrays."""
+        if self.Samples:
+            raise ValueError(f"{self.Name} has already been updated and cannot be seeded")
+        if not len(bars.close):
+            return np.empty(0)
+        typical_price = (bars.high + bars.low + bars.close) / 3.0
+        previous = np.concatenate(([self.PreviousTypicalPrice], typical_price[:-1]))
+        money_flow = typical_price * bars.volume
+        positive = self.PositiveMoneyFlow.seed(np.where(typical_price > previous, money_flow, 0.0), time)
+        negative = self.NegativeMoneyFlow.seed(np.where(typical_price < previous, money_flow, 0.0), time)
+        self.PreviousTypicalPrice = float(typical_price[-1])
+        series = np.full(len(typical_price), 100.0)
+        nonzero = negative != 0
+        series[nonzero] = 100.0 - 100.0 / (1.0 + positive[nonzero] / negative[nonzero])
+        self.Samples = len(typical_price)
+        self.Current.Time = time
+        self.Current.Value = float(series[-1])
+        return series
+
+
+def indicator_update(indicator, selector=None):
+    """The per-bar callback that feeds ``indicator`` (bars for MFI, ``selector(bar)`` or the close otherwise)."""
+    if hasattr(indicator, "update_bar"):
+        return indicator.update_bar
+    select = selector or Field.CLOSE
+    def update(bar, _update=indicator.update, _select=select):
+        _update(bar.EndTime, _select(bar))
+    return update
+
+
+class Series:
+    def __init__(self, name, series_type=SeriesType.LINE, unit="$", color=None, marker=None):
+        self.name = name
+        self.series_type = series_type
+        self.unit = unit
+        self.color = color
+        self.marker = marker
+        self.values = []
+
+    Name = property(lambda self: self.name)
+
+    def add_point(self, time, value):
+        self.values.append((time, value))
+
+    AddPoint = add_point
+
+
+class Chart:
+    def __init__(self, name):
+        self.name = name
+        self.series = {}
+
+    Name = property(lambda self: self.name)
+
+    def add_series(self, series):
+        self.series[series.name] = series
+
+    AddSeries = add_series
+
+
+class SecurityHolding:
+    __slots__ = ("symbol", "quantity", "average_price", "_security")
+
+    def __init__(self, security):
+        self._security = security
+        self.symbol = security.Symbol
+        self.quantity = 0
+        self.average_price = 0.0
+
+    @property
+    def invested(self):
+        return self.quantity != 0
+
+    @property
+    def holdings_value(self):
+        return self.quantity * self._security.price
+
+    @property
+    def unrealized_profit(self):
+        return (self._security.price - self.average_price) * self.quantity
+
+    @property
+    def is_long(self):
+        return self.quantity > 0
+
+    @property
+    def is_short(self):
+        return self.quantity < 0
+
+    Quantity = property(lambda self: self.quantity)
+    Invested = invested
+    HoldingsValue = holdings_value
+    AveragePrice = property(lambda self: self.average_price)
+
+
+class Security:
+    __slots__ = ("Symbol", "resolution", "price", "holdings")
+
+    def __init__(self, symbol, resolution):
+        self.Symbol = symbol
+        self.resolution = resolution
+        self.price = 0.0
+        self.holdings = SecurityHolding(self)
+
+    symbol = property(lambda self: self.Symbol)
+    Price = property(lambda self: self.price)
+    Holdings = property(lambda self: self.holdings)
+
+
+class SecurityPortfolioManager(dict):
+    """Maps symbols to holdings and tracks cash.
+
+    Non-flat holdings are also indexed by subscription order, so portfolio
+    totals cost O(positions) rather than O(universe) while summing in the
+    same order as a full scan.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.cash = 0.0
+        self._ordinals = {}
+        self._invested = {}
+
+    def __setitem__(self, symbol, holding):
+        self._ordinals.setdefault(symbol, len(self._ordinals))
+        super().__setitem__(symbol, holding)
+
+    def __reduce__(self):
+        # Unpickling a dict subclass sets items before attributes; rebuild it in one go instead.
+        return _rebuild_portfolio, (dict(self), self.__dict__)
+
+    def _quantity_changed(self, symbol, holding):
+        if holding.quantity:
+            self._invested[self._ordinals[symbol]] = holding
+        else:
+            self._invested.pop(self._ordinals[symbol], None)
+
+    @property
+    def total_portfolio_value(self):
+        return self.cash + self.total_holdings_value
+
+    @property
+    def total_holdings_value(self):
+        invested = self._invested
+        return sum(invested[i].quantity * invested[i]._security.price for i in sorted(invested))
+
+    @property
+    def invested(self):
+        return bool(self._invested)
+
+    TotalPortfolioValue = total_portfolio_value
+    Cash = property(lambda self: self.cash)
+
+
+def _rebuild_portfolio(holdings, state):
+    portfolio = SecurityPortfolioManager()
+    portfolio.__dict__.update(state)
+    dict.update(portfolio, holdings)
+    return portfolio
+
+
+class Order:
+    __slots__ = ("id", "symbol", "quantity", "type", "status", "time", "tag",
+                 "trailing_amount", "trailing_as_percentage", "stop_price", "filled_quantity")
+
+    def __init__(self, order_id, symbol, quantity, order_type, time, tag=""):
+        self.id = order_id
+        self.symbol = symbol
+        self.quantity = quantity
+        self.type = order_type
+        self.status = OrderStatus.NEW
+        self.time = time
+        self.tag = tag
+        self.trailing_amount = 0.0
+        self.trailing_as_percentage = False
+        self.stop_price = None
+        self.filled_quantity = 0
+
+    @property
+    def direction(self):
+        return OrderDirection.BUY if self.quantity > 0 else OrderDirection.SELL
+
+    @property
+    def remaining_quantity(self):
+        return self.quantity - self.filled_quantity
+
+    @property
+    def is_open(self):
+        return self.status in (OrderStatus.NEW, OrderStatus.SUBMITTED, OrderStatus.PARTIALLY_FILLED)
+
+    Id = property(lambda self: self.id)
+    Symbol = property(lambda self: self.symbol)
+    Quantity = property(lambda self: self.quantity)
+    Type = property(lambda self: self.type)
+    Status = property(lambda self: self.status)
+    Direction = direction
+
+
+class OrderTicket:
+    __slots__ = ("_algorithm", "_order")
+
+    def __init__(self, algorithm, order):
+        self._algorithm = algorithm
+        self._order = order
+
+    OrderId = property(lambda self: self._order.id)
+    order_id = OrderId
+    Symbol = property(lambda self: self._order.symbol)
+    symbol = Symbol
+    Status = property(lambda self: self._order.status)
+    status = Status
+    QuantityFilled = property(lambda self: self._order.filled_quantity)
+    quantity_filled = QuantityFilled
+
+    def cancel(self, tag=""):
+        return self._algorithm._cancel_order(self._order, tag)
+
+    Cancel = cancel
+
+
+class OrderEvent:
+    __slots__ = ("OrderId", "Symbol", "Status", "Direction", "FillPrice", "FillQuantity", "UtcTime", "Message")
+
+    def __init__(self, order, status, fill_price=0.0, fill_quantity=0, time=None, message=""):
+        self.OrderId = order.id
+        self.Symbol = order.symbol
+        self.Status = status
+        self.Direction = order.direction
+        self.FillPrice = fill_price
+        self.FillQuantity = fill_quantity
+        self.UtcTime = time
+        self.Message = message
+
+    order_id = property(lambda self: self.OrderId)
+    symbol = property(lambda self: self.Symbol)
+    status = property(lambda self: self.Status)
+    direction = property(lambda self: self.Direction)
+    fill_price = property(lambda self: self.FillPrice)
+    fill_quantity = property(lambda self: self.FillQuantity)
+
+
+class SecurityTransactionManager:
+    def __init__(self, algorithm=None):
+        self._algorithm = algorithm
+        self._orders = {}
+        self._open = {}
+        self._next_id = 1
+
+    def __getstate__(self):
+        # Pickled for checkpoints: only open orders are carried over.
+        state = self.__dict__.copy()
+        state["_algorithm"] = None
+        state["_orders"] = {order_id: order for order_id, order in self._orders.items() if order.is_open}
+        state["_open"] = {symbol: dict(orders) for symbol, orders in self._open.items() if orders}
+        return state
+
+    def _new_order(self, symbol, quantity, order_type, time, tag=""):
+        order = Order(self._next_id, symbol, quantity, order_type, time, tag)
+        self._orders[order.id] = order
+        self._open.setdefault(symbol, {})[order.id] = order
+        self._next_id += 1
+        return order
+
+    def get_order_by_id(self, order_id):
+        return self._orders.get(order_id)
+
+    def get_order_ticket(self, order_id):
+        order = self._orders.get(order_id)
+        return None if order is None else OrderTicket(self._algorithm, order)
+
+    def get_open_orders(self, symbol=None):
+        # Orders are indexed per symbol while open and dropped lazily once
+        # they close, so a lookup does not scan the full order history.
+        if symbol is not None:
+            return self._open_orders(symbol)
+        return [order for sym in list(self._open) for order in self._open_orders(sym)]
+
+    def _open_orders(self, symbol):
+        orders = self._open.get(symbol)
+        if not orders:
+            return []
+        open_orders = [order for order in orders.values() if order.is_open]
+        if len(open_orders) != len(orders):
+            self._open[symbol] = {order.id: order for order in open_orders}
+        return open_orders
+
+    GetOrderById = get_order_by_id
+    GetOrderTicket = get_order_ticket
+    GetOpenOrders = get_open_orders
+
+
+class ObjectStore:
+    """Key/value byte store standing in for LEAN's ``ObjectStore``.
+
+    Kept in memory, or under ``root`` (one file per key, ``/`` in keys maps to
+    sub-directories) so objects outlive the run like they do on QuantConnect.
+    """
+
+    def __init__(self, root=None):
+        self.root = root
+        self._objects = {}
+
+    def _path(self, key):
+        return os.path.join(self.root, *key.split("/"))
+
+    def contains_key(self, key):
+        if self.root is None:
+            return key in self._objects
+        return os.path.isfile(self._path(key))
+
+    def save_bytes(self, key, data):
+        if self.root is None:
+            self._objects[key] = bytes(data)
+        else:
+            path = self._path(key)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Written next to the target and renamed, so readers never see a partial object.
+            temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temporary, "wb") as handle:
+                handle.write(data)
+            os.replace(temporary, path)
+        return True
+
+    def read_bytes(self, key):
+        if self.root is None:
+            return self._objects[key]
+        with open(self._path(key), "rb") as handle:
+            return handle.read()
+
+    def save(self, key, text):
+        return self.save_bytes(key, text.encode("utf-8"))
+
+    def read(self, key):
+        return self.read_bytes(key).decode("utf-8")
+
+    def delete(self, key):
+        if self.root is None:
+            return self._objects.pop(key, None) is not None
+        if not self.contains_key(key):
+            return False
+        os.remove(self._path(key))
+        return True
+
+    def keys(self):
+        if self.root is None:
+            return sorted(self._objects)
+        found = []
+        for directory, _, files in os.walk(self.root):
+            relative = os.path.relpath(directory, self.root)
+            for name in files:
+                found.append(name if relative == "." else "/".join(relative.split(os.sep) + [name]))
+        return sorted(found)
+
+    ContainsKey = contains_key
+    SaveBytes = save_bytes
+    ReadBytes = read_bytes
+    Save = save
+    Read = read
+    Delete = delete
+    Keys = property(keys)
+
+
+class _TradeBarHistory:
+    """``QCAlgorithm.history``: indexing with ``TradeBar`` gives the request function, as with LEAN's generic method."""
+    __slots__ = ("_algorithm",)
+
+    def __init__(self, algorithm):
+        self._algorithm = algorithm
+
+    def __getitem__(self, data_type):
+        if data_type is not TradeBar:
+            raise NotImplementedError("only history[TradeBar] is supported locally")
+        return self._trade_bars
+
+    def __call__(self, *args, **kwargs):
+        raise NotImplementedError("only history[TradeBar](symbol, periods, resolution) is supported locally")
+
+    def _trade_bars(self, symbol, periods, resolution=None):
+        algorithm = self._algorithm
+        if algorithm.history_provider is None:
+            raise RuntimeError("history needs a history provider; the engine attaches its bar store")
+        if algorithm._time is None:
+            end = int((algorithm.start_date - _EPOCH).total_seconds())
+        else:
+            end = int((algorithm._time - _EPOCH).total_seconds()) + 1
+        bars = algorithm.history_provider.lookback(str(symbol), periods, end)
+        return [TradeBar(symbol, _EPOCH + timedelta(seconds=time), open_, high, low, close, volume)
+                for time, open_, high, low, close, volume in zip(bars.time.tolist(), bars.open.tolist(),
+                                                                 bars.high.tolist(), bars.low.tolist(),
+                                                                 bars.close.tolist(), bars.volume.tolist())]
+
+
+class QCAlgorithm:
+    """Local implementation of the ``QCAlgorithm`` surface used by the strategy files.
+
+    The engine owns the clock: ``_step`` pushes each bar through ``_push_bar``
+    (prices, resting orders, indicators) and then calls ``OnData`` with the slice.
+    Orders are routed to ``self._brokerage``; fills come back through
+    ``_apply_fill`` which updates the portfolio and raises ``OnOrderEvent``.
+    """
+
+    def __init__(self):
+        self.start_date = None
+        self.end_date = None
+        self.resolution = Resolution.DAILY
+        self.brokerage_name = None
+        self.warm_up_bars = 0
+        self.securities = {}
+        self.portfolio = SecurityPortfolioManager()
+        self.transactions = SecurityTransactionManager(self)
+        self.charts = {}
+        self.plots = {}
+        self.debug_messages = []
+        self.fills = []
+        self.object_store = ObjectStore()
+        self.history_provider = None
+        self.indicator_pool = None
+        self.echo_debug = False
+        self._time = None
+        self._warming_up = False
+        self._brokerage = None
+        self._indicator_updates = {}
+
+    # Clock and settings
+
+    @property
+    def time(self):
+        return self._time
+
+    Time = time
+
+    @property
+    def utc_time(self):
+        return self._time
+
+    UtcTime = utc_time
+
+    @property
+    def is_warming_up(self):
+        return self._warming_up
+
+    IsWarmingUp = is_warming_up
+
+    def set_start_date(self, year, month=None, day=None):
+        self.start_date = year if isinstance(year, datetime) else datetime(year, month, day)
+
+    def set_end_date(self, year, month=None, day=None):
+        self.end_date = year if isinstance(year, datetime) else datetime(year, month, day)
+
+    def set_cash(self, cash):
+        self.portfolio.cash = float(cash)
+
+    def set_brokerage_model(self, brokerage_name, account_type=None):
+        self.brokerage_name = brokerage_name
+
+    def set_warm_up(self, period, resolution=None):
+        if isinstance(period, timedelta):
+            period = max(int(period / _RESOLUTION_SPAN[resolution or self.resolution]), 0)
+        self.warm_up_bars = int(period)
+
+    SetStartDate = set_start_date
+    SetEndDate = set_end_date
+    SetCash = set_cash
+    SetBrokerageModel = set_brokerage_model
+    SetWarmUp = set_warm_up
+
+    # Subscriptions and indicators
+
+    def add_equity(self, ticker, resolution=None):
+        symbol = Symbol(ticker)
+        security = self.securities.get(symbol)
+        if security is None:
+            security = Security(symbol, resolution or self.resolution)
+            self.securities[symbol] = security
+            self.portfolio[symbol] = security.holdings
+        return security
+
+    AddEquity = add_equity
+
+    def _register_indicator(self, symbol, indicator, selector=None):
+        self._indicator_updates.setdefault(symbol, []).append(indicator_update(indicator, selector))
+        return indicator
+
+    def _indicator(self, symbol, spec, make, selector=None):
+        """A new registered indicator from ``make()``, or the ``indicator_pool``'s shared one for ``spec``."""
+        if self.indicator_pool is not None:
+            return self.indicator_pool.indicator(symbol, spec, make, selector, owner=self)
+        return self._register_indicator(symbol, make(), selector)
+
+    def sma(self, symbol, period, resolution=None, selector=None):
+        return self._indicator(symbol, ("SMA", period), lambda: SimpleMovingAverage(period), selector)
+
+    def srsi(self, symbol, rsi_period, stoch_period, k_smoothing_period, d_smoothing_period, moving_average_type=MovingAverageType.SIMPLE, resolution=None, selector=None):
+        if not isinstance(moving_average_type, str):
+            moving_average_type, resolution = MovingAverageType.SIMPLE, moving_average_type
+        return self._indicator(symbol, ("SRSI", rsi_period, stoch_period, k_smoothing_period, d_smoothing_period, moving_average_type),
+                               lambda: StochasticRelativeStrengthIndex(rsi_period, stoch_period, k_smoothing_period, d_smoothing_period, moving_average_type),
+                               selector)
+
+    def macd(self, symbol, fast_period, slow_period, signal_period, moving_average_type=MovingAverageType.EXPONENTIAL, resolution=None, selector=None):
+        return self._indicator(symbol, ("MACD", fast_period, slow_period, signal_period, moving_average_type),
+                               lambda: MovingAverageConvergenceDivergence(fast_period, slow_period, signal_period, moving_average_type),
+                               selector)
+
+    def mfi(self, symbol, period, resolution=None):
+        return self._indicator(symbol, ("MFI", period), lambda: MoneyFlowIndex(period))
+
+    def warm_up_indicator(self, symbol, indicator, resolution=None, selector=None):
+        """Seed ``indicator`` from its ``warm_up_period`` bars before the start date.
+
+        The bars come from ``history_provider`` (the engine attaches its bar
+        store) as one array read, and the indicator state is computed in bulk
+        (``seed`` / ``seed_bars``) instead of bar by bar. Returns ``IsReady``.
+        """
+        if self.history_provider is None:
+            raise RuntimeError("warm_up_indicator needs a history provider; the engine attaches its bar store")
+        if self.indicator_pool is not None and not self.indicator_pool.claim_seed(indicator):
+            return indicator.IsReady
+        end = int((self.start_date - _EPOCH).total_seconds())
+        bars = self.history_provider.lookback(str(symbol), indicator.warm_up_period, end)
+        if len(bars):
+            time = _EPOCH + timedelta(seconds=int(bars.time[-1]))
+            if hasattr(indicator, "seed_bars"):
+                indicator.seed_bars(bars, time)
+            else:
+                column = _FIELD_COLUMNS.get(selector or Field.CLOSE)
+                if column is None:
+                    raise NotImplementedError("warm_up_indicator only supports Field selectors")
+                indicator.seed(getattr(bars, column), time)
+        return indicator.IsReady
+
+    @property
+    def history(self):
+        """``history[TradeBar](symbol, periods, resolution)``: the last ``periods`` bars before now, oldest first.
+
+        Before the first step "now" is the start date, as for ``warm_up_indicator``;
+        the bars come from ``history_provider``. Only the typed ``TradeBar`` form
+        is supported (no DataFrames).
+        """
+        return _TradeBarHistory(self)
+
+    SMA = sma
+    SRSI = srsi
+    MACD = macd
+    MFI = mfi
+    WarmUpIndicator = warm_up_indicator
+    History = history
+
+    # Charting and logging
+
+    def add_chart(self, chart):
+        self.charts[chart.name] = chart
+
+    def plot(self, chart, series, value):
+        points = self.plots.get((chart, series))
+        if points is None:
+            points = self.plots[(chart, series)] = []
+        points.append((self._time, value))
+
+    def debug(self, message):
+        self.debug_messages.append(message)
+        if self.echo_debug:
+            print(message)
+
+    log = debug
+    AddChart = add_chart
+    Plot = plot
+    Debug = debug
+    Log = log
+
+    # Orders
+
+    def market_order(self, symbol, quantity, asynchronous=False, tag=""):
+        order = self.transactions._new_order(symbol, int(quantity), OrderType.MARKET, self._time, tag)
+        ticket = self._submit_order(order)
+        if not asynchronous and order.is_open:
+            self._brokerage.wait_for_fill(self, order, MARKET_ORDER_FILL_TIMEOUT)
+        return ticket
+
+    def trailing_stop_order(self, symbol, quantity, trailing_amount, trailing_as_percentage, tag=""):
+        order = self.transactions._new_order(symbol, int(quantity), OrderType.TRAILING_STOP, self._time, tag)
+        order.trailing_amount = trailing_amount
+        order.trailing_as_percentage = trailing_as_percentage
+        return self._submit_order(order)
+
+    def calculate_order_quantity(self, symbol, target):
+        price = self.securities[symbol].price
+        if price <= 0:
+            return 0
+        target_quantity = math.trunc(target * self.portfolio.total_portfolio_value / price)
+        return target_quantity - self.portfolio[symbol].quantity
+
+    def set_holdings(self, symbol, percentage, liquidate_existing_holdings=False, tag=""):
+        quantity = self.calculate_order_quantity(symbol, percentage)
+        if quantity == 0:
+            return []
+        return [self.market_order(symbol, quantity, tag=tag)]
+
+    def liquidate(self, symbol=None, asynchronous=False, tag="Liquidated"):
+        symbols = [symbol] if symbol is not None else list(self.securities)
+        tickets = []
+        for sym in symbols:
+            for order in self.transactions.get_open_orders(sym):
+                self._cancel_order(order, tag)
+            quantity = self.portfolio[sym].quantity
+            if quantity != 0:
+                tickets.append(self.market_order(sym, -quantity, asynchronous, tag=tag))
+        return tickets
+
+    MarketOrder = market_order
+    TrailingStopOrder = trailing_stop_order
+    CalculateOrderQuantity = calculate_order_quantity
+    SetHoldings = set_holdings
+    Liquidate = liquidate
+
+    def _submit_order(self, order):
+        ticket = OrderTicket(self, order)
+        if order.quantity == 0 or self._brokerage is None:
+            order.status = OrderStatus.INVALID
+            return ticket
+        order.status = OrderStatus.SUBMITTED
+        self._brokerage.submit(self, order)
+        return ticket
+
+    def _cancel_order(self, order, tag=""):
+        if not order.is_open:
+            return False
+        self._brokerage.cancel(self, order)
+        return True
+
+    def _order_canceled(self, order, message=""):
+        order.status = OrderStatus.CANCELED
+        event = OrderEvent(order, OrderStatus.CANCELED, time=self._time, message=message)
+        on_order_event = getattr(self, "OnOrderEvent", None)
+        if on_order_event is not None:
+            on_order_event(event)
+
+    def _apply_fill(self, order, fill_quantity, fill_price, fee=0.0):
+        holding = self.portfolio[order.symbol]
+        quantity = holding.quantity
+        new_quantity = quantity + fill_quantity
+        if quantity == 0 or (new_quantity != 0 and (quantity > 0) != (new_quantity > 0)):
+            holding.average_price = fill_price
+        elif (quantity > 0) == (fill_quantity > 0):
+            holding.average_price = (holding.average_price * quantity + fill_price * fill_quantity) / new_quantity
+        holding.quantity = new_quantity
+        self.portfolio._quantity_changed(order.symbol, holding)
+        self.portfolio.cash -= fill_quantity * fill_price + fee
+
+        order.filled_quantity += fill_quantity
+        order.status = OrderStatus.FILLED if order.filled_quantity == order.quantity else OrderStatus.PARTIALLY_FILLED
+        self.fills.append((self._time, order.symbol, order.id, order.type, fill_quantity, fill_price, fee))
+        event = OrderEvent(order, order.status, fill_price, fill_quantity, self._time)
+        on_order_event = getattr(self, "OnOrderEvent", None)
+        if on_order_event is not None:
+            on_order_event(event)
+
+    # Engine hooks
+
+    def _attach_brokerage(self, brokerage):
+        self._brokerage = brokerage
+
+    def _push_bar(self, bar):
+        self.securities[bar.Symbol].price = bar.Close
+        if self._brokerage is not None:
+            self._brokerage.on_bar(self, bar)
+        for update in self._indicator_updates.get(bar.Symbol, ()):
+            update(bar)
+
+    def _step(self, time, bars, warming_up=False):
+        """Advance the clock to ``time``, apply ``bars`` ({symbol: TradeBar}) and call ``OnData``."""
+        self._time = time
+        self._warming_up = warming_up
+        for bar in bars.values():
+            self._push_bar(bar)
+        self.OnData(Slice(time, bars))
+
+
+# Synchronous market orders wait this long for their fill, like LEAN's live default.
+MARKET_ORDER_FILL_TIMEOUT = 5.0
+
+_EPOCH = datetime(1970, 1, 1)
+
+_RESOLUTION_SPAN = {
+    Resolution.SECOND: timedelta(seconds=1),
+    Resolution.MINUTE: timedelta(minutes=1),
+    Resolution.HOUR: timedelta(hours=1),
+    Resolution.DAILY: timedelta(days=1),
+}
@@ -0,0 +1,252 @@
+"""Order execution models for the local engine.
+
+A brokerage implements ``submit``, ``cancel``, ``on_bar`` (work resting
+orders against a new bar) and ``wait_for_fill`` (block a synchronous market
+order until it completes). Fills are reported through
+``algorithm._apply_fill``, which raises LEAN-compatible ``OnOrderEvent``\\ s.
+"""
+import functools
+import heapq
+import itertools
+import random
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+from .algorithm_imports import OrderType
+
+
+class ImmediateFillBrokerage:
+    """Backtest fill model: market orders fill at the security's current price
+    inside the order call, trailing stops rest until a later bar trades through
+    them. Mirrors LEAN's default equity fill model without fees or slippage.
+    """
+
+    def __init__(self):
+        self.open_stops = {}
+
+    def submit(self, algorithm, order):
+        if order.type == OrderType.MARKET:
+            self._fill(algorithm, order, order.quantity, algorithm.securities[order.symbol].price)
+        elif order.type == OrderType.TRAILING_STOP:
+            self._accept_stop(algorithm, order)
+        else:
+            raise NotImplementedError(f"Order type {order.type} is not supported by the local engine")
+
+    def cancel(self, algorithm, order):
+        stops = self.open_stops.get(order.symbol)
+        if stops is not None:
+            stops.pop(order.id, None)
+        algorithm._order_canceled(order)
+
+    def on_bar(self, algorithm, bar):
+        stops = self.open_stops.get(bar.Symbol)
+        if not stops:
+            return
+        for order_id, order in list(stops.items()):
+            fill_price = trailing_stop_fill_price(order, bar)
+            if fill_price is not None:
+                del stops[order_id]
+                self._fill(algorithm, order, order.remaining_quantity, fill_price)
+            else:
+                update_trailing_stop(order, bar)
+
+    def wait_for_fill(self, algorithm, order, timeout):
+        pass
+
+    def restore_open_orders(self, algorithm, orders):
+        """Take over the open ``orders`` of a restored checkpoint.
+
+        Trailing stops rest again with their saved stop price. Market orders
+        were in flight when the snapshot was taken and are reported canceled.
+        """
+        for order in orders:
+            if order.type == OrderType.TRAILING_STOP:
+                self.open_stops.setdefault(order.symbol, {})[order.id] = order
+            else:
+                algorithm._order_canceled(order, "in flight at checkpoint")
+
+    def _accept_stop(self, algorithm, order):
+        order.stop_price = trailing_stop_price(algorithm.securities[order.symbol].price, order)
+        self.open_stops.setdefault(order.symbol, {})[order.id] = order
+
+    def _fill(self, algorithm, order, quantity, price):
+        algorithm._apply_fill(order, quantity, price)
+
+
+class PaperBrokerage(ImmediateFillBrokerage):
+    """Paper broker with wall-clock latency, partial fills, slippage and fees.
+
+    Market orders are acknowledged after ``latency`` seconds (plus up to
+    ``jitter`` seconds, uniformly) and filled in ``fill_parts`` pieces spaced
+    ``part_interval`` seconds apart. Every fill, trailing stop fills included,
+    moves against the order by ``slippage_bps`` plus Gaussian noise of
+    ``slippage_noise_bps`` and pays ``fee_per_share``. Cancels are
+    acknowledged after the same latency, so an order can still fill while its
+    cancel is in flight. With zero latency and ``part_interval`` everything
+    happens inside the order call, which also makes this a fill model for
+    backtests.
+
+    Delayed work runs on one scheduler thread under ``lock`` (the strategy
+    lock, if the host has one); ``release`` is a context manager factory used
+    to give that lock up while a synchronous order waits, by default a plain
+    release and re-acquire of ``lock``.
+    ``on_submit(order)`` is called for every accepted order.
+    """
+
+    def __init__(self, latency=0.0, jitter=0.0, fill_parts=1, part_interval=0.0, slippage_bps=0.0,
+                 slippage_noise_bps=0.0, fee_per_share=0.0, seed=0, lock=None, release=None, on_submit=None):
+        super().__init__()
+        self.latency = latency
+        self.jitter = jitter
+        self.fill_parts = max(int(fill_parts), 1)
+        self.part_interval = part_interval
+        self.slippage_bps = slippage_bps
+        self.slippage_noise_bps = slippage_noise_bps
+        self.fee_per_share = fee_per_share
+        self.lock = lock if lock is not None else nullcontext()
+        self.release = release or (functools.partial(released, lock) if lock is not None else nullcontext)
+        self.on_submit = on_submit
+        self.orders_submitted = 0
+        self.fills = 0
+        self._random = random.Random(seed)
+        self._queue = []
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._done = threading.Condition()
+        self._thread = None
+        self._closing = False
+
+    @property
+    def synchronous(self):
+        return not (self.latency or self.jitter or (self.part_interval and self.fill_parts > 1))
+
+    def submit(self, algorithm, order):
+        self.orders_submitted += 1
+        if self.on_submit is not None:
+            self.on_submit(order)
+        if order.type == OrderType.TRAILING_STOP:
+            self._accept_stop(algorithm, order)
+        elif order.type != OrderType.MARKET:
+            raise NotImplementedError(f"Order type {order.type} is not supported by the local engine")
+        elif self.synchronous:
+            for quantity in split_quantity(order.quantity, self.fill_parts):
+                self._fill(algorithm, order, quantity, algorithm.securities[order.symbol].price)
+        else:
+            due = time.perf_counter() + self._delay()
+            for quantity in split_quantity(order.quantity, self.fill_parts):
+                self._schedule(due, self._fill_market, algorithm, order, quantity)
+                due += self.part_interval
+
+    def cancel(self, algorithm, order):
+        if self.synchronous:
+            super().cancel(algorithm, order)
+        else:
+            self._schedule(time.perf_counter() + self._delay(), self._cancel_if_open, algorithm, order)
+
+    def wait_for_fill(self, algorithm, order, timeout):
+        deadline = time.perf_counter() + timeout
+        with self.release():
+            with self._done:
+                while order.is_open:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0:
+                        break
+                    self._done.wait(remaining)
+
+    def close(self):
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _delay(self):
+        return self.latency + (self._random.uniform(0.0, self.jitter) if self.jitter else 0.0)
+
+    def _fill(self, algorithm, order, quantity, price):
+        slippage = self.slippage_bps
+        if self.slippage_noise_bps:
+            slippage += self._random.gauss(0.0, self.slippage_noise_bps)
+        price *= 1.0 + (slippage if quantity > 0 else -slippage) / 10000.0
+        self.fills += 1
+        algorithm._apply_fill(order, quantity, price, abs(quantity) * self.fee_per_share)
+
+    def _fill_market(self, algorithm, order, quantity):
+        if order.is_open:
+            self._fill(algorithm, order, quantity, algorithm.securities[order.symbol].price)
+
+    def _cancel_if_open(self, algorithm, order):
+        if order.is_open:
+            ImmediateFillBrokerage.cancel(self, algorithm, order)
+
+    def _schedule(self, due, action, *args):
+        with self._condition:
+            heapq.heappush(self._queue, (due, next(self._sequence), action, args))
+            if self._thread is None:
+                self._closing = False
+                self._thread = threading.Thread(target=self._run, name="paper-brokerage", daemon=True)
+                self._thread.start()
+            self._condition.notify()
+
+    def _run(self):
+        queue = self._queue
+        while True:
+            with self._condition:
+                while not queue or queue[0][0] > time.perf_counter():
+                    if self._closing and not queue:
+                        return
+                    self._condition.wait(None if not queue else queue[0][0] - time.perf_counter())
+                now = time.perf_counter()
+                batch = []
+                while queue and queue[0][0] <= now:
+                    batch.append(heapq.heappop(queue))
+            with self.lock:
+                for _, _, action, args in batch:
+                    action(*args)
+            with self._done:
+                self._done.notify_all()
+
+
+@contextmanager
+def released(lock):
+    lock.release()
+    try:
+        yield
+    finally:
+        lock.acquire()
+
+
+def split_quantity(quantity, parts):
+    """Split a signed share quantity into at most ``parts`` non-zero integer pieces."""
+    parts = min(parts, abs(quantity)) or 1
+    size, extra = divmod(abs(quantity), parts)
+    sign = 1 if quantity > 0 else -1
+    return [sign * (size + (1 if i < extra else 0)) for i in range(parts)]
+
+
+def trailing_stop_price(price, order):
+    amount = price * order.trailing_amount if order.trailing_as_percentage else order.trailing_amount
+    return price - amount if order.quantity < 0 else price + amount
+
+
+def trailing_stop_fill_price(order, bar):
+    """Fill price if ``bar`` trades through the stop, else ``None``. Gaps fill at the open."""
+    if order.quantity < 0:
+        if bar.Low <= order.stop_price:
+            return min(order.stop_price, bar.Open)
+    elif bar.High >= order.stop_price:
+        return max(order.stop_price, bar.Open)
+    return None
+
+
+def update_trailing_stop(order, bar):
+    if order.quantity < 0:
+        stop = trailing_stop_price(bar.High, order)
+        if stop > order.stop_price:
+            order.stop_price = stop
+    else:
+        stop = trailing_stop_price(bar.Low, order)
+        if stop < order.stop_price:
+            order.stop_price = stop
@@ -0,0 +1,241 @@
+"""Content-addressed cache of backtest results.
+
+A run's key is a SHA-256 over everything that decides its outcome:
+
+- the strategy: its file's bytes and the module-level settings as loaded
+  (so loader overrides count),
+- the ``StrategyConfig`` it ran with, if one was passed,
+- the data: a hash of the bar files (or in-memory arrays) of its symbols,
+- the engine: a hash of the ``local_engine`` sources.
+
+Editing any of them changes the key, so stale entries are never served;
+they just age out. ``ResultCache`` keeps one ``.npz`` per key under
+``root`` with the equity curve, fills, trade stats and headline metrics, and
+evicts least-recently-used entries once the directory grows past
+``max_bytes``. ``run_backtest(..., cache=)`` and ``run_configs(..., cache=)``
+return cached results without running, and sweeps built on them only run
+the configs that are missing. ``WalkForward``, ``PurgedKFold``,
+``SuccessiveHalving``/``hyperband``, ``TPEOptimizer`` and ``run_sweep`` all
+take a ``cache=``.
+"""
+import dataclasses
+import glob
+import hashlib
+import io
+import json
+import os
+import sys
+import weakref
+
+import numpy as np
+
+from .algorithm_imports import Symbol
+from .data import from_epoch, to_epoch
+
+_SETTING_TYPES = (str, int, float, bool, list, tuple, dict, type(None))
+_file_hashes = {}
+_series_hashes = weakref.WeakKeyDictionary()
+_engine_hash = None
+
+
+def _file_digest(path):
+    """SHA-256 of a file's bytes, remembered per (path, size, mtime) for the life of the process."""
+    stat = os.stat(path)
+    key = (path, stat.st_size, stat.st_mtime_ns)
+    digest = _file_hashes.get(key)
+    if digest is None:
+        digest = hashlib.sha256()
+        with open(path, "rb") as handle:
+            for block in iter(lambda: handle.read(1 << 20), b""):
+                digest.update(block)
+        digest = _file_hashes[key] = digest.hexdigest()
+    return digest
+
+
+def engine_version():
+    """Hash of the ``local_engine`` package sources."""
+    global _engine_hash
+    if _engine_hash is None:
+        package = os.path.dirname(os.path.abspath(__file__))
+        digest = hashlib.sha256()
+        for path in sorted(glob.glob(os.path.join(package, "*.py"))):
+            digest.update(os.path.basename(path).encode())
+            digest.update(_file_digest(path).encode())
+        _engine_hash = digest.hexdigest()
+    return _engine_hash
+
+
+def strategy_fingerprint(strategy_class):
+    """Hash of the strategy file and its module-level settings as loaded."""
+    module = sys.modules[strategy_class.__module__]
+    settings = {name: value for name, value in vars(module).items()
+                if name.isupper() and isinstance(value, _SETTING_TYPES)}
+    digest = hashlib.sha256(_file_digest(module.__file__).encode())
+    digest.update(repr(sorted(settings.items())).encode())
+    return digest.hexdigest()
+
+
+def _series_digest(store, symbol):
+    """SHA-256 of an in-memory series' arrays, remembered per store until ``save`` replaces the series."""
+    series = store.load(symbol)
+    hashes = _series_hashes.setdefault(store, {})
+    known = hashes.get(symbol)
+    if known is not None and known[0] is series:
+        return known[1]
+    digest = hashlib.sha256()
+    for column in (series.time, series.open, series.high, series.low, series.close, series.volume):
+        digest.update(np.ascontiguousarray(column).tobytes())
+    hashes[symbol] = (series, digest.hexdigest())
+    return hashes[symbol][1]
+
+
+def data_fingerprint(store, symbols):
+    """Hash of the bars of ``symbols``: file bytes for a ``BarStore``, array bytes for in-memory series."""
+    digest = hashlib.sha256()
+    for symbol in sorted(str(symbol) for symbol in symbols):
+        digest.update(symbol.encode())
+        path = store.path(symbol) if store.root is not None else None
+        if path is not None and os.path.exists(path):
+            digest.update(_file_digest(path).encode())
+        else:
+            digest.update(_series_digest(store, symbol).encode())
+    return digest.hexdigest()
+
+
+def run_key(strategy_class, store, config=None, variant=None):
+    """Cache key of a run of ``strategy_class`` (with ``config``, if given) over ``store``.
+
+    ``variant`` names a run setup the config does not describe, such as
+    indicators played back from tapes instead of computed.
+    """
+    module = sys.modules[strategy_class.__module__]
+    if config is not None:
+        symbols = config.symbols
+    elif hasattr(module, "StrategyConfig"):
+        symbols = module.StrategyConfig.from_settings().symbols
+    else:
+        symbols = getattr(module, "SYMBOLS", None) or store.symbols()
+    fields = None if config is None else {field.name: getattr(config, field.name)
+                                          for field in dataclasses.fields(config) if field.init}
+    parts = [strategy_fingerprint(strategy_class), repr(sorted(fields.items())) if fields else "",
+             data_fingerprint(store, symbols), engine_version(), variant or ""]
+    return hashlib.sha256("\0".join(parts).encode()).hexdigest()
+
+
+class CachedResult:
+    """A ``BacktestResult`` read back from the cache: equity curve, fills and trade stats, without the algorithm."""
+    algorithm = None
+
+    def __init__(self, equity_times, equity, fills, trade_stats):
+        self.equity_times = equity_times
+        self.equity = equity
+        self.fills = fills
+        self.trade_stats = trade_stats
+
+    @property
+    def final_equity(self):
+        return self.equity[-1] if self.equity else float("nan")
+
+    @property
+    def total_return(self):
+        initial = self.equity[0] if self.equity else self.final_equity
+        return 0.0 if initial == 0 else self.final_equity / initial - 1.0
+
+
+class ResultCache:
+    """Backtest results under ``root``, one ``<key>.npz`` each, at most about ``max_bytes`` in total.
+
+    ``get`` refreshes an entry's modification time; ``put`` writes atomically
+    (several processes may share a cache), and once the directory outgrows the
+    budget deletes the entries with the oldest modification times until it fits.
+    """
+
+    def __init__(self, root, max_bytes=1 << 30):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._used = None
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.root, key[:2], f"{key}.npz")
+
+    def __contains__(self, key):
+        return os.path.exists(self.path(key))
+
+    def get(self, key):
+        """The ``CachedResult`` stored under ``key``, or ``None``."""
+        path = self.path(key)
+        try:
+            with np.load(path) as entry:
+                meta = json.loads(str(entry["meta"]))
+                equity_times = [from_epoch(t) for t in entry["equity_time"].tolist()]
+                fills = list(zip([from_epoch(t) for t in entry["fill_time"].tolist()],
+                                 [Symbol(ticker) for ticker in entry["fill_symbol"].tolist()],
+                                 entry["fill_order_id"].tolist(), entry["fill_type"].tolist(),
+                                 entry["fill_quantity"].tolist(), entry["fill_price"].tolist(),
+                                 entry["fill_fee"].tolist()))
+                result = CachedResult(equity_times, entry["equity"].tolist(), fills,
+                                      {Symbol(symbol): combos for symbol, combos in meta["trade_stats"].items()})
+        except (FileNotFoundError, KeyError, ValueError, OSError):
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            pass
+        self.hits += 1
+        return result
+
+    def put(self, key, result):
+        """Store ``result`` (a ``BacktestResult``) under ``key`` and evict down to the budget."""
+        columns = list(zip(*result.fills)) if result.fills else [()] * 7
+        meta = {"final_equity": result.final_equity, "total_return": result.total_return,
+                "trade_stats": {str(symbol): combos for symbol, combos in result.trade_stats.items()}}
+        buffer = io.BytesIO()
+        np.savez_compressed(buffer,
+                            meta=np.array(json.dumps(meta)),
+                            equity_time=np.array([to_epoch(t) for t in result.equity_times], dtype=np.int64),
+                            equity=np.array(result.equity, dtype=np.float64),
+                            fill_time=np.array([to_epoch(t) for t in columns[0]], dtype=np.int64),
+                            fill_symbol=np.array([str(symbol) for symbol in columns[1]], dtype=str),
+                            fill_order_id=np.array(columns[2], dtype=np.int64),
+                            fill_type=np.array([str(kind) for kind in columns[3]], dtype=str),
+                            fill_quantity=np.array(columns[4], dtype=np.float64),
+                            fill_price=np.array(columns[5], dtype=np.float64),
+                            fill_fee=np.array(columns[6], dtype=np.float64))
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as handle:
+            handle.write(buffer.getvalue())
+        os.replace(temporary, path)
+        # Track usage from this process's writes; rescan (and see other writers') only when over budget.
+        self._used = self.size if self._used is None else self._used + len(buffer.getvalue())
+        if self._used > self.max_bytes:
+            self.evict()
+
+    def evict(self):
+        """Delete least-recently-used entries until the cache fits in ``max_bytes``."""
+        entries = []
+        for path in glob.glob(os.path.join(self.root, "*", "*.npz")):
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime_ns, stat.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        self._used = total
+
+    @property
+    def size(self):
+        return sum(os.path.getsize(path) for path in glob.glob(os.path.join(self.root, "*", "*.npz")))
@@ -0,0 +1,214 @@
+"""Checkpoints of a running algorithm, for restarts without a warm-up replay.
+
+A checkpoint is one ObjectStore object: an 8-byte header (``HCCP`` and the
+format version) followed by a zlib-compressed pickle of
+
+- ``time``: the algorithm time of the last processed step
+- ``account``: securities (prices), holdings, cash and orders, i.e. what a
+  brokerage hands back to LEAN on a live restart
+- ``strategy``: whatever the strategy's ``checkpoint_state()`` returns
+
+Without a ``lock`` the snapshot is pickled on the algorithm thread, so it is
+consistent with the step it was taken after; compression and the store write
+run on a background thread. With the host's strategy ``lock`` (the live
+runner's) ``save`` only requests a snapshot: the writer thread takes the lock,
+pickles the state as of the next point the algorithm gives it up, and
+compresses and writes after releasing it, so the step that triggered the
+checkpoint does not pay for it.
+
+Restoring replaces the account objects, re-arms resting trailing stops with
+the brokerage and hands the strategy state to
+``restore_checkpoint_state(state)``. The algorithm then resumes after the
+checkpoint's time with no warm-up, and makes the same decisions as an
+uninterrupted run. Intents still queued in an ``ExecutionWorker`` and market
+orders in flight at a paper broker are not part of a checkpoint.
+"""
+import contextlib
+import gc
+import io
+import pickle
+import re
+import struct
+import sys
+import threading
+import zlib
+from datetime import timedelta
+
+MAGIC = b"HCCP"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<4sI")
+
+# Strategy modules get a per-load name (``local_engine.loader``); classes
+# pickled from one load are resolved against the module of the restoring one.
+_STRATEGY_MODULE = re.compile(r"strategy_\w+_\d+$")
+
+# Pending payload of a snapshot the writer thread still has to take under the lock.
+_REQUESTED = object()
+
+
+@contextlib.contextmanager
+def _collector_paused():
+    # Pickling allocates one object per indicator, window and order; letting
+    # the cyclic collector run in between costs more than the pickling itself.
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def capture(algorithm):
+    """The checkpoint contents of ``algorithm`` as live references; pickle them before the next step."""
+    return {
+        "time": algorithm.time,
+        "account": {
+            "securities": algorithm.securities,
+            "portfolio": algorithm.portfolio,
+            "transactions": algorithm.transactions,
+        },
+        "strategy": algorithm.checkpoint_state(),
+    }
+
+
+def encode(payload, level=1):
+    """Checkpoint bytes of a pickled ``capture``."""
+    return HEADER.pack(MAGIC, FORMAT_VERSION) + zlib.compress(payload, level)
+
+
+class _Unpickler(pickle.Unpickler):
+    def __init__(self, data, strategy_module):
+        super().__init__(io.BytesIO(data))
+        self.strategy_module = strategy_module
+
+    def find_class(self, module, name):
+        if _STRATEGY_MODULE.match(module):
+            return getattr(self.strategy_module, name)
+        return super().find_class(module, name)
+
+
+def decode(data, algorithm):
+    """The snapshot dict stored in checkpoint ``data``, with strategy classes taken from ``algorithm``'s module."""
+    if len(data) < HEADER.size:
+        raise ValueError("checkpoint is truncated")
+    magic, version = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise ValueError("not a checkpoint")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"unsupported checkpoint format version {version}")
+    payload = zlib.decompress(memoryview(data)[HEADER.size:])
+    with _collector_paused():
+        return _Unpickler(payload, sys.modules[type(algorithm).__module__]).load()
+
+
+def restore(algorithm, snapshot):
+    """Put ``snapshot`` into a freshly initialized ``algorithm`` and make it resume after the snapshot's time."""
+    account = snapshot["account"]
+    algorithm.securities = account["securities"]
+    algorithm.portfolio = account["portfolio"]
+    algorithm.transactions = account["transactions"]
+    algorithm.transactions._algorithm = algorithm
+    if algorithm._brokerage is not None:
+        algorithm._brokerage.restore_open_orders(algorithm, algorithm.transactions.get_open_orders())
+    algorithm.restore_checkpoint_state(snapshot["strategy"])
+    algorithm._time = snapshot["time"]
+    if snapshot["time"] is not None:
+        algorithm.start_date = snapshot["time"] + timedelta(seconds=1)
+    algorithm.warm_up_bars = 0
+
+
+class Checkpointer:
+    """Writes checkpoints of ``algorithm`` to ``object_store`` under ``key``.
+
+    The host calls ``step()`` after every time step; with ``interval`` a
+    checkpoint is taken every ``interval`` steps. ``save()`` takes one now.
+    Only the newest snapshot waiting for the writer thread is kept, so a slow
+    store never queues up work. ``object_store`` defaults to the algorithm's,
+    ``key`` to ``<strategy class>/checkpoint``. ``lock`` is the strategy lock
+    of a threaded host; snapshots are then taken on the writer thread while
+    holding it (see the module docstring).
+    """
+
+    def __init__(self, algorithm, object_store=None, key=None, interval=None, level=1, lock=None):
+        self.algorithm = algorithm
+        self.object_store = object_store if object_store is not None else algorithm.object_store
+        self.key = key or f"{type(algorithm).__name__}/checkpoint"
+        self.interval = interval
+        self.level = level
+        self.lock = lock
+        self.taken = 0
+        self.written = 0
+        self._steps = 0
+        self._pending = None
+        self._writing = False
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def step(self):
+        self._steps += 1
+        if self.interval and self._steps % self.interval == 0:
+            self.save()
+
+    def save(self):
+        payload = self._snapshot() if self.lock is None else _REQUESTED
+        with self._condition:
+            self._pending = payload
+            self.taken += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="checkpoint-writer", daemon=True)
+                self._thread.start()
+            self._condition.notify_all()
+
+    def flush(self):
+        """Block until every snapshot taken so far is written (or superseded)."""
+        with self._condition:
+            while self._pending is not None or self._writing:
+                self._condition.wait()
+
+    def close(self):
+        self.flush()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+
+    def load(self):
+        """The stored snapshot, or ``None`` when there is none."""
+        if not self.object_store.contains_key(self.key):
+            return None
+        return decode(self.object_store.read_bytes(self.key), self.algorithm)
+
+    def restore(self):
+        """Restore the stored snapshot into the algorithm; ``False`` when there is none."""
+        snapshot = self.load()
+        if snapshot is None:
+            return False
+        restore(self.algorithm, snapshot)
+        return True
+
+    def _snapshot(self):
+        with _collector_paused():
+            return pickle.dumps(capture(self.algorithm), protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+                payload, self._pending = self._pending, None
+                self._writing = True
+            try:
+                if payload is _REQUESTED:
+                    with self.lock:
+                        payload = self._snapshot()
+                self.object_store.save_bytes(self.key, encode(payload, self.level))
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self.written += 1
+                    self._condition.notify_all()
@@ -0,0 +1,325 @@
+"""Purged, embargoed k-fold cross-validation of strategy configs.
+
+The live bars between the strategy's start and end dates are cut into ``k``
+contiguous folds. Each fold is the test set once. Its training data is the
+rest of the timeline, minus ``purge`` bars right before the test fold and
+``embargo`` bars right after it:
+
+- ``purge`` is ``trigger_window``: a signal keeps counting for that many bars,
+  so decisions in the last train bars are still live when the test fold starts.
+- ``embargo`` is ``ma_slow_period + trigger_window``: until the slowest
+  average has forgotten the test bars, train bars after the fold still see them.
+
+Both come from the largest values among the candidates.
+
+Every contiguous train piece and the test fold run as their own backtests:
+they start flat and are chained into one train curve. All candidates share
+one ``MultiEngine`` pass per piece. Indicators are not warmed up or
+recomputed per piece. ``IndicatorTapes`` runs every distinct indicator over
+each symbol's full history once and records its outputs after every bar.
+Each piece then reads those values from the bar it starts at
+(``WarmUpMode.HISTORY``, with the tapes standing in for the history seed).
+Tape values come from all bars before a piece, not just the last
+``warm_up_period``; recursive indicators (the stochastic RSI's Wilder
+averages) therefore differ slightly from a plain ``HISTORY`` run.
+Folds run in parallel on a process pool. Each worker receives the tapes once,
+through the pool initializer, and the bars through a ``SharedBarStore``; a
+fold task only carries its index ranges.
+"""
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .algorithm_imports import IndicatorBase, IndicatorDataPoint
+from .data import from_epoch, to_epoch
+from .engine import replay_timeline
+from .loader import cached_strategy, strategy_config
+from .metrics import total_return
+from .multi import IndicatorPool, run_configs
+from .shared import shared_store
+
+
+def purged_folds(n_bars, k, purge, embargo):
+    """``(train, test)`` per fold: ``train`` is a list of ``(begin, end)`` index ranges, ``test`` one range."""
+    if not 2 <= k <= n_bars:
+        raise ValueError(f"need 2 <= k <= {n_bars} folds")
+    bounds = np.linspace(0, n_bars, k + 1).astype(int).tolist()
+    folds = []
+    for begin, end in zip(bounds[:-1], bounds[1:]):
+        train = [(0, begin - purge), (end + embargo, n_bars)]
+        folds.append(([(a, b) for a, b in train if b > a], (begin, end)))
+    return folds
+
+
+class IndicatorTape:
+    """An indicator's outputs after every bar of one symbol's history.
+
+    ``values``/``samples`` hold the indicator's own ``Current.Value`` and
+    ``Samples``; ``outputs`` the same for its sub-indicators (``K``, ``D``,
+    ``Signal``, ...) by attribute name.
+    """
+
+    def __init__(self, times, values, samples, warm_up_period, outputs):
+        self.times = times
+        self.values = values
+        self.samples = samples
+        self.warm_up_period = warm_up_period
+        self.outputs = outputs
+
+
+class TapeIndicator:
+    """Plays back an ``IndicatorTape`` with the indicator surface the strategies read."""
+
+    def __init__(self, tape, aliases=None):
+        self._tape = tape
+        self.warm_up_period = tape.warm_up_period
+        self.Current = IndicatorDataPoint()
+        self.Samples = 0
+        self._outputs = []
+        for name, output in tape.outputs.items():
+            indicator = TapeIndicator(output)
+            setattr(self, name, indicator)
+            self._outputs.append(indicator)
+        for alias, name in (aliases or {}).items():
+            setattr(self, alias, getattr(self, name))
+
+    @property
+    def IsReady(self):
+        return self.Samples >= self.warm_up_period
+
+    is_ready = IsReady
+
+    def seek(self, index, time):
+        """Show the values after bar ``index`` of the tape (before the first bar when ``index`` is -1)."""
+        tape = self._tape
+        self.Current.Time = time
+        self.Current.Value = float(tape.values[index]) if index >= 0 else 0.0
+        self.Samples = int(tape.samples[index]) if index >= 0 else 0
+        for output in self._outputs:
+            output.seek(index, time)
+
+    def update_bar(self, bar):
+        self.seek(int(np.searchsorted(self._tape.times, to_epoch(bar.EndTime), side="left")), bar.EndTime)
+
+
+def _outputs(indicator):
+    """Sub-indicators of ``indicator`` by capitalized attribute name, and lower-case aliases of them."""
+    names, aliases = {}, {}
+    for name, value in vars(indicator).items():
+        if isinstance(value, IndicatorBase):
+            if name[:1].isupper():
+                names[name] = value
+    for name, value in vars(indicator).items():
+        if isinstance(value, IndicatorBase) and not name[:1].isupper():
+            target = next((upper for upper, other in names.items() if other is value), None)
+            if target is not None:
+                aliases[name] = target
+    return names, aliases
+
+
+class IndicatorTapes:
+    """Tapes of every distinct indicator the ``configs`` create, over the full history in ``store``."""
+
+    def __init__(self, tapes, aliases):
+        self.tapes = tapes
+        self.aliases = aliases
+
+    @classmethod
+    def record(cls, strategy_class, store, configs):
+        pool = IndicatorPool()
+        for config in configs:
+            algorithm = strategy_class()
+            algorithm.history_provider = store
+            algorithm.indicator_pool = pool
+            algorithm.config = config.replace(warm_up_mode="REPLAY", enable_event_log=False)
+            algorithm.Initialize()
+        by_symbol = {}
+        for key, indicator in pool.indicators.items():
+            by_symbol.setdefault(key[0], []).append(key)
+        tapes, aliases = {}, {}
+        for symbol, keys in by_symbol.items():
+            series = store.load(str(symbol))
+            n = len(series)
+            recorded = []
+            for key in keys:
+                indicator = pool.indicators[key]
+                subs, aliases[key] = _outputs(indicator)
+                recorded.append((key, indicator, subs, np.empty(n), np.empty(n, np.int64),
+                                 {name: (np.empty(n), np.empty(n, np.int64)) for name in subs}))
+            for i in range(n):
+                bar = series.bar(i, symbol)
+                pool.push({symbol: bar})
+                for key, indicator, subs, values, samples, outputs in recorded:
+                    values[i] = indicator.Current.Value
+                    samples[i] = indicator.Samples
+                    for name, sub in subs.items():
+                        outputs[name][0][i] = sub.Current.Value
+                        outputs[name][1][i] = sub.Samples
+            for key, indicator, subs, values, samples, outputs in recorded:
+                tapes[key] = IndicatorTape(series.time, values, samples, indicator.warm_up_period, {
+                    name: IndicatorTape(series.time, *outputs[name], sub.warm_up_period, {}) for name, sub in subs.items()})
+        return cls(tapes, aliases)
+
+
+class TapePool:
+    """Indicator pool (see ``IndicatorPool``) that hands out ``TapeIndicator``\\ s positioned before ``start``."""
+
+    def __init__(self, tapes, start):
+        self.tapes = tapes
+        self.start = start
+        self.indicators = {}
+        self.requested = 0
+        self._by_symbol = {}
+
+    def indicator(self, symbol, spec, make, selector=None, owner=None):
+        self.requested += 1
+        key = (symbol, spec, selector)
+        indicator = self.indicators.get(key)
+        if indicator is None:
+            tape = self.tapes.tapes[key]
+            indicator = self.indicators[key] = TapeIndicator(tape, self.tapes.aliases.get(key))
+            index = int(np.searchsorted(tape.times, self.start, side="left")) - 1
+            indicator.seek(index, from_epoch(tape.times[index]) if index >= 0 else None)
+            self._by_symbol.setdefault(symbol, []).append(indicator)
+        return indicator
+
+    def claim_seed(self, indicator):
+        return False
+
+    def release(self, owner):
+        pass
+
+    def push(self, bars):
+        for symbol, bar in bars.items():
+            indicators = self._by_symbol.get(symbol)
+            if indicators:
+                # Every tape of a symbol shares its bar times, so the bar is looked up once.
+                index = int(np.searchsorted(indicators[0]._tape.times, to_epoch(bar.EndTime), side="left"))
+                for indicator in indicators:
+                    indicator.seek(index, bar.EndTime)
+
+
+class FoldResult:
+    """Train and test score of every candidate on one fold, and the candidate the train scores select."""
+
+    def __init__(self, train, test, train_scores, test_scores, test_times, test_equity):
+        self.train = train
+        self.test = test
+        self.train_scores = train_scores
+        self.test_scores = test_scores
+        self.selected = int(np.argmax(train_scores))
+        self.test_times = test_times
+        self.test_equity = test_equity
+
+
+class CrossValidationResult:
+    """Per-fold results plus, per candidate, the mean test score over folds."""
+
+    def __init__(self, grid, folds, purge, embargo):
+        self.grid = grid
+        self.folds = folds
+        self.purge = purge
+        self.embargo = embargo
+        self.mean_test_scores = np.mean([fold.test_scores for fold in folds], axis=0).tolist()
+        self.mean_train_scores = np.mean([fold.train_scores for fold in folds], axis=0).tolist()
+
+    @property
+    def selected_test_scores(self):
+        """Test score of the train-selected candidate of each fold: the out-of-sample estimate."""
+        return [fold.test_scores[fold.selected] for fold in self.folds]
+
+    @property
+    def best_params(self):
+        return self.grid[int(np.argmax(self.mean_test_scores))]
+
+
+def chain(curves):
+    """One equity array from ``curves`` run back to back: each is rescaled to start where the previous ended."""
+    chained = []
+    for curve in curves:
+        if len(curve) < 2:
+            continue
+        scale = chained[-1] / curve[0] if chained else 1.0
+        chained.extend(value * scale for value in (curve[1:] if chained else curve))
+    return np.asarray(chained)
+
+
+def _run_piece(strategy, store, configs, tapes, times, begin, end, cache):
+    start_date, end_date = from_epoch(times[begin]).date(), from_epoch(times[end - 1]).date()
+    piece = [config.replace(start_date=start_date.isoformat(), end_date=end_date.isoformat()) for config in configs]
+    return run_configs(strategy, store, piece, cache=cache, pool=TapePool(tapes, to_epoch(start_date.isoformat())))
+
+
+# The tapes of the pool worker this process is (see ``_init_worker``).
+_worker_tapes = None
+
+
+def _init_worker(tapes):
+    """Pool initializer: keep ``tapes`` for every fold this worker runs, so tasks do not carry them."""
+    global _worker_tapes
+    _worker_tapes = tapes
+
+
+def run_fold(strategy_path, store, overrides, base, grid, tapes, times, train, test, objective, cache=None):
+    """Scores of every candidate on one fold (pool task; ``tapes`` is ``None`` for the worker's own)."""
+    if tapes is None:
+        tapes = _worker_tapes
+    strategy = cached_strategy(strategy_path, overrides)
+    configs = [strategy_config(strategy, **dict(base, **params)) for params in grid]
+    pieces = [_run_piece(strategy, store, configs, tapes, times, begin, end, cache) for begin, end in train]
+    train_scores = [float(objective(chain([piece[i].equity for piece in pieces]))) for i in range(len(configs))]
+    tested = _run_piece(strategy, store, configs, tapes, times, *test, cache)
+    test_scores = [float(objective(np.asarray(result.equity))) for result in tested]
+    selected = int(np.argmax(train_scores))
+    return FoldResult(train, test, train_scores, test_scores, tested[selected].equity_times, tested[selected].equity)
+
+
+class PurgedKFold:
+    """Purged, embargoed ``k``-fold cross-validation of ``grid`` (field-change dicts) for ``strategy_path``.
+
+    ``purge`` and ``embargo`` default to the widths derived from the
+    candidates' ``trigger_window`` and ``ma_slow_period`` (see the module
+    docstring). ``objective`` scores an equity array and must be picklable.
+    ``workers`` processes run folds in parallel (``1``: in this process).
+    With a ``cache.ResultCache`` train and test pieces run before are read
+    back instead of run.
+    """
+
+    def __init__(self, strategy_path, store, grid, k=5, purge=None, embargo=None, objective=total_return, base=None,
+                 overrides=None, workers=None, cache=None):
+        self.strategy_path = strategy_path
+        self.store = store
+        self.grid = [dict(params) for params in grid]
+        self.k = k
+        self.objective = objective
+        self.base = dict(base or {}, warm_up_mode="HISTORY")
+        self.overrides = overrides
+        self.workers = workers
+        self.cache = cache
+        strategy = cached_strategy(strategy_path, overrides)
+        self.configs = [strategy_config(strategy, **dict(self.base, **params)) for params in self.grid]
+        trigger_window = max(config.trigger_window for config in self.configs)
+        self.purge = trigger_window if purge is None else purge
+        self.embargo = max(config.ma_slow_period for config in self.configs) + trigger_window if embargo is None else embargo
+
+    def run(self):
+        strategy = cached_strategy(self.strategy_path, self.overrides)
+        first = strategy()
+        first.config = self.configs[0]
+        first.history_provider = self.store
+        first.Initialize()
+        times, _, first_live = replay_timeline(self.store, first.securities, first.start_date, first.end_date, 0)
+        times = times[first_live:]
+        tapes = IndicatorTapes.record(strategy, self.store, self.configs)
+        splits = purged_folds(len(times), self.k, self.purge, self.embargo)
+        tasks = lambda store, tapes: [(self.strategy_path, store, self.overrides, self.base, self.grid, tapes, times,
+                                       train, test, self.objective, self.cache) for train, test in splits]
+        if self.workers == 1:
+            folds = [run_fold(*task) for task in tasks(self.store, tapes)]
+        else:
+            # The tapes go to each worker once, through the initializer, instead of with every fold.
+            symbols = dict.fromkeys(symbol for config in self.configs for symbol in config.symbols)
+            with shared_store(self.store, symbols) as store, \
+                    ProcessPoolExecutor(self.workers, initializer=_init_worker, initargs=(tapes,)) as pool:
+                folds = list(pool.map(run_fold, *zip(*tasks(store, None))))
+        return CrossValidationResult(self.grid, folds, self.purge, self.embargo)
@@ -0,0 +1,136 @@
+"""Bar storage for the local engine.
+
+A bar store is a directory with one ``<TICKER>.csv`` per symbol holding
+``time,open,high,low,close,volume`` rows (``time`` as an ISO date/datetime or
+epoch seconds, i.e. the bar's end time). Series are held as NumPy columns with
+times in epoch seconds.
+"""
+import csv
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from .algorithm_imports import Symbol, TradeBar
+
+EPOCH = datetime(1970, 1, 1)
+
+
+def to_epoch(value):
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return int((value - EPOCH).total_seconds())
+
+
+def from_epoch(seconds):
+    return EPOCH + timedelta(seconds=int(seconds))
+
+
+class BarSeries:
+    """OHLCV columns for one symbol, sorted by time."""
+    __slots__ = ("symbol", "time", "open", "high", "low", "close", "volume")
+
+    def __init__(self, symbol, time, open_, high, low, close, volume):
+        self.symbol = symbol
+        self.time = np.asarray(time, dtype=np.int64)
+        self.open = np.asarray(open_, dtype=np.float64)
+        self.high = np.asarray(high, dtype=np.float64)
+        self.low = np.asarray(low, dtype=np.float64)
+        self.close = np.asarray(close, dtype=np.float64)
+        self.volume = np.asarray(volume, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.time)
+
+    def between(self, start=None, end=None):
+        """Bars with ``start <= time < end`` (epoch seconds, either bound optional)."""
+        lo = 0 if start is None else int(np.searchsorted(self.time, start, side="left"))
+        hi = len(self.time) if end is None else int(np.searchsorted(self.time, end, side="left"))
+        return BarSeries(self.symbol, self.time[lo:hi], self.open[lo:hi], self.high[lo:hi],
+                         self.low[lo:hi], self.close[lo:hi], self.volume[lo:hi])
+
+    def bar(self, i, symbol=None):
+        return TradeBar(symbol or Symbol(self.symbol), from_epoch(self.time[i]), float(self.open[i]), float(self.high[i]),
+                        float(self.low[i]), float(self.close[i]), float(self.volume[i]))
+
+
+class BarStore:
+    def __init__(self, root):
+        self.root = root
+        self._cache = {}
+
+    def path(self, symbol):
+        return os.path.join(self.root, f"{symbol}.csv")
+
+    def symbols(self):
+        return sorted(name[:-4] for name in os.listdir(self.root) if name.endswith(".csv"))
+
+    def load(self, symbol):
+        series = self._cache.get(symbol)
+        if series is None:
+            columns = ([], [], [], [], [], [])
+            with open(self.path(symbol), newline="") as handle:
+                reader = csv.reader(handle)
+                next(reader)
+                for row in reader:
+                    columns[0].append(to_epoch(row[0] if not row[0].lstrip("-").isdigit() else int(row[0])))
+                    for column, value in zip(columns[1:], row[1:6]):
+                        column.append(float(value))
+            order = np.argsort(columns[0], kind="stable")
+            series = BarSeries(symbol, *(np.asarray(column)[order] for column in columns))
+            self._cache[symbol] = series
+        return series
+
+    def lookback(self, symbol, periods, end):
+        """The last ``periods`` bars before ``end`` (epoch seconds) as one ``BarSeries``."""
+        series = self.load(symbol)
+        hi = int(np.searchsorted(series.time, end, side="left"))
+        lo = max(hi - periods, 0)
+        return BarSeries(symbol, series.time[lo:hi], series.open[lo:hi], series.high[lo:hi],
+                         series.low[lo:hi], series.close[lo:hi], series.volume[lo:hi])
+
+    def save(self, series):
+        os.makedirs(self.root, exist_ok=True)
+        with open(self.path(series.symbol), "w", newline="") as handle:
+            writer = csv.writer(handle)
+            writer.writerow(("time", "open", "high", "low", "close", "volume"))
+            for row in zip(series.time.tolist(), series.open.tolist(), series.high.tolist(),
+                           series.low.tolist(), series.close.tolist(), series.volume.tolist()):
+                writer.writerow((from_epoch(row[0]).isoformat(),) + row[1:])
+        self._cache[series.symbol] = series
+
+
+class MemoryBarStore(BarStore):
+    """Bar store backed by in-memory series, for synthetic data and tests."""
+
+    def __init__(self, series=()):
+        super().__init__(None)
+        for item in series:
+            self._cache[item.symbol] = item
+
+    def symbols(self):
+        return sorted(self._cache)
+
+    def load(self, symbol):
+        return self._cache[symbol]
+
+    def save(self, series):
+        self._cache[series.symbol] = series
+
+
+def synthetic_series(symbol, n_bars, start="2015-01-01", step=timedelta(days=1), seed=0,
+                     price=100.0, drift=0.0002, volatility=0.02, volume=1_000_000.0):
+    """Geometric-Brownian-motion OHLCV bars with a fixed seed."""
+    rng = np.random.default_rng(seed)
+    step_seconds = int(step.total_seconds()) if isinstance(step, timedelta) else int(step)
+    times = to_epoch(start) + step_seconds * np.arange(1, n_bars + 1, dtype=np.int64)
+    log_returns = rng.normal(drift - 0.5 * volatility ** 2, volatility, n_bars)
+    close = price * np.exp(np.cumsum(log_returns))
+    open_ = np.concatenate(([price], close[:-1]))
+    spread = np.abs(rng.normal(0.0, volatility / 2, n_bars)) * close
+    high = np.maximum(open_, close) + spread
+    low = np.maximum(np.minimum(open_, close) - spread, 0.01)
+    volumes = volume * rng.lognormal(0.0, 0.5, n_bars)
+    return BarSeries(symbol, times, open_, high, low, close, volumes)
@@ -0,0 +1,227 @@
+"""Historical replay of a bar store through a strategy file."""
+import io
+from datetime import timedelta
+
+import numpy as np
+
+from .algorithm_imports import Symbol
+from .brokerage import ImmediateFillBrokerage
+from .cache import run_key
+from .checkpoint import Checkpointer
+from .data import from_epoch, to_epoch
+from .loader import load_strategy
+
+
+def replay_timeline(store, symbols, start_date, end_date, warm_up_bars):
+    """Merged bar times of ``symbols`` from ``warm_up_bars`` bars before ``start_date`` through ``end_date``,
+    the per-symbol series, and the index of the first non-warm-up time."""
+    start = to_epoch(start_date) if start_date else None
+    end = to_epoch(end_date + timedelta(days=1)) if end_date else None
+    series = {symbol: store.load(str(symbol)).between(None, end) for symbol in symbols}
+    times = np.unique(np.concatenate([s.time for s in series.values()])) if series else np.empty(0, np.int64)
+    first = 0 if start is None else int(np.searchsorted(times, start, side="left"))
+    begin = max(first - warm_up_bars, 0)
+    return times[begin:], series, first - begin
+
+
+class BacktestResult:
+    """Outcome of a run; ``fills`` defaults to the algorithm's (an extended run passes the full ledger)."""
+
+    def __init__(self, algorithm, equity_times, equity, fills=None):
+        self.algorithm = algorithm
+        self.equity_times = equity_times
+        self.equity = equity
+        self._fills = fills
+
+    @property
+    def fills(self):
+        return self.algorithm.fills if self._fills is None else self._fills
+
+    @property
+    def trade_stats(self):
+        return getattr(self.algorithm, "trade_stats", {})
+
+    @property
+    def final_equity(self):
+        return self.equity[-1] if self.equity else self.algorithm.portfolio.total_portfolio_value
+
+    @property
+    def total_return(self):
+        initial = self.equity[0] if self.equity else self.final_equity
+        return 0.0 if initial == 0 else self.final_equity / initial - 1.0
+
+
+class RunLedger:
+    """Equity curve and fills of a backtest that is extended run by run.
+
+    Every run appends one chunk object ``<key>/<n>`` (an ``.npz`` of its
+    equity points and fills) to ``store``, so writing costs only the new
+    data. ``load`` concatenates the chunks.
+    """
+
+    def __init__(self, store, key):
+        self.store = store
+        self.key = key
+
+    def _chunk_key(self, index):
+        return f"{self.key}/{index:06d}"
+
+    def load(self, until=None):
+        """``(equity_times, equity, fills)`` of all chunks.
+
+        Chunks that start after ``until`` come from an extension whose
+        checkpoint was never written; they are deleted so the run redoes them.
+        """
+        equity_times, equity, fills = [], [], []
+        index = 0
+        while self.store.contains_key(self._chunk_key(index)):
+            with np.load(io.BytesIO(self.store.read_bytes(self._chunk_key(index)))) as chunk:
+                if until is not None and len(chunk["equity_time"]) and from_epoch(chunk["equity_time"][0]) > until:
+                    break
+                equity_times.extend(from_epoch(t) for t in chunk["equity_time"].tolist())
+                equity.extend(chunk["equity"].tolist())
+                fills.extend(zip([from_epoch(t) for t in chunk["fill_time"].tolist()],
+                                 [Symbol(ticker) for ticker in chunk["fill_symbol"].tolist()],
+                                 chunk["fill_order_id"].tolist(), chunk["fill_type"].tolist(),
+                                 chunk["fill_quantity"].tolist(), chunk["fill_price"].tolist(), chunk["fill_fee"].tolist()))
+            index += 1
+        stale = index
+        while self.store.delete(self._chunk_key(stale)):
+            stale += 1
+        self._next = index
+        return equity_times, equity, fills
+
+    def append(self, equity_times, equity, fills):
+        if not equity_times:
+            return
+        if not hasattr(self, "_next"):
+            self.load()
+        columns = list(zip(*fills)) if fills else [()] * 7
+        buffer = io.BytesIO()
+        np.savez(buffer,
+                 equity_time=np.array([to_epoch(t) for t in equity_times], dtype=np.int64),
+                 equity=np.array(equity, dtype=np.float64),
+                 fill_time=np.array([to_epoch(t) for t in columns[0]], dtype=np.int64),
+                 fill_symbol=np.array([str(symbol) for symbol in columns[1]], dtype=str),
+                 fill_order_id=np.array(columns[2], dtype=np.int64),
+                 fill_type=np.array(columns[3], dtype=str),
+                 fill_quantity=np.array(columns[4], dtype=np.float64),
+                 fill_price=np.array(columns[5], dtype=np.float64),
+                 fill_fee=np.array(columns[6], dtype=np.float64))
+        self.store.save_bytes(self._chunk_key(self._next), buffer.getvalue())
+        self._next += 1
+
+
+class LocalEngine:
+    """Runs a ``QCAlgorithm`` subclass over the bars of a ``BarStore``.
+
+    ``strategy`` is either a strategy file path or an already loaded class;
+    ``overrides`` are forwarded to the loader. The algorithm's own start/end
+    dates and ``set_warm_up`` bar count select the replayed span.
+    ``object_store`` replaces the algorithm's in-memory ``ObjectStore``.
+    ``config`` is set as the algorithm's ``config`` before ``Initialize``
+    (see ``loader.strategy_config``), so one loaded class runs many configs. The
+    bar store doubles as the algorithm's ``history_provider`` for ``warm_up_indicator``.
+    With ``checkpoint_interval`` a checkpoint (``local_engine.checkpoint``) is
+    written to the algorithm's ObjectStore every that many bars after warm-up;
+    with ``resume`` the run starts from the stored checkpoint, if there is one.
+
+    ``extend`` is for runs that grow with the data, like a nightly job: the
+    run resumes from the stored end-of-run checkpoint (or starts from the
+    start date when there is none), replays only the bars after it, appends
+    its equity points and fills to the ``RunLedger`` and stores a new
+    end-of-run checkpoint. The result then covers the whole history.
+    """
+
+    def __init__(self, strategy, store, brokerage=None, overrides=None, object_store=None, checkpoint_interval=None,
+                 resume=False, extend=False, config=None):
+        self.strategy_class = load_strategy(strategy, overrides) if isinstance(strategy, str) else strategy
+        self.store = store
+        self.brokerage = brokerage or ImmediateFillBrokerage()
+        self.object_store = object_store
+        self.checkpoint_interval = checkpoint_interval
+        self.resume = resume
+        self.extend = extend
+        self.config = config
+        self.checkpointer = None
+
+    def create_algorithm(self):
+        algorithm = self.strategy_class()
+        algorithm._attach_brokerage(self.brokerage)
+        algorithm.history_provider = self.store
+        if self.config is not None:
+            algorithm.config = self.config
+        if self.object_store is not None:
+            algorithm.object_store = self.object_store
+        algorithm.Initialize()
+        return algorithm
+
+    def timeline(self, algorithm):
+        """Merged bar times and per-symbol series for the replayed span, plus the first non-warm-up index."""
+        return replay_timeline(self.store, algorithm.securities, algorithm.start_date, algorithm.end_date,
+                               algorithm.warm_up_bars)
+
+    def run(self):
+        algorithm = self.create_algorithm()
+        ledger = None
+        if self.checkpoint_interval or self.resume or self.extend:
+            self.checkpointer = Checkpointer(algorithm, interval=self.checkpoint_interval)
+            if self.resume or self.extend:
+                self.checkpointer.restore()
+        if self.extend:
+            ledger = RunLedger(self.checkpointer.object_store, f"{type(algorithm).__name__}/ledger")
+            previous_times, previous_equity, previous_fills = ledger.load(until=algorithm.time)
+        times, series, first_live = self.timeline(algorithm)
+        cursors = {symbol: int(np.searchsorted(s.time, times[0], side="left")) if len(times) else 0
+                   for symbol, s in series.items()}
+        equity_times, equity = [], []
+        for index, epoch in enumerate(times.tolist()):
+            bars = {}
+            for symbol, s in series.items():
+                cursor = cursors[symbol]
+                if cursor < len(s.time) and s.time[cursor] == epoch:
+                    bars[symbol] = s.bar(cursor, symbol)
+                    cursors[symbol] = cursor + 1
+            time = from_epoch(epoch)
+            algorithm._step(time, bars, warming_up=index < first_live)
+            if index >= first_live:
+                equity_times.append(time)
+                equity.append(algorithm.portfolio.total_portfolio_value)
+                if self.checkpointer is not None:
+                    self.checkpointer.step()
+        if ledger is not None:
+            # Ledger first: a checkpoint never points past the data the ledger holds.
+            ledger.append(equity_times, equity, algorithm.fills)
+            if equity_times:
+                self.checkpointer.save()
+        if self.checkpointer is not None:
+            self.checkpointer.close()
+        on_end = getattr(algorithm, "OnEndOfAlgorithm", None)
+        if on_end is not None:
+            on_end()
+        if ledger is not None:
+            return BacktestResult(algorithm, previous_times + equity_times, previous_equity + equity,
+                                  previous_fills + algorithm.fills)
+        return BacktestResult(algorithm, equity_times, equity)
+
+
+def run_backtest(strategy_path, store, overrides=None, brokerage=None, object_store=None, checkpoint_interval=None,
+                 resume=False, extend=False, config=None, cache=None):
+    """Run a backtest; with a ``cache.ResultCache`` an identical earlier run is returned from it instead.
+
+    The cache key covers strategy, settings, config, data and engine but not
+    the brokerage or checkpoints, so it only applies to plain runs with the
+    default fill model.
+    """
+    engine = LocalEngine(strategy_path, store, brokerage, overrides, object_store, checkpoint_interval, resume,
+                         extend, config)
+    if cache is None:
+        return engine.run()
+    if brokerage is not None or resume or extend:
+        raise ValueError("cached runs cannot use a custom brokerage, resume or extend")
+    key = run_key(engine.strategy_class, store, config)
+    result = cache.get(key)
+    if result is None:
+        result = engine.run()
+        cache.put(key, result)
+    return result
@@ -0,0 +1,94 @@
+"""Reader for the binary event log the v2 strategies write to the ObjectStore.
+
+A log under ``key`` is a ``<key>/meta`` JSON object (schema version, struct
+format, field names, symbol table, event type and signal bit names) plus
+numbered ``<key>/000000``, ``<key>/000001``, ... chunks of packed records.
+
+    from local_engine.algorithm_imports import ObjectStore
+    from local_engine.event_log import read_event_log
+
+    table = read_event_log(ObjectStore("object_store"), "v2-multi-symbol/events")
+    table.to_csv("events.csv")
+"""
+import csv
+import json
+from datetime import datetime, timedelta
+
+import numpy as np
+
+SUPPORTED_VERSIONS = (1,)
+EPOCH = datetime(1970, 1, 1)
+
+_STRUCT_DTYPES = {"q": "i8", "Q": "u8", "i": "i4", "I": "u4", "h": "i2", "H": "u2", "b": "i1", "B": "u1",
+                  "f": "f4", "d": "f8"}
+
+
+class EventTable:
+    """Columns of a decoded event log; ``records`` is the raw structured array."""
+
+    def __init__(self, records, meta):
+        self.records = records
+        self.meta = meta
+        self.symbols = meta["symbols"]
+        self.event_names = {int(code): name for code, name in meta["event_types"].items()}
+        self.signal_bits = meta["signal_bits"]
+
+    def __len__(self):
+        return len(self.records)
+
+    @property
+    def times(self):
+        return [EPOCH + timedelta(microseconds=int(us)) for us in self.records["time_us"]]
+
+    def signals(self, mask):
+        """``active_signals``-style names of a combo bitmask."""
+        return [name for name, bit in self.signal_bits.items() if mask & bit]
+
+    def rows(self):
+        """One dict per record with symbol, event type and signals decoded."""
+        symbols, event_names = self.symbols, self.event_names
+        for record, time in zip(self.records, self.times):
+            yield {
+                "time": time,
+                "symbol": symbols[record["symbol_id"]],
+                "event": event_names.get(int(record["event_type"]), str(record["event_type"])),
+                "net_signal": float(record["net_signal"]),
+                "signals": ", ".join(self.signals(int(record["combo_mask"]))),
+                "price": float(record["price"]),
+                "quantity": float(record["quantity"]),
+            }
+
+    def to_csv(self, path):
+        with open(path, "w", newline="") as handle:
+            writer = csv.DictWriter(handle, ["time", "symbol", "event", "net_signal", "signals", "price", "quantity"])
+            writer.writeheader()
+            writer.writerows(self.rows())
+
+    def to_dataframe(self):
+        """The decoded rows as a pandas ``DataFrame`` (needs pandas)."""
+        import pandas as pd
+        return pd.DataFrame(list(self.rows()))
+
+
+def record_dtype(meta):
+    fmt = meta["format"]
+    codes = fmt[1:] if fmt[0] in "<>=!@" else fmt
+    if len(codes) != len(meta["fields"]):
+        raise ValueError(f"event log format {fmt!r} does not match fields {meta['fields']}")
+    return np.dtype([(name, "<" + _STRUCT_DTYPES[code]) for name, code in zip(meta["fields"], codes)])
+
+
+def read_event_log(object_store, key):
+    meta = json.loads(object_store.read(f"{key}/meta"))
+    if meta["version"] not in SUPPORTED_VERSIONS:
+        raise ValueError(f"unsupported event log version {meta['version']}")
+    dtype = record_dtype(meta)
+    chunks = []
+    index = 0
+    while object_store.contains_key(f"{key}/{index:06d}"):
+        chunks.append(object_store.read_bytes(f"{key}/{index:06d}"))
+        index += 1
+    data = b"".join(chunks)
+    if len(data) % dtype.itemsize:
+        raise ValueError(f"event log {key!r} ends in a partial record")
+    return EventTable(np.frombuffer(data, dtype=dtype), meta)
@@ -0,0 +1,140 @@
+"""Queued order execution for strategies that emit order intents.
+
+``ExecutionWorker`` replaces the strategy's ``InlineExecution``: ``submit`` only
+enqueues the intent, and worker threads call ``algorithm.execute_intent`` (the
+liquidate / set_holdings / trailing stop / cancel sequence) off the signal loop.
+The queue holds at most one intent per symbol — a newer intent for a symbol
+that has not started executing supersedes the queued one — and at most
+``capacity`` symbols. Outcomes come back as ``ExecutionReport`` objects that
+the strategy drains at the top of ``OnData``.
+
+``execute_intent`` mutates strategy state (lots, trailing stop ids, the
+portfolio), so it runs under the same strategy lock as ``OnData``. What the
+worker buys is separating bar ingestion from broker waits, not parallel
+execution: the lock is only given up while a synchronous market order waits
+for its fill. One thread is the default; more threads only overlap those
+fill waits, with each sequence's non-waiting steps still serialized.
+"""
+import collections
+import contextlib
+import sys
+import threading
+
+
+class ExecutionWorker:
+    """Bounded, coalescing execution queue served by ``threads`` worker threads.
+
+    Intents of the same symbol never execute concurrently and keep their
+    order. When the queue is full, ``submit`` blocks for up to ``timeout``
+    seconds (``None`` waits indefinitely, ``0`` never waits) and then rejects
+    the intent with a ``REJECTED`` report. ``lock`` is the strategy lock the
+    caller holds while submitting (the live runner's); it is taken around
+    every ``execute_intent`` call and released while a full queue blocks the
+    caller, so the workers can drain it. Extra ``threads`` help only with a
+    broker whose fill waits are long (see the module docstring).
+    """
+
+    def __init__(self, algorithm, capacity=1024, threads=1, timeout=None, lock=None):
+        self.algorithm = algorithm
+        self.capacity = capacity
+        self.timeout = timeout
+        self.lock = lock
+        self.submitted = 0
+        self.coalesced = 0
+        self.rejected = 0
+        self.executed = 0
+        self._pending = collections.OrderedDict()
+        self._in_flight = set()
+        self._reports = collections.deque()
+        self._condition = threading.Condition()
+        self._closing = False
+        self._report_class = sys.modules[type(algorithm).__module__].ExecutionReport
+        self._threads = [threading.Thread(target=self._run, name=f"execution-{i}", daemon=True) for i in range(threads)]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, intent):
+        with self._condition:
+            self.submitted += 1
+            if intent.symbol in self._pending:
+                self._pending[intent.symbol] = intent
+                self.coalesced += 1
+                return True
+            if len(self._pending) >= self.capacity and not self._wait_for_space():
+                self.rejected += 1
+                self._reports.append(self._report(intent, self._report_class.REJECTED, f"execution queue full ({self.capacity} symbols pending)"))
+                return False
+            self._pending[intent.symbol] = intent
+            self._condition.notify_all()
+            return True
+
+    def _wait_for_space(self):
+        if self.timeout == 0:
+            return False
+        if self.lock is not None:
+            self.lock.release()
+        try:
+            has_space = self._condition.wait_for(lambda: len(self._pending) < self.capacity or self._closing, self.timeout)
+        finally:
+            if self.lock is not None:
+                self._condition.release()
+                self.lock.acquire()
+                self._condition.acquire()
+        return has_space and not self._closing
+
+    def drain_reports(self):
+        reports = []
+        popleft = self._reports.popleft
+        while self._reports:
+            reports.append(popleft())
+        return reports
+
+    @property
+    def pending(self):
+        with self._condition:
+            return len(self._pending) + len(self._in_flight)
+
+    def join(self):
+        """Wait until every queued intent has executed."""
+        with self._condition:
+            self._condition.wait_for(lambda: not self._pending and not self._in_flight)
+
+    def close(self):
+        self.join()
+        with self._condition:
+            self._closing = True
+            self._condition.notify_all()
+        for thread in self._threads:
+            thread.join()
+
+    def _next_intent(self):
+        for symbol in self._pending:
+            if symbol not in self._in_flight:
+                self._in_flight.add(symbol)
+                return self._pending.pop(symbol)
+        return None
+
+    def _run(self):
+        condition = self._condition
+        while True:
+            with condition:
+                intent = self._next_intent()
+                while intent is None:
+                    if self._closing:
+                        return
+                    condition.wait()
+                    intent = self._next_intent()
+                condition.notify_all()
+            try:
+                with self.lock if self.lock is not None else contextlib.nullcontext():
+                    report = self.algorithm.execute_intent(intent)
+            except Exception as error:
+                report = self._report(intent, self._report_class.FAILED, repr(error))
+            with condition:
+                self._in_flight.discard(intent.symbol)
+                self.executed += 1
+                self._reports.append(report)
+                condition.notify_all()
+
+    def _report(self, intent, status, message):
+        return self._report_class(intent, status, message)
@@ -0,0 +1,134 @@
+"""Socket bar feed: a compact framed wire format, a replay server and a client.
+
+Every frame is ``<length:u32><kind:u8><payload>``. The server first sends a
+SYMBOLS frame (newline separated tickers), then one BARS frame per timestamp
+(``<epoch:i64><count:u32>`` followed by ``count`` records of
+``<symbol index:u32><open><high><low><close><volume>`` as float64) and finally
+an END frame. The replay server is the local stand-in for a live data vendor.
+"""
+import asyncio
+import struct
+import time
+
+import numpy as np
+
+FRAME_HEADER = struct.Struct("<IB")
+BARS_HEADER = struct.Struct("<qI")
+BAR_RECORD = struct.Struct("<Iddddd")
+
+SYMBOLS = 1
+BARS = 2
+END = 3
+
+
+def encode_frame(kind, payload=b""):
+    return FRAME_HEADER.pack(len(payload), kind) + payload
+
+
+def encode_bars(epoch, records):
+    """``records`` is a sequence of ``(symbol index, open, high, low, close, volume)``."""
+    pack = BAR_RECORD.pack
+    return encode_frame(BARS, BARS_HEADER.pack(epoch, len(records)) + b"".join(pack(*record) for record in records))
+
+
+def decode_bars(payload):
+    epoch, count = BARS_HEADER.unpack_from(payload)
+    return epoch, list(BAR_RECORD.iter_unpack(memoryview(payload)[BARS_HEADER.size:BARS_HEADER.size + count * BAR_RECORD.size]))
+
+
+class ReplayServer:
+    """Serves the bars of a ``BarStore`` over TCP, one timestamp every ``interval`` seconds.
+
+    Each connection gets its own replay from the first bar; ``interval=0``
+    streams as fast as the client reads.
+    """
+
+    def __init__(self, store, symbols=None, interval=1.0, host="127.0.0.1", port=0):
+        self.store = store
+        self.symbols = list(symbols or store.symbols())
+        self.interval = interval
+        self.host = host
+        self.port = port
+        self._server = None
+        self._frames = None
+
+    def _build_frames(self):
+        series = [self.store.load(symbol) for symbol in self.symbols]
+        times = np.unique(np.concatenate([s.time for s in series]))
+        cursors = [0] * len(series)
+        frames = []
+        for epoch in times.tolist():
+            records = []
+            for index, s in enumerate(series):
+                cursor = cursors[index]
+                if cursor < len(s.time) and s.time[cursor] == epoch:
+                    records.append((index, s.open[cursor], s.high[cursor], s.low[cursor], s.close[cursor], s.volume[cursor]))
+                    cursors[index] = cursor + 1
+            frames.append(encode_bars(epoch, records))
+        return frames
+
+    async def start(self):
+        self._frames = self._build_frames()
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self.host, self.port
+
+    async def _serve(self, reader, writer):
+        try:
+            writer.write(encode_frame(SYMBOLS, "\n".join(self.symbols).encode()))
+            await writer.drain()
+            next_tick = time.perf_counter()
+            for frame in self._frames:
+                if self.interval:
+                    next_tick += self.interval
+                    await asyncio.sleep(max(next_tick - time.perf_counter(), 0.0))
+                writer.write(frame)
+                await writer.drain()
+            writer.write(encode_frame(END))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+
+class FeedClient:
+    """Async iterator over ``(received_at, epoch, [(ticker, open, high, low, close, volume), ...])``.
+
+    ``received_at`` is ``time.perf_counter()`` when the frame was decoded.
+    """
+
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.symbols = []
+
+    async def frames(self):
+        reader, writer = await asyncio.open_connection(self.host, self.port)
+        try:
+            while True:
+                length, kind = FRAME_HEADER.unpack(await reader.readexactly(FRAME_HEADER.size))
+                payload = await reader.readexactly(length) if length else b""
+                if kind == SYMBOLS:
+                    self.symbols = payload.decode().split("\n")
+                elif kind == BARS:
+                    received_at = time.perf_counter()
+                    epoch, records = decode_bars(payload)
+                    symbols = self.symbols
+                    yield received_at, epoch, [(symbols[record[0]],) + record[1:] for record in records]
+                elif kind == END:
+                    return
+        finally:
+            writer.close()
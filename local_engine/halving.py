@@ -0,0 +1,168 @@
+"""Successive halving and hyperband sweeps over strategy configs.
+
+``SuccessiveHalving`` runs every candidate over the first ``min_budget`` of
+the backtest span in one ``MultiEngine`` pass, keeps the best ``1 / eta`` by
+``objective`` on the equity so far, and extends the survivors by a factor of
+``eta`` per rung until the last rung covers the full span. Survivors are
+never re-run: the engine keeps their state (indicators, positions, open
+stops, statistics) between rungs and steps only them from where the previous
+rung stopped, and pooled indicators only losers used stop updating.
+``hyperband`` runs several halving brackets that trade the number of
+candidates against the length of the first rung.
+
+With a ``cache.ResultCache`` candidates whose full-span run is cached are
+dropped from the engine at the start; at each rung they are scored on their
+cached equity up to the rung's time. Survivors that ran to the end are
+stored.
+"""
+import bisect
+import itertools
+import math
+import random
+
+import numpy as np
+
+from .cache import run_key
+from .data import from_epoch
+from .loader import load_strategy, strategy_config
+from .metrics import total_return
+from .multi import MultiEngine
+
+
+def config_grid(**axes):
+    """Every combination of ``axes`` (field name -> values) as a list of field-change dicts."""
+    names = list(axes)
+    return [dict(zip(names, values)) for values in itertools.product(*(axes[name] for name in names))]
+
+
+class Rung:
+    """One rung: the timeline index it ran to and the ``(params, score)`` of every config still in the race."""
+
+    def __init__(self, stop, time, scores):
+        self.stop = stop
+        self.time = time
+        self.scores = scores
+
+
+class HalvingResult:
+    """Rungs of a sweep and the full-span ``BacktestResult``\\ s of the final survivors, best first."""
+
+    def __init__(self, rungs, params, results, scores):
+        self.rungs = rungs
+        order = sorted(range(len(results)), key=lambda i: scores[i], reverse=True)
+        self.params = [params[i] for i in order]
+        self.results = [results[i] for i in order]
+        self.scores = [scores[i] for i in order]
+        self.steps = sum(len(rung.scores) * (rung.stop - previous.stop if previous else rung.stop)
+                         for previous, rung in zip([None] + rungs[:-1], rungs))
+
+    @property
+    def best_params(self):
+        return self.params[0]
+
+    @property
+    def best(self):
+        return self.results[0]
+
+    @property
+    def best_score(self):
+        return self.scores[0]
+
+
+class SuccessiveHalving:
+    """Successive halving of ``grid`` (field-change dicts) for ``strategy``.
+
+    The first rung covers ``min_budget`` of the live bars; each later rung
+    ``eta`` times as many and keeps the top ``1 / eta`` (at least one) of the
+    configs, until the last rung reaches the end. ``objective`` scores an
+    equity array (higher is better). ``base`` holds field changes applied to
+    every candidate; ``overrides`` go to the loader. ``cache`` is a
+    ``cache.ResultCache`` (see the module docstring).
+    """
+
+    def __init__(self, strategy, store, grid, min_budget=1 / 9, eta=3, objective=total_return, base=None,
+                 overrides=None, cache=None):
+        if eta <= 1:
+            raise ValueError("eta must be greater than 1")
+        if not 0 < min_budget <= 1:
+            raise ValueError("min_budget must be in (0, 1]")
+        self.strategy_class = load_strategy(strategy, overrides) if isinstance(strategy, str) else strategy
+        self.store = store
+        self.grid = [dict(params) for params in grid]
+        self.min_budget = min_budget
+        self.eta = eta
+        self.objective = objective
+        self.base = dict(base or {})
+        self.cache = cache
+
+    def budgets(self):
+        """Fraction of the live span each rung runs to."""
+        budgets = []
+        budget = self.min_budget
+        while budget < 1 - 1e-9:
+            budgets.append(budget)
+            budget *= self.eta
+        return budgets + [1.0]
+
+    def run(self):
+        configs = [strategy_config(self.strategy_class, **dict(self.base, **params)) for params in self.grid]
+        engine = MultiEngine(self.strategy_class, self.store, configs)
+        engine.start()
+        cached, keys = {}, {}
+        if self.cache is not None:
+            keys = {i: run_key(self.strategy_class, self.store, config) for i, config in enumerate(configs)}
+            for i, key in keys.items():
+                result = self.cache.get(key)
+                if result is not None:
+                    cached[i] = result
+                    engine.drop(i)
+        active = list(range(len(configs)))
+        live = len(engine.times) - engine.first_live
+        rungs = []
+        for budget in self.budgets():
+            stop = engine.first_live + max(int(math.ceil(live * budget)), 1)
+            engine.advance(stop)
+            time = from_epoch(int(engine.times[engine.index - 1])) if live else None
+            scores = {}
+            for i in active:
+                if i in cached:
+                    result = cached[i]
+                    equity = result.equity[:bisect.bisect_right(result.equity_times, time)] if live else []
+                else:
+                    equity = engine.equity[i]
+                scores[i] = self.objective(np.asarray(equity))
+            rungs.append(Rung(engine.index, time, [(self.grid[i], scores[i]) for i in active]))
+            if engine.index >= len(engine.times):
+                break
+            keep = max(len(active) // self.eta, 1)
+            survivors = set(sorted(active, key=scores.get, reverse=True)[:keep])
+            for i in [i for i in engine.active if i not in survivors]:
+                engine.drop(i)
+            active = [i for i in active if i in survivors]
+        ran = dict(zip(engine.active, engine.finish()))
+        for i, result in ran.items():
+            if self.cache is not None:
+                self.cache.put(keys[i], result)
+        results = [cached[i] if i in cached else ran[i] for i in active]
+        return HalvingResult(rungs, [self.grid[i] for i in active], results, [scores[i] for i in active])
+
+
+def hyperband(strategy, store, grid, max_rungs=3, eta=3, objective=total_return, base=None, overrides=None, seed=0,
+              cache=None):
+    """Hyperband over ``grid``: halving brackets from ``max_rungs`` rungs down to one full-span run.
+
+    Bracket ``s`` samples ``ceil(max_rungs / (s + 1) * eta ** s)`` configs from
+    the grid (all of it when that is more) with a ``seed``-ed RNG and starts
+    them at ``eta ** -s`` of the span. Returns the brackets' ``HalvingResult``\\ s
+    and the best ``(params, score)`` overall.
+    """
+    strategy_class = load_strategy(strategy, overrides) if isinstance(strategy, str) else strategy
+    rng = random.Random(seed)
+    brackets = []
+    for s in reversed(range(max_rungs)):
+        n_configs = min(int(math.ceil(max_rungs / (s + 1) * eta ** s)), len(grid))
+        sample = rng.sample(grid, n_configs)
+        brackets.append(SuccessiveHalving(strategy_class, store, sample, eta ** -s, eta, objective, base,
+                                          cache=cache).run())
+    best = max(brackets, key=lambda bracket: bracket.best_score)
+    return brackets, (best.best_params, best.best_score)
@@ -0,0 +1,303 @@
+"""Per-stage latency instrumentation for the bar-to-order path.
+
+``Instrumentation.attach`` wraps, on one algorithm instance, the stages a bar
+goes through on its way to an order:
+
+- ``indicators``: the symbol's indicator updates for the bar
+- every ``check_*`` signal method and ``calculate_net_signal_value``
+- ``order_construction``: ``execute_intent`` (liquidate / set_holdings /
+  trailing stop sequence), minus the time spent waiting for fills
+- ``order_submission``: each ``brokerage.submit`` call
+- ``order_fill_wait``: each ``brokerage.wait_for_fill`` call, i.e. how long a
+  synchronous market order blocked until the broker filled it (up to
+  ``MARKET_ORDER_FILL_TIMEOUT``)
+- ``bar_to_order``: from the start of the bar's indicator update to the
+  first order submitted for that symbol
+
+Timings go into fixed-size log-linear histograms, so memory does not grow
+with run length. Nothing is wrapped until ``attach`` is called and
+``detach`` restores the original methods, so a run without instrumentation
+pays nothing.
+"""
+import json
+import threading
+import time
+
+# Values below 2 ** (SUB_BUCKET_BITS + 1) ns are counted exactly; above that
+# every power of two is split into 2 ** SUB_BUCKET_BITS buckets (~3% error).
+SUB_BUCKET_BITS = 5
+MAX_TRACKABLE_NS = 2 ** 40 - 1  # ~18 minutes
+
+_SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+_LINEAR_LIMIT = _SUB_BUCKETS << 1
+
+SIGNAL_METHODS = (
+    "check_moving_average_crossovers",
+    "check_stochrsi_crossovers",
+    "check_lbr_crossovers",
+    "check_mfi_crossovers",
+    "check_volume_spikes",
+    "calculate_net_signal_value",
+)
+
+
+class LatencyHistogram:
+    """HDR-style histogram of nanosecond latencies in a fixed number of buckets."""
+
+    __slots__ = ("counts", "count", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * (bucket_index(MAX_TRACKABLE_NS) + 1)
+        self.reset()
+
+    def reset(self):
+        counts = self.counts
+        for i in range(len(counts)):
+            counts[i] = 0
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+
+    def record(self, value):
+        if value < 0:
+            value = 0
+        elif value > MAX_TRACKABLE_NS:
+            value = MAX_TRACKABLE_NS
+        self.counts[value if value < _LINEAR_LIMIT else bucket_index(value)] += 1
+        self.count += 1
+        self.total += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def merge(self, other):
+        counts = self.counts
+        for i, n in enumerate(other.counts):
+            if n:
+                counts[i] += n
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None and (self.min is None or other.min < self.min):
+            self.min = other.min
+        self.max = max(self.max, other.max)
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the ``q``-th percentile, in nanoseconds."""
+        if not self.count:
+            return None
+        rank = max(int(q / 100.0 * self.count + 0.5), 1)
+        seen = 0
+        for index, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return min(bucket_upper(index), self.max)
+        return self.max
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else None
+
+
+def bucket_index(value):
+    if value < _LINEAR_LIMIT:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return _LINEAR_LIMIT + (shift - 1) * _SUB_BUCKETS + (value >> shift) - _SUB_BUCKETS
+
+
+def bucket_upper(index):
+    if index < _LINEAR_LIMIT:
+        return index
+    shift, sub = divmod(index - _LINEAR_LIMIT, _SUB_BUCKETS)
+    shift += 1
+    return ((sub + _SUB_BUCKETS + 1) << shift) - 1
+
+
+class Instrumentation:
+    """Stage timers for one algorithm, reported every ``summary_interval`` seconds.
+
+    ``sink`` receives the formatted summary (default: ``algorithm.log``).
+    With ``per_symbol`` every stage also keeps one histogram per symbol;
+    memory is then bounded by universe size times the stage count.
+    ``reset_on_summary`` makes each periodic summary cover only its interval.
+    """
+
+    def __init__(self, algorithm, summary_interval=None, sink=None, per_symbol=False, reset_on_summary=False,
+                 clock=time.perf_counter_ns):
+        self.algorithm = algorithm
+        self.summary_interval = summary_interval
+        self.sink = sink
+        self.per_symbol = per_symbol
+        self.reset_on_summary = reset_on_summary
+        self.clock = clock
+        self.stages = {}
+        self.symbol_stages = {}
+        self._bar_started = {}
+        self._fill_waits = threading.local()
+        self._originals = []
+        self._next_summary = None
+
+    # Wiring
+
+    def attach(self):
+        if self._originals:
+            return self
+        algorithm = self.algorithm
+        for name in SIGNAL_METHODS:
+            method = getattr(algorithm, name, None)
+            if method is not None:
+                self._replace(algorithm, name, self._timed_signal(name, method))
+        execute_intent = getattr(algorithm, "execute_intent", None)
+        if execute_intent is not None:
+            self._replace(algorithm, "execute_intent", self._timed_intent(execute_intent))
+        brokerage = algorithm._brokerage
+        if brokerage is not None:
+            self._replace(brokerage, "submit", self._timed_submit(brokerage.submit))
+            self._replace(brokerage, "wait_for_fill", self._timed_fill_wait(brokerage.wait_for_fill))
+        updates = algorithm._indicator_updates
+        for symbol, callbacks in list(updates.items()):
+            self._replace(updates, symbol, [self._timed_indicators(symbol, list(callbacks))], item=True)
+        if self.summary_interval:
+            self._next_summary = time.monotonic() + self.summary_interval
+        return self
+
+    def detach(self):
+        for target, name, original, item in reversed(self._originals):
+            if item:
+                target[name] = original
+            elif original is None:
+                delattr(target, name)
+            else:
+                setattr(target, name, original)
+        self._originals = []
+        self._bar_started.clear()
+
+    def _replace(self, target, name, replacement, item=False):
+        if item:
+            self._originals.append((target, name, target[name], True))
+            target[name] = replacement
+        else:
+            self._originals.append((target, name, target.__dict__.get(name), False))
+            setattr(target, name, replacement)
+
+    # Recording
+
+    def record(self, stage, symbol, elapsed):
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            histogram = self.stages[stage] = LatencyHistogram()
+        histogram.record(elapsed)
+        if self.per_symbol:
+            key = (symbol, stage)
+            histogram = self.symbol_stages.get(key)
+            if histogram is None:
+                histogram = self.symbol_stages[key] = LatencyHistogram()
+            histogram.record(elapsed)
+
+    def _timed_indicators(self, symbol, callbacks):
+        clock, record = self.clock, self.record
+        def update(bar):
+            started = clock()
+            self._bar_started[symbol] = started
+            for callback in callbacks:
+                callback(bar)
+            record("indicators", symbol, clock() - started)
+            if self._next_summary is not None and time.monotonic() >= self._next_summary:
+                self._periodic_summary()
+        return update
+
+    def _timed_signal(self, name, method):
+        clock, record = self.clock, self.record
+        def timed(symbol, *args):
+            started = clock()
+            try:
+                return method(symbol, *args)
+            finally:
+                record(name, symbol, clock() - started)
+        return timed
+
+    def _timed_intent(self, method):
+        clock, record = self.clock, self.record
+        waits = self._fill_waits
+        def timed(intent):
+            waits.total = 0
+            started = clock()
+            try:
+                return method(intent)
+            finally:
+                record("order_construction", intent.symbol, clock() - started - waits.total)
+        return timed
+
+    def _timed_submit(self, method):
+        clock, record = self.clock, self.record
+        def timed(algorithm, order):
+            started = clock()
+            bar_started = self._bar_started.pop(order.symbol, None)
+            if bar_started is not None:
+                record("bar_to_order", order.symbol, started - bar_started)
+            try:
+                return method(algorithm, order)
+            finally:
+                record("order_submission", order.symbol, clock() - started)
+        return timed
+
+    def _timed_fill_wait(self, method):
+        clock, record = self.clock, self.record
+        waits = self._fill_waits
+        def timed(algorithm, order, timeout):
+            started = clock()
+            try:
+                return method(algorithm, order, timeout)
+            finally:
+                elapsed = clock() - started
+                record("order_fill_wait", order.symbol, elapsed)
+                waits.total = getattr(waits, "total", 0) + elapsed
+        return timed
+
+    # Reporting
+
+    def summary(self, symbol=None):
+        """``{stage: {count, mean_us, p50_us, p90_us, p99_us, p999_us, max_us}}``, all stages or one symbol's."""
+        if symbol is None:
+            histograms = self.stages
+        else:
+            histograms = {stage: h for (sym, stage), h in self.symbol_stages.items() if sym == symbol}
+        result = {}
+        for stage, histogram in histograms.items():
+            if not histogram.count:
+                continue
+            result[stage] = {
+                "count": histogram.count,
+                "mean_us": histogram.mean / 1000.0,
+                "p50_us": histogram.percentile(50) / 1000.0,
+                "p90_us": histogram.percentile(90) / 1000.0,
+                "p99_us": histogram.percentile(99) / 1000.0,
+                "p999_us": histogram.percentile(99.9) / 1000.0,
+                "max_us": histogram.max / 1000.0,
+            }
+        return result
+
+    def format_summary(self, symbol=None):
+        rows = self.summary(symbol)
+        lines = [f"{'stage':<34} {'count':>9} {'mean us':>9} {'p50 us':>9} {'p99 us':>9} {'p99.9 us':>9} {'max us':>10}"]
+        for stage, row in rows.items():
+            lines.append(f"{stage:<34} {row['count']:9d} {row['mean_us']:9.1f} {row['p50_us']:9.1f} "
+                         f"{row['p99_us']:9.1f} {row['p999_us']:9.1f} {row['max_us']:10.1f}")
+        return "\n".join(lines)
+
+    def to_json(self, symbol=None):
+        return json.dumps(self.summary(symbol), sort_keys=True)
+
+    def reset(self):
+        for histogram in self.stages.values():
+            histogram.reset()
+        for histogram in self.symbol_stages.values():
+            histogram.reset()
+
+    def _periodic_summary(self):
+        self._next_summary = time.monotonic() + self.summary_interval
+        (self.sink or self.algorithm.log)(self.format_summary())
+        if self.reset_on_summary:
+            self.reset()
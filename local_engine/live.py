@@ -0,0 +1,225 @@
+"""Asyncio live runner: drives a strategy file from a socket bar feed.
+
+With ``execution="worker"`` (the default for strategies that emit order
+intents) bars go through one asyncio queue to a single step thread, which
+applies them in feed order and runs ``OnData``, and the strategy's orders go
+through an ``ExecutionWorker``: broker latency never reaches the signal
+loop. The worker executes under the strategy lock too, so it separates
+ingestion from broker waits; ``execution_threads`` above one only overlap
+fill waits. A step waiting for that lock, or for room in a full execution
+queue, holds up later steps but never the event loop, which keeps reading
+frames. With ``execution="inline"`` the strategy places its orders
+synchronously, as on LEAN where market orders block until the broker
+acknowledges them; bars are then routed to one asyncio queue per symbol and
+each step runs on one of ``workers`` threads, so a slow ack only stalls the
+symbol that placed the order.
+
+Orders go to a ``PaperBrokerage`` whose acknowledgements and fills arrive
+``ack_latency`` seconds later on its scheduler thread. All strategy callbacks,
+fills included, run under one strategy lock, which is released while a thread
+waits for a synchronous market order to fill.
+"""
+import asyncio
+import contextlib
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .algorithm_imports import TradeBar
+from .brokerage import PaperBrokerage
+from .checkpoint import Checkpointer
+from .data import from_epoch
+from .execution import ExecutionWorker
+from .feed import FeedClient
+from .instrumentation import Instrumentation
+from .loader import load_strategy
+
+# Per-bar scratch attributes a step reads back after an order call; they are
+# restored after every fill wait so another thread cannot clobber them.
+STEP_STATE = ("_time", "_warming_up", "active_signals")
+
+
+def percentile(samples, q):
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return ordered[min(int(q / 100.0 * len(ordered)), len(ordered) - 1)]
+
+
+class LiveReport:
+    def __init__(self, frames, bars, orders, bar_latency, step_latency, order_latency, wall_time):
+        self.frames = frames
+        self.bars = bars
+        self.orders = orders
+        self.bar_latency = bar_latency
+        self.step_latency = step_latency
+        self.order_latency = order_latency
+        self.wall_time = wall_time
+
+    def summary(self):
+        def ms(samples, q):
+            value = percentile(samples, q)
+            return "n/a" if value is None else f"{value * 1000.0:.2f} ms"
+        return (f"frames={self.frames} bars={self.bars} orders={self.orders} wall={self.wall_time:.1f}s | "
+                f"bar-to-order p50={ms(self.order_latency, 50)} p99={ms(self.order_latency, 99)} | "
+                f"bar processed p50={ms(self.bar_latency, 50)} p99={ms(self.bar_latency, 99)} | "
+                f"signal step p50={ms(self.step_latency, 50)} p99={ms(self.step_latency, 99)}")
+
+
+class LiveRunner:
+    """Runs ``strategy`` against the feed at ``host``:``port``.
+
+    ``brokerage`` is a ``PaperBrokerage`` factory taking the runner's
+    ``lock``, ``release`` and ``on_submit`` hooks as keyword arguments; by
+    default a paper broker that only adds ``ack_latency`` is used. With
+    ``instrument`` the runner attaches per-stage latency histograms
+    (``self.instrumentation``) that log a summary every ``summary_interval``
+    seconds. ``history`` is a bar store the strategy can seed indicators from
+    with ``warm_up_indicator``. ``config`` becomes the algorithm's ``config``
+    before ``Initialize``.
+
+    With ``checkpoint_interval`` the runner writes a checkpoint every that
+    many bars to ``object_store`` (the algorithm's ObjectStore by default;
+    pass a directory-backed one to survive a restart). With ``resume`` it
+    first restores the stored checkpoint, skips the warm-up and ignores feed
+    bars at or before the checkpoint's time.
+    """
+
+    def __init__(self, strategy, host, port, overrides=None, ack_latency=0.0, execution=None,
+                 workers=256, execution_threads=1, queue_capacity=1024, warm_up_frames=None, brokerage=None,
+                 instrument=False, summary_interval=None, history=None, object_store=None, checkpoint_interval=None,
+                 resume=False, config=None):
+        strategy_class = load_strategy(strategy, overrides) if isinstance(strategy, str) else strategy
+        if execution is None:
+            execution = "worker" if hasattr(strategy_class, "execute_intent") else "inline"
+        self.algorithm = strategy_class()
+        self._lock = threading.Lock()
+        if brokerage is None:
+            brokerage = functools.partial(PaperBrokerage, latency=ack_latency)
+        self.brokerage = brokerage(lock=self._lock, release=self._released, on_submit=self._order_submitted)
+        self.algorithm._attach_brokerage(self.brokerage)
+        self.execution = None
+        if execution == "worker":
+            self.execution = ExecutionWorker(self.algorithm, queue_capacity, execution_threads, lock=self._lock)
+            self.algorithm.execution = self.execution
+        self.algorithm.history_provider = history
+        if config is not None:
+            self.algorithm.config = config
+        if object_store is not None:
+            self.algorithm.object_store = object_store
+        self.algorithm.Initialize()
+        self.checkpointer = None
+        self.resumed_from = None
+        if checkpoint_interval or resume:
+            self.checkpointer = Checkpointer(self.algorithm, interval=checkpoint_interval, lock=self._lock)
+            if resume and self.checkpointer.restore():
+                self.resumed_from = self.algorithm.time
+                warm_up_frames = 0
+        self.instrumentation = Instrumentation(self.algorithm, summary_interval).attach() if instrument else None
+        self.host = host
+        self.port = port
+        self.workers = workers
+        self.warm_up_frames = self.algorithm.warm_up_bars if warm_up_frames is None else warm_up_frames
+        self.bar_latency = []
+        self.step_latency = []
+        self.order_latency = []
+        self._received = {}
+        self._orders = 0
+
+    def _order_submitted(self, order):
+        received_at = self._received.pop(order.symbol, None)
+        if received_at is not None:
+            self.order_latency.append(time.perf_counter() - received_at)
+        self._orders += 1
+
+    @contextlib.contextmanager
+    def _released(self):
+        algorithm = self.algorithm
+        state = [getattr(algorithm, name, None) for name in STEP_STATE]
+        self._lock.release()
+        try:
+            yield
+        finally:
+            self._lock.acquire()
+            for name, value in zip(STEP_STATE, state):
+                setattr(algorithm, name, value)
+
+    def _step(self, received_at, bar, warming_up):
+        with self._lock:
+            started = time.perf_counter()
+            self._received[bar.Symbol] = received_at
+            self.algorithm._step(bar.EndTime, {bar.Symbol: bar}, warming_up)
+            if self.checkpointer is not None and not warming_up:
+                self.checkpointer.step()
+            finished = time.perf_counter()
+            self.step_latency.append(finished - started)
+            self.bar_latency.append(finished - received_at)
+
+    def _steps(self, batch):
+        for received_at, bar, warming_up in batch:
+            self._step(received_at, bar, warming_up)
+
+    async def _drain(self, queue, pool):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Everything queued while the previous batch ran goes to the pool in one hop.
+            batch = [await queue.get()]
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                await loop.run_in_executor(pool, self._steps, batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+
+    async def _consume(self, dispatch):
+        symbols = {str(symbol): symbol for symbol in self.algorithm.securities}
+        frames = bars = 0
+        async for received_at, epoch, records in FeedClient(self.host, self.port).frames():
+            warming_up = frames < self.warm_up_frames
+            end_time = from_epoch(epoch)
+            if self.resumed_from is not None and end_time <= self.resumed_from:
+                continue
+            for ticker, open_, high, low, close, volume in records:
+                symbol = symbols.get(ticker)
+                if symbol is not None:
+                    dispatch(received_at, TradeBar(symbol, end_time, open_, high, low, close, volume), warming_up)
+                    bars += 1
+            frames += 1
+        return frames, bars
+
+    async def run(self):
+        started = time.perf_counter()
+        if self.execution is not None:
+            # One queue and one step thread keep bars in feed order off the event loop.
+            queues = {None: asyncio.Queue()}
+            route = lambda bar: None
+            threads = 1
+        else:
+            queues = {symbol: asyncio.Queue() for symbol in self.algorithm.securities}
+            route = lambda bar: bar.Symbol
+            threads = self.workers
+        with ThreadPoolExecutor(threads, thread_name_prefix="live-step") as pool:
+            tasks = [asyncio.create_task(self._drain(queue, pool)) for queue in queues.values()]
+            try:
+                frames, bars = await self._consume(lambda received_at, bar, warming_up: queues[route(bar)].put_nowait((received_at, bar, warming_up)))
+                await asyncio.gather(*(queue.join() for queue in queues.values()))
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+        if self.execution is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.execution.close)
+        await asyncio.get_running_loop().run_in_executor(None, self.brokerage.close)
+        if self.checkpointer is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.checkpointer.close)
+        with self._lock:
+            if self.execution is not None:
+                for report in self.execution.drain_reports():
+                    self.algorithm.on_execution_report(report)
+            on_end = getattr(self.algorithm, "OnEndOfAlgorithm", None)
+            if on_end is not None:
+                on_end()
+        return LiveReport(frames, bars, self._orders, self.bar_latency, self.step_latency, self.order_latency,
+                          time.perf_counter() - started)
@@ -0,0 +1,67 @@
+"""Loads the repo's strategy files (``v2 Multi Symbol.py`` etc.) for the local engine."""
+import importlib.util
+import itertools
+import os
+import re
+import sys
+
+from . import algorithm_imports
+
+_load_counter = itertools.count()
+_loaded = {}
+
+
+def install_algorithm_imports():
+    """Expose the local API shim as ``AlgorithmImports`` unless a real LEAN install provides it."""
+    sys.modules.setdefault("AlgorithmImports", algorithm_imports)
+
+
+def load_strategy_module(path, overrides=None):
+    """Execute a strategy file and return it as a fresh module.
+
+    ``overrides`` replaces module-level constants (``SYMBOLS``, ``MA_FAST_PERIOD``,
+    ...) before anything reads them; every call gets its own module object so
+    overrides never leak between loads.
+    """
+    install_algorithm_imports()
+    path = os.path.abspath(path)
+    stem = re.sub(r"\W+", "_", os.path.splitext(os.path.basename(path))[0]).strip("_").lower()
+    name = f"strategy_{stem}_{next(_load_counter)}"
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    for key, value in (overrides or {}).items():
+        if not hasattr(module, key):
+            raise AttributeError(f"{os.path.basename(path)} has no setting named {key}")
+        setattr(module, key, value)
+    return module
+
+
+def strategy_class(module):
+    """Return the single ``QCAlgorithm`` subclass defined in ``module``."""
+    classes = [value for value in vars(module).values()
+               if isinstance(value, type) and issubclass(value, algorithm_imports.QCAlgorithm)
+               and value is not algorithm_imports.QCAlgorithm and value.__module__ == module.__name__]
+    if len(classes) != 1:
+        raise ValueError(f"Expected exactly one QCAlgorithm subclass in {module.__name__}, found {len(classes)}")
+    return classes[0]
+
+
+def load_strategy(path, overrides=None):
+    """Shorthand for ``strategy_class(load_strategy_module(path, overrides))``."""
+    return strategy_class(load_strategy_module(path, overrides))
+
+
+def cached_strategy(path, overrides=None):
+    """``load_strategy`` once per process for each path and overrides, e.g. in pool workers."""
+    key = (os.path.abspath(path), repr(sorted((overrides or {}).items())))
+    strategy = _loaded.get(key)
+    if strategy is None:
+        strategy = _loaded[key] = load_strategy(path, overrides)
+    return strategy
+
+
+def strategy_config(strategy_class, **changes):
+    """The strategy's ``StrategyConfig`` from its module settings (overrides included), with ``changes`` by field name."""
+    return sys.modules[strategy_class.__module__].StrategyConfig.from_settings(**changes)
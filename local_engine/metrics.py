@@ -0,0 +1,28 @@
+"""Scores of an equity curve shared by the optimizers, stress tests and the warehouse.
+
+Each takes a sequence of equity values (one per bar) and returns a float.
+They are module-level functions, so they pickle by reference and can be
+passed to process pools as an ``objective``.
+"""
+import math
+
+import numpy as np
+
+
+def total_return(equity):
+    return equity[-1] / equity[0] - 1.0 if len(equity) > 1 and equity[0] else 0.0
+
+
+def sharpe_ratio(equity, periods_per_year=252):
+    """Annualized Sharpe ratio (zero risk-free rate) of the per-bar returns of ``equity``."""
+    returns = np.diff(equity) / equity[:-1] if len(equity) > 2 else np.empty(0)
+    deviation = returns.std() if len(returns) else 0.0
+    return float(returns.mean() / deviation * math.sqrt(periods_per_year)) if deviation > 0 else 0.0
+
+
+def max_drawdown(equity):
+    """Largest peak-to-trough loss of ``equity`` as a fraction of the peak."""
+    if len(equity) < 2:
+        return 0.0
+    equity = np.asarray(equity, dtype=np.float64)
+    return float((1.0 - equity / np.maximum.accumulate(equity)).max())
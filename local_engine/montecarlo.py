@@ -0,0 +1,131 @@
+"""Monte Carlo bootstrap of a backtest's closed trades.
+
+The strategy's ``trade_stats`` keep every closed lot's percent return per
+symbol and signal combination. ``bootstrap`` resamples a return sequence
+``samples`` times, iid or in blocks of ``block`` consecutive trades (which
+keeps streaks and serial correlation), and replays each resample as an
+equity curve. Each trade moves equity by ``fraction`` (the share of equity
+put into a position) times its return. Per resample it records final
+equity, maximum drawdown and win rate, and the result reports percentile
+confidence intervals of the three.
+
+Resamples are computed as NumPy arrays of ``rows x columns`` draws. Equity
+level, running peak and drawdown carry over from one column block to the
+next, so a chunk never holds more than about ``max_bytes`` whatever the
+trade count.
+"""
+import numpy as np
+
+ALL_TRADES = "ALL"
+METRICS = ("final_equity", "max_drawdown", "win_rate")
+
+
+def trade_returns(trade_stats):
+    """Fractional trade returns per signal combination, plus all trades under ``ALL_TRADES``.
+
+    Within a combination the trades of each symbol stay in close order, one
+    symbol after the other.
+    """
+    by_combo = {}
+    for combos in trade_stats.values():
+        for combo, stats in combos.items():
+            by_combo.setdefault(combo, []).extend(stats["returns"])
+    returns = {combo: np.asarray(values, dtype=np.float64) / 100.0 for combo, values in by_combo.items()}
+    returns[ALL_TRADES] = np.concatenate(list(returns.values())) if returns else np.empty(0)
+    return returns
+
+
+def _path_stats(returns, fraction, initial):
+    """Final equity, max drawdown and win rate of ``returns`` (2-D: one path per row)."""
+    equity = initial * np.cumprod(1.0 + fraction * returns, axis=1)
+    peak = np.maximum(np.maximum.accumulate(equity, axis=1), initial)
+    return equity[:, -1], (1.0 - equity / peak).max(axis=1), (returns > 0).mean(axis=1)
+
+
+class BootstrapResult:
+    """Per-resample ``final_equity``, ``max_drawdown`` and ``win_rate`` arrays, and the observed values."""
+
+    def __init__(self, n_trades, observed, final_equity, max_drawdown, win_rate):
+        self.n_trades = n_trades
+        self.observed = observed
+        self.final_equity = final_equity
+        self.max_drawdown = max_drawdown
+        self.win_rate = win_rate
+
+    @property
+    def samples(self):
+        return len(self.final_equity)
+
+    def interval(self, metric, level=0.95):
+        """Two-sided percentile interval of ``metric`` at confidence ``level``."""
+        tail = (1.0 - level) / 2.0
+        low, high = np.quantile(getattr(self, metric), (tail, 1.0 - tail))
+        return float(low), float(high)
+
+    def summary(self, level=0.95):
+        """``{metric: (observed, low, high)}`` for the three metrics."""
+        return {metric: (self.observed[metric],) + self.interval(metric, level) for metric in METRICS}
+
+
+def bootstrap(returns, samples=10000, block=1, fraction=0.25, initial=1.0, seed=0, max_bytes=1 << 26):
+    """Bootstrap ``returns`` (fractional trade returns, in trade order) ``samples`` times.
+
+    ``block`` > 1 draws moving blocks of that many consecutive trades (the
+    last block of a path is cut to length). Each chunk of draws is kept under
+    about ``max_bytes``. ``seed`` and ``max_bytes`` together fix the draws.
+    """
+    returns = np.asarray(returns, dtype=np.float64)
+    n = len(returns)
+    if n == 0:
+        empty = np.empty(0)
+        return BootstrapResult(0, dict.fromkeys(METRICS, float("nan")), empty, empty, empty)
+    block = min(max(int(block), 1), n)
+    final, drawdown, wins = _path_stats(returns[None, :], fraction, initial)
+    observed = {"final_equity": float(final[0]), "max_drawdown": float(drawdown[0]), "win_rate": float(wins[0])}
+    rng = np.random.default_rng(seed)
+    # About four float64 arrays of the chunk's shape are alive at once.
+    cells = max(max_bytes // 32, block)
+    columns = min(n, max(cells // min(samples, 1024), block) // block * block)
+    rows = max(min(samples, cells // columns), 1)
+    final_equity = np.empty(samples)
+    max_drawdown = np.empty(samples)
+    win_rate = np.empty(samples)
+    for row in range(0, samples, rows):
+        count = min(rows, samples - row)
+        level = np.full(count, float(initial))
+        peak = level.copy()
+        worst = np.zeros(count)
+        won = np.zeros(count)
+        for column in range(0, n, columns):
+            width = min(columns, n - column)
+            if block == 1:
+                index = rng.integers(n, size=(count, width))
+            else:
+                starts = rng.integers(n - block + 1, size=(count, -(-width // block)))
+                index = (starts[:, :, None] + np.arange(block)).reshape(count, -1)[:, :width]
+            drawn = returns[index]
+            equity = level[:, None] * np.cumprod(1.0 + fraction * drawn, axis=1)
+            running = np.maximum(np.maximum.accumulate(equity, axis=1), peak[:, None])
+            worst = np.maximum(worst, (1.0 - equity / running).max(axis=1))
+            won += (drawn > 0).sum(axis=1)
+            level = equity[:, -1]
+            peak = running[:, -1]
+        final_equity[row:row + count] = level
+        max_drawdown[row:row + count] = worst
+        win_rate[row:row + count] = won / n
+    return BootstrapResult(n, observed, final_equity, max_drawdown, win_rate)
+
+
+def bootstrap_trades(result, samples=10000, block=1, fraction=None, initial=None, seed=0, max_bytes=1 << 26):
+    """``bootstrap`` every signal combination of a ``BacktestResult`` (and ``ALL_TRADES``).
+
+    ``fraction`` defaults to the config's ``first_trade_allocation`` and
+    ``initial`` to its ``initial_cash``. Returns ``{combo: BootstrapResult}``.
+    """
+    config = getattr(result.algorithm, "config", None)
+    if fraction is None:
+        fraction = config.first_trade_allocation if config is not None else 0.25
+    if initial is None:
+        initial = config.initial_cash if config is not None else 1.0
+    return {combo: bootstrap(returns, samples, block, fraction, initial, seed, max_bytes)
+            for combo, returns in trade_returns(result.trade_stats).items()}
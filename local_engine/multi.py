@@ -0,0 +1,221 @@
+"""Many configurations of one strategy over a single pass of a bar store.
+
+``MultiEngine`` loads the strategy once and creates one algorithm per
+``StrategyConfig``. Every bar is read and built once and fanned out to all of
+them. Indicators are requested from a shared ``IndicatorPool`` instead of
+being created per algorithm: identical specs (kind, symbol, parameters,
+selector) resolve to one indicator object that is updated once per bar, so 200
+configs with ``ma_slow_period=200`` keep a single 200-bar SMA per symbol.
+"""
+from datetime import timedelta
+
+import numpy as np
+
+from .algorithm_imports import indicator_update
+from .brokerage import ImmediateFillBrokerage
+from .cache import run_key
+from .data import from_epoch, to_epoch
+from .engine import BacktestResult, replay_timeline
+from .loader import load_strategy
+
+
+class IndicatorPool:
+    """Indicators shared between algorithms, one per ``(symbol, spec)``.
+
+    ``QCAlgorithm`` factories (``sma``, ``srsi``, ...) ask the pool when the
+    algorithm's ``indicator_pool`` is set; the pool then owns the updates and
+    ``push`` feeds each indicator once per bar. ``requested`` counts factory
+    calls, ``len(pool)`` the indicators actually kept. ``release(owner)``
+    drops an algorithm's claims; indicators nobody claims stop updating.
+    """
+
+    def __init__(self):
+        self.indicators = {}
+        self.requested = 0
+        self._owners = {}
+        self._updates = {}
+        self._seeded = set()
+
+    def __len__(self):
+        return len(self.indicators)
+
+    def indicator(self, symbol, spec, make, selector=None, owner=None):
+        self.requested += 1
+        key = (symbol, spec, selector)
+        indicator = self.indicators.get(key)
+        if indicator is None:
+            indicator = self.indicators[key] = make()
+            self._owners[key] = set()
+            self._updates.setdefault(symbol, {})[key] = indicator_update(indicator, selector)
+        self._owners[key].add(id(owner))
+        return indicator
+
+    def release(self, owner):
+        for key, owners in list(self._owners.items()):
+            owners.discard(id(owner))
+            if not owners:
+                del self._owners[key], self._updates[key[0]][key]
+                self._seeded.discard(id(self.indicators.pop(key)))
+
+    def claim_seed(self, indicator):
+        """``True`` for the first ``warm_up_indicator`` of ``indicator``; later callers share its seeded state."""
+        if id(indicator) in self._seeded:
+            return False
+        self._seeded.add(id(indicator))
+        return True
+
+    def push(self, bars):
+        for symbol, bar in bars.items():
+            updates = self._updates.get(symbol)
+            if updates:
+                for update in updates.values():
+                    update(bar)
+
+
+class MultiEngine:
+    """Runs ``strategy`` once per config in ``configs`` over one replay of ``store``.
+
+    ``strategy`` is a strategy file path or a loaded class whose algorithms
+    read ``self.config`` (``v2 Multi Symbol.py``); ``overrides`` go to the
+    loader. Shared indicators only see the same bars as a solo run would if
+    every config starts at the same time with the same warm-up, so the start
+    date, warm-up bars and warm-up mode must agree; symbols and end dates may
+    differ. ``brokerage`` is a factory called once per algorithm. With
+    ``share_indicators=False`` each algorithm keeps its own indicators (the
+    bar pass is still shared); ``pool`` replaces the fresh ``IndicatorPool``
+    with any object of the same interface. ``run`` returns one ``BacktestResult`` per
+    config, in order, each identical to a ``LocalEngine`` run of that config.
+
+    ``run`` is ``start``, ``advance`` and ``finish``. Schedulers that prune
+    configs along the way (``local_engine.halving``) call ``advance`` up to a
+    rung, read ``equity`` and ``drop`` the losers; the survivors simply keep
+    their state and continue from there.
+    """
+
+    def __init__(self, strategy, store, configs, overrides=None, brokerage=ImmediateFillBrokerage,
+                 share_indicators=True, pool=None):
+        self.strategy_class = load_strategy(strategy, overrides) if isinstance(strategy, str) else strategy
+        self.store = store
+        self.configs = list(configs)
+        self.brokerage = brokerage
+        if pool is None and share_indicators:
+            pool = IndicatorPool()
+        self.pool = pool
+
+    def create_algorithms(self):
+        algorithms = []
+        for config in self.configs:
+            algorithm = self.strategy_class()
+            algorithm._attach_brokerage(self.brokerage())
+            algorithm.history_provider = self.store
+            algorithm.indicator_pool = self.pool
+            algorithm.config = config
+            algorithm.Initialize()
+            algorithms.append(algorithm)
+        spans = {(algorithm.start_date, algorithm.warm_up_bars, config.warm_up_mode)
+                 for algorithm, config in zip(algorithms, self.configs)}
+        if len(spans) > 1:
+            raise ValueError("configs run by one MultiEngine must share start date and warm-up")
+        return algorithms
+
+    def start(self):
+        """Create the algorithms and the shared timeline; ``advance`` then steps them."""
+        self.algorithms = algorithms = self.create_algorithms()
+        symbols = list(dict.fromkeys(symbol for algorithm in algorithms for symbol in algorithm.securities))
+        end_dates = [algorithm.end_date for algorithm in algorithms]
+        end_date = None if None in end_dates or not end_dates else max(end_dates)
+        first = algorithms[0] if algorithms else None
+        self.times, self._series, self.first_live = replay_timeline(
+            self.store, symbols, first and first.start_date, end_date, first.warm_up_bars if first else 0)
+        times = self.times
+        # Per algorithm: the index after its last bar, and its symbols if they differ from the shared list.
+        # Bars go in in the algorithm's own symbol order: same-bar stop fills then happen in the same order as solo.
+        self._stops = [len(times) if algorithm.end_date is None else
+                       int(np.searchsorted(times, to_epoch(algorithm.end_date + timedelta(days=1)), side="left"))
+                       for algorithm in algorithms]
+        self._subsets = [None if list(algorithm.securities) == symbols else list(algorithm.securities)
+                         for algorithm in algorithms]
+        self._cursors = {symbol: int(np.searchsorted(s.time, times[0], side="left")) if len(times) else 0
+                         for symbol, s in self._series.items()}
+        self.equity_times = [[] for _ in algorithms]
+        self.equity = [[] for _ in algorithms]
+        self.active = list(range(len(algorithms)))
+        self.index = 0
+
+    def advance(self, stop=None):
+        """Step the active algorithms through timeline index ``stop`` (exclusive; default: the end)."""
+        times, series, cursors, pool = self.times, self._series, self._cursors, self.pool
+        algorithms, stops, subsets = self.algorithms, self._stops, self._subsets
+        stop = len(times) if stop is None else min(stop, len(times))
+        for index in range(self.index, stop):
+            epoch = int(times[index])
+            bars = {}
+            for symbol, s in series.items():
+                cursor = cursors[symbol]
+                if cursor < len(s.time) and s.time[cursor] == epoch:
+                    bars[symbol] = s.bar(cursor, symbol)
+                    cursors[symbol] = cursor + 1
+            if pool is not None:
+                pool.push(bars)
+            time = from_epoch(epoch)
+            warming_up = index < self.first_live
+            for i in self.active:
+                if index >= stops[i]:
+                    continue
+                algorithm = algorithms[i]
+                subset = subsets[i]
+                algorithm._step(time, bars if subset is None else {s: bars[s] for s in subset if s in bars},
+                                warming_up=warming_up)
+                if not warming_up:
+                    self.equity_times[i].append(time)
+                    self.equity[i].append(algorithm.portfolio.total_portfolio_value)
+        self.index = max(self.index, stop)
+
+    def drop(self, i):
+        """Stop stepping algorithm ``i``; pooled indicators no other active algorithm uses stop updating."""
+        self.active.remove(i)
+        if self.pool is not None:
+            self.pool.release(self.algorithms[i])
+
+    def finish(self):
+        """Run ``OnEndOfAlgorithm`` for the active algorithms and return their results, in config order."""
+        results = []
+        for i in self.active:
+            algorithm = self.algorithms[i]
+            on_end = getattr(algorithm, "OnEndOfAlgorithm", None)
+            if on_end is not None:
+                on_end()
+            results.append(BacktestResult(algorithm, self.equity_times[i], self.equity[i]))
+        return results
+
+    def run(self):
+        self.start()
+        self.advance()
+        return self.finish()
+
+
+def run_configs(strategy_path, store, configs, overrides=None, brokerage=ImmediateFillBrokerage, share_indicators=True,
+                cache=None, pool=None):
+    """One result per config; with a ``cache.ResultCache`` only configs missing from it are run (and then stored).
+
+    ``pool`` goes to ``MultiEngine``; a pool other than ``IndicatorPool``
+    feeds the algorithms different indicator values, so its class name is
+    part of the cache key.
+    """
+    if cache is None:
+        return MultiEngine(strategy_path, store, configs, overrides, brokerage, share_indicators, pool).run()
+    if brokerage is not ImmediateFillBrokerage:
+        raise ValueError("cached runs cannot use a custom brokerage")
+    strategy = load_strategy(strategy_path, overrides) if isinstance(strategy_path, str) else strategy_path
+    configs = list(configs)
+    variant = None if pool is None or type(pool) is IndicatorPool else type(pool).__name__
+    keys = [run_key(strategy, store, config, variant) for config in configs]
+    results = [cache.get(key) for key in keys]
+    missing = [i for i, result in enumerate(results) if result is None]
+    if missing:
+        computed = MultiEngine(strategy, store, [configs[i] for i in missing], brokerage=brokerage,
+                               share_indicators=share_indicators, pool=pool).run()
+        for i, result in zip(missing, computed):
+            cache.put(keys[i], result)
+            results[i] = result
+    return results
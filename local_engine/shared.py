@@ -0,0 +1,128 @@
+"""Bar history in shared memory for process pools.
+
+A ``BarStore`` sent to a pool worker is pickled with every bar it has
+loaded, and each worker ends up with its own copy of the full history.
+``SharedBarStore.create(store, symbols)`` copies the OHLCV columns of
+``symbols`` once into a single ``multiprocessing.shared_memory`` block. The
+store pickles as nothing more than the block name and a column layout. A
+worker unpickling it attaches to the block (once per process) and serves
+``BarSeries`` of read-only NumPy views into it. However many workers there
+are, the bars exist once, and a task carries a few hundred bytes of store.
+
+The creating process owns the block: ``close()`` (or leaving the ``with``
+block) unlinks it once the pool is done.
+"""
+from contextlib import contextmanager
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .data import BarSeries, MemoryBarStore
+
+COLUMNS = (("time", np.int64), ("open", np.float64), ("high", np.float64), ("low", np.float64),
+           ("close", np.float64), ("volume", np.float64))
+
+_attached = {}
+_opened = {}
+
+
+def _attach(name):
+    """This process's handle on block ``name``, attached once."""
+    block = _attached.get(name)
+    if block is None:
+        try:
+            block = shared_memory.SharedMemory(name=name, track=False)
+        except TypeError:
+            # Before Python 3.13 attaching registers the block with the resource tracker. Pool
+            # workers share the creating process's tracker, so that is a no-op there.
+            block = shared_memory.SharedMemory(name=name)
+        _attached[name] = block
+    return block
+
+
+def _views(buffer, layout):
+    series = {}
+    for symbol, offset, length in layout:
+        columns = []
+        for _, dtype in COLUMNS:
+            column = np.ndarray(length, dtype=dtype, buffer=buffer, offset=offset)
+            column.flags.writeable = False
+            columns.append(column)
+            offset += length * 8
+        series[symbol] = BarSeries(symbol, *columns)
+    return series
+
+
+class SharedBarStore(MemoryBarStore):
+    """Read-only bar store over one shared-memory block (see the module docstring)."""
+
+    def __init__(self, name, layout, block=None):
+        super().__init__()
+        self.name = name
+        self.layout = layout
+        self._owner = block
+        self._cache.update(_views((block or _attach(name)).buf, layout))
+
+    @classmethod
+    def create(cls, store, symbols):
+        """Copy the bars of ``symbols`` from ``store`` into a new block owned by this process."""
+        loaded = [store.load(str(symbol)) for symbol in dict.fromkeys(symbols)]
+        size = sum(len(series) for series in loaded) * 8 * len(COLUMNS)
+        block = shared_memory.SharedMemory(create=True, size=max(size, 1))
+        layout = []
+        offset = 0
+        for series in loaded:
+            layout.append((series.symbol, offset, len(series)))
+            for column, dtype in COLUMNS:
+                values = getattr(series, column)
+                np.ndarray(len(values), dtype=dtype, buffer=block.buf, offset=offset)[:] = values
+                offset += len(values) * 8
+        return cls(block.name, tuple(layout), block)
+
+    def __reduce__(self):
+        return (_open, (self.name, self.layout))
+
+    def save(self, series):
+        raise TypeError("SharedBarStore is read-only")
+
+    @property
+    def nbytes(self):
+        return sum(length for _, _, length in self.layout) * 8 * len(COLUMNS)
+
+    def close(self):
+        """Release the block; the owning store also unlinks it (workers must be done with it)."""
+        if self._owner is not None:
+            self._cache.clear()
+            self._owner.unlink()
+            try:
+                self._owner.close()
+            except BufferError:
+                pass  # series still referenced here; the mapping goes away with them
+            self._owner = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def _open(name, layout):
+    """Unpickle target: one ``SharedBarStore`` per block and process, reused by every task."""
+    store = _opened.get(name)
+    if store is None:
+        store = _opened[name] = SharedBarStore(name, layout)
+    return store
+
+
+@contextmanager
+def shared_store(store, symbols):
+    """``store`` as a ``SharedBarStore`` of ``symbols`` for the duration of a pool (``store`` itself if already shared)."""
+    if isinstance(store, SharedBarStore):
+        yield store
+        return
+    shared = SharedBarStore.create(store, symbols)
+    try:
+        yield shared
+    finally:
+        shared.close()
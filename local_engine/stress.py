@@ -0,0 +1,158 @@
+"""Stress tests of strategy configs on synthetic price paths.
+
+``synthetic_paths`` draws many OHLCV paths at once as ``(paths, bars)``
+arrays. Prices follow geometric Brownian motion whose drift and volatility
+switch between ``regimes`` (a Markov chain that leaves its regime with
+probability ``switch_probability`` per bar), plus Poisson jumps. Log volume
+is an AR(1) process that also rises with the size of the bar's move, so
+volume comes in clusters around volatile stretches. Everything derives from
+``seed``.
+
+``StressTest`` cuts the paths into scenarios with one path per strategy
+symbol. Each scenario is a ``MemoryBarStore`` over row views of the arrays,
+and all configs run over it in one ``MultiEngine`` pass with pooled
+indicators. Batches of scenarios run on a process pool; each batch generates
+its own paths from ``(seed, batch number)``, so only scores travel back. The
+result holds total return, max drawdown, Sharpe ratio and fill count per
+scenario and config.
+
+Only path generation is vectorized. There is no array-based signal engine,
+so every scenario builds its own ``MultiEngine`` and replays its bars one at
+a time as ``TradeBar`` objects through the strategy, exactly like a
+backtest. Nothing is reused between scenarios apart from the loaded
+strategy and configs, so a batch costs about ``scenarios`` backtests of
+``configs`` configs over ``bars`` bars; scale with ``workers``, not by
+expecting thousands of scenarios to be cheap.
+"""
+import math
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+import numpy as np
+
+from .data import BarSeries, MemoryBarStore, from_epoch, to_epoch
+from .loader import cached_strategy, strategy_config
+from .metrics import max_drawdown, sharpe_ratio, total_return
+from .multi import MultiEngine
+
+# (drift, volatility) per bar: calm uptrend, choppy range, selloff.
+REGIMES = ((0.0006, 0.012), (0.0, 0.02), (-0.0015, 0.04))
+METRICS = ("total_return", "max_drawdown", "sharpe_ratio", "fills")
+
+
+def synthetic_paths(n_paths, n_bars, seed=0, price=100.0, regimes=REGIMES, switch_probability=0.01,
+                    jump_intensity=0.005, jump_mean=-0.02, jump_std=0.06, volume=1_000_000.0,
+                    volume_persistence=0.9, volume_noise=0.3, volume_response=10.0):
+    """``open``, ``high``, ``low``, ``close``, ``volume`` and ``regime`` arrays of shape ``(n_paths, n_bars)``."""
+    rng = np.random.default_rng(seed)
+    drifts, volatilities = np.asarray(regimes, dtype=np.float64).T
+    n_regimes = len(drifts)
+    # A switch moves to one of the other regimes, uniformly.
+    switches = rng.random((n_paths, n_bars)) < switch_probability
+    steps = np.where(switches, rng.integers(1, max(n_regimes, 2), size=(n_paths, n_bars)), 0)
+    regime = (rng.integers(n_regimes, size=(n_paths, 1)) + np.cumsum(steps, axis=1)) % n_regimes
+    drift, volatility = drifts[regime], volatilities[regime]
+    jumps = np.where(rng.random((n_paths, n_bars)) < jump_intensity,
+                     rng.normal(jump_mean, jump_std, (n_paths, n_bars)), 0.0)
+    log_returns = drift - 0.5 * volatility ** 2 + volatility * rng.standard_normal((n_paths, n_bars)) + jumps
+    close = price * np.exp(np.cumsum(log_returns, axis=1))
+    open_ = np.concatenate((np.full((n_paths, 1), price), close[:, :-1]), axis=1)
+    spread = np.abs(rng.normal(0.0, 0.5, (n_paths, n_bars))) * volatility * close
+    high = np.maximum(open_, close) + spread
+    low = np.maximum(np.minimum(open_, close) - spread, 0.01)
+    shocks = volume_noise * rng.standard_normal((n_paths, n_bars)) + volume_response * np.abs(log_returns)
+    shocks -= shocks.mean(axis=1, keepdims=True)  # keeps each path's typical volume near ``volume``
+    log_volume = np.empty((n_paths, n_bars))
+    level = np.zeros(n_paths)
+    for bar in range(n_bars):
+        level = volume_persistence * level + shocks[:, bar]
+        log_volume[:, bar] = level
+    return {"open": open_, "high": high, "low": low, "close": close, "volume": volume * np.exp(log_volume),
+            "regime": regime}
+
+
+def scenario_stores(paths, symbols, times):
+    """One ``MemoryBarStore`` per consecutive group of ``len(symbols)`` paths; series are row views."""
+    stores = []
+    for first in range(0, len(paths["close"]) - len(symbols) + 1, len(symbols)):
+        stores.append(MemoryBarStore(
+            BarSeries(str(symbol), times, *(paths[column][first + i] for column in ("open", "high", "low", "close", "volume")))
+            for i, symbol in enumerate(symbols)))
+    return stores
+
+
+def run_batch(strategy_path, overrides, base, grid, batch, scenarios, n_bars, start, seed, options):
+    """Metrics of every config on ``scenarios`` scenarios generated from ``(seed, batch)`` (pool task)."""
+    strategy = cached_strategy(strategy_path, overrides)
+    configs = [strategy_config(strategy, **dict(base, **params)) for params in grid]
+    symbols = configs[0].symbols
+    times = to_epoch(start) + 86400 * np.arange(n_bars, dtype=np.int64)
+    paths = synthetic_paths(scenarios * len(symbols), n_bars, (seed, batch), **options)
+    scores = np.empty((scenarios, len(configs), len(METRICS)))
+    for i, store in enumerate(scenario_stores(paths, symbols, times)):
+        for j, result in enumerate(MultiEngine(strategy, store, configs).run()):
+            equity = np.asarray(result.equity)
+            scores[i, j] = (total_return(equity), max_drawdown(equity), sharpe_ratio(equity), len(result.fills))
+    return scores
+
+
+class StressResult:
+    """``(scenarios, configs)`` arrays per metric (``total_return``, ``max_drawdown``, ``sharpe_ratio``, ``fills``)."""
+
+    def __init__(self, grid, scores):
+        self.grid = grid
+        for k, metric in enumerate(METRICS):
+            setattr(self, metric, scores[:, :, k])
+
+    @property
+    def scenarios(self):
+        return len(self.total_return)
+
+    def quantiles(self, metric, q=(0.05, 0.25, 0.5, 0.75, 0.95)):
+        """Quantiles ``q`` of ``metric`` per config, shape ``(configs, len(q))``."""
+        return np.quantile(getattr(self, metric), q, axis=0).T
+
+    def loss_probability(self):
+        """Share of scenarios each config ends below its starting equity."""
+        return (self.total_return < 0).mean(axis=0)
+
+
+class StressTest:
+    """Runs ``grid`` (field-change dicts) of ``strategy_path`` over ``scenarios`` synthetic scenarios.
+
+    Each scenario has ``bars`` daily bars per symbol from ``start``; the
+    first ``warm_up_bars`` only seed indicators (``WarmUpMode.HISTORY``).
+    Generator ``options`` go to ``synthetic_paths``. ``batch`` scenarios
+    make one pool task; ``workers`` processes run them (``1``: in this
+    process). Results depend only on ``seed`` and ``batch``. Each scenario
+    is a full bar-by-bar ``MultiEngine`` run, so the cost grows linearly
+    with ``scenarios``.
+    """
+
+    def __init__(self, strategy_path, grid, scenarios=1000, bars=756, warm_up_bars=250, start="2015-01-01", seed=0,
+                 batch=8, workers=None, base=None, overrides=None, **options):
+        self.strategy_path = strategy_path
+        self.grid = [dict(params) for params in grid]
+        self.scenarios = scenarios
+        self.n_bars = warm_up_bars + bars
+        self.start = start
+        self.seed = seed
+        self.batch = batch
+        self.workers = workers
+        self.overrides = overrides
+        self.options = options
+        first_live = from_epoch(to_epoch(start) + 86400 * warm_up_bars).date()
+        last = first_live + timedelta(days=bars - 1)
+        self.base = dict(base or {}, warm_up_mode="HISTORY", start_date=first_live.isoformat(),
+                         end_date=last.isoformat(), enable_charting=False, enable_event_log=False)
+
+    def run(self):
+        tasks = [(self.strategy_path, self.overrides, self.base, self.grid, batch,
+                  min(self.batch, self.scenarios - batch * self.batch), self.n_bars, self.start, self.seed, self.options)
+                 for batch in range(math.ceil(self.scenarios / self.batch))]
+        if self.workers == 1 or len(tasks) < 2:
+            scores = [run_batch(*task) for task in tasks]
+        else:
+            with ProcessPoolExecutor(self.workers) as pool:
+                scores = list(pool.map(run_batch, *zip(*tasks)))
+        return StressResult(self.grid, np.concatenate(scores))
@@ -0,0 +1,233 @@
+"""Tree-structured Parzen estimator (TPE) search over strategy configs, in NumPy.
+
+``TPEOptimizer`` treats a backtest as a black box from config to score. The
+first ``startup`` trials are drawn at random from the search space. After
+that every proposal comes from the surrogate. The finished trials are split
+into the best ``ceil(gamma * sqrt(n))`` and the rest, as in hyperopt. Each dimension gets a Parzen
+density per group: Gaussian kernels in the unit interval for numbers, and
+smoothed frequencies for choices. ``candidates`` points are sampled from the
+good density, and the one with the highest good/bad density ratio is
+proposed. Trials run ``workers`` at a time on a process pool. Whenever one
+finishes, the surrogate is refit and a new proposal takes its slot. Running
+trials count as bad points, so parallel proposals spread out instead of
+piling onto the same spot.
+"""
+import math
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+
+from .engine import run_backtest
+from .loader import cached_strategy, strategy_config
+from .metrics import total_return
+from .shared import shared_store
+
+
+class Int:
+    """Integer parameter in ``low``..``high`` (inclusive)."""
+
+    def __init__(self, low, high):
+        self.low = low
+        self.high = high
+
+    def to_unit(self, value):
+        return (value - self.low + 0.5) / (self.high - self.low + 1)
+
+    def from_unit(self, u):
+        return int(min(max(round(self.low - 0.5 + u * (self.high - self.low + 1)), self.low), self.high))
+
+
+class Float:
+    """Float parameter in ``low``..``high``, searched on a log scale with ``log``."""
+
+    def __init__(self, low, high, log=False):
+        self.low = low
+        self.high = high
+        self.log = log
+
+    def to_unit(self, value):
+        if self.log:
+            return math.log(value / self.low) / math.log(self.high / self.low)
+        return (value - self.low) / (self.high - self.low)
+
+    def from_unit(self, u):
+        if self.log:
+            return float(self.low * (self.high / self.low) ** u)
+        return float(self.low + u * (self.high - self.low))
+
+
+class Choice:
+    """One of ``values`` (booleans, modes, or numbers without an order that matters)."""
+
+    def __init__(self, values):
+        self.values = list(values)
+
+
+class Trial:
+    __slots__ = ("number", "params", "score")
+
+    def __init__(self, number, params, score=None):
+        self.number = number
+        self.params = params
+        self.score = score
+
+
+class OptimizationResult:
+    """Finished trials in completion order; ``best`` is the highest-scoring one."""
+
+    def __init__(self, trials):
+        self.trials = trials
+        self.best = max(trials, key=lambda trial: trial.score) if trials else None
+
+    @property
+    def best_params(self):
+        return self.best.params
+
+    @property
+    def best_score(self):
+        return self.best.score
+
+    def best_so_far(self):
+        """Running best score after each finished trial."""
+        return np.maximum.accumulate([trial.score for trial in self.trials]).tolist()
+
+
+def evaluate(strategy_path, store, overrides, base, params, objective, cache=None):
+    """Score of one full backtest of ``params`` (pool task)."""
+    strategy = cached_strategy(strategy_path, overrides)
+    result = run_backtest(strategy, store, config=strategy_config(strategy, **dict(base, **params)), cache=cache)
+    return float(objective(np.asarray(result.equity)))
+
+
+class TPEOptimizer:
+    """TPE search over ``space`` (field name -> ``Int``/``Float``/``Choice``) for ``strategy_path``.
+
+    ``objective`` scores a full-span equity array (higher is better) and must
+    be picklable, like the one ``WalkForward`` takes. ``base`` holds field
+    changes for every trial, and ``overrides`` go to the loader. ``workers``
+    processes evaluate trials concurrently. With ``1``, trials run one after
+    another in this process. ``seed`` fixes the proposals for a given order
+    of completions. With a ``cache.ResultCache``, configs evaluated before
+    (in this or an earlier search) are read back instead of run. A pool
+    shares the bars of every symbol a trial can ask for: those of ``base``
+    and of each ``symbols`` choice in ``space``.
+    """
+
+    def __init__(self, strategy_path, store, space, objective=total_return, base=None, overrides=None, workers=None,
+                 startup=20, gamma=0.25, candidates=24, seed=0, cache=None):
+        self.strategy_path = strategy_path
+        self.store = store
+        self.space = dict(space)
+        self.objective = objective
+        self.base = dict(base or {})
+        self.overrides = overrides
+        self.workers = workers
+        self.startup = startup
+        self.gamma = gamma
+        self.candidates = candidates
+        self.rng = np.random.default_rng(seed)
+        self.cache = cache
+
+    # Surrogate
+
+    def sample_random(self):
+        params = {}
+        for name, dimension in self.space.items():
+            if isinstance(dimension, Choice):
+                params[name] = dimension.values[int(self.rng.integers(len(dimension.values)))]
+            else:
+                params[name] = dimension.from_unit(float(self.rng.random()))
+        return params
+
+    def propose(self, finished, running=()):
+        """Next params to try given ``finished`` trials and the params of ``running`` ones."""
+        if len(finished) < self.startup:
+            return self.sample_random()
+        ranked = sorted(finished, key=lambda trial: trial.score, reverse=True)
+        n_good = max(int(math.ceil(self.gamma * math.sqrt(len(ranked)))), 1)
+        good = [trial.params for trial in ranked[:n_good]]
+        bad = [trial.params for trial in ranked[n_good:]] + list(running)
+        draws = {}
+        log_ratio = np.zeros(self.candidates)
+        for name, dimension in self.space.items():
+            if isinstance(dimension, Choice):
+                good_p = self._choice_probabilities(dimension, [params[name] for params in good])
+                bad_p = self._choice_probabilities(dimension, [params[name] for params in bad])
+                picks = self.rng.choice(len(dimension.values), size=self.candidates, p=good_p)
+                draws[name] = [dimension.values[i] for i in picks]
+                log_ratio += np.log(good_p[picks]) - np.log(bad_p[picks])
+            else:
+                good_u = np.array([dimension.to_unit(params[name]) for params in good])
+                bad_u = np.array([dimension.to_unit(params[name]) for params in bad])
+                centers, widths = _parzen(good_u)
+                pick = self.rng.integers(len(centers), size=self.candidates)
+                u = np.clip(self.rng.normal(centers[pick], widths[pick]), 0.0, 1.0)
+                draws[name] = [dimension.from_unit(value) for value in u.tolist()]
+                u = np.array([dimension.to_unit(value) for value in draws[name]])
+                log_ratio += np.log(_density(u, *_parzen(good_u))) - np.log(_density(u, *_parzen(bad_u)))
+        best = int(np.argmax(log_ratio))
+        return {name: values[best] for name, values in draws.items()}
+
+    @staticmethod
+    def _choice_probabilities(dimension, observed):
+        counts = np.ones(len(dimension.values))
+        for value in observed:
+            counts[dimension.values.index(value)] += 1
+        return counts / counts.sum()
+
+    # Driver
+
+    def symbols(self):
+        """Every symbol a trial can run on: the base config's and those of each ``symbols`` choice."""
+        strategy = cached_strategy(self.strategy_path, self.overrides)
+        symbols = dict.fromkeys(strategy_config(strategy, **self.base).symbols)
+        dimension = self.space.get("symbols")
+        if dimension is not None:
+            if not isinstance(dimension, Choice):
+                raise ValueError("symbols can only be searched as a Choice")
+            for value in dimension.values:
+                symbols.update(dict.fromkeys(strategy_config(strategy, **dict(self.base, symbols=value)).symbols))
+        return list(symbols)
+
+    def run(self, trials=200):
+        """Evaluate ``trials`` configs and return an ``OptimizationResult``."""
+        task = (self.strategy_path, self.store, self.overrides, self.base)
+        finished = []
+        if self.workers == 1:
+            for number in range(trials):
+                params = self.propose(finished)
+                finished.append(Trial(number, params, evaluate(*task, params, self.objective, self.cache)))
+            return OptimizationResult(finished)
+        slots = self.workers or os.cpu_count() or 1
+        with shared_store(self.store, self.symbols()) as store, ProcessPoolExecutor(slots) as pool:
+            task = (self.strategy_path, store, self.overrides, self.base)
+            running = {}
+            submitted = 0
+            while submitted < trials or running:
+                while submitted < trials and len(running) < slots:
+                    params = self.propose(finished, [trial.params for trial in running.values()])
+                    running[pool.submit(evaluate, *task, params, self.objective, self.cache)] = Trial(submitted, params)
+                    submitted += 1
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    trial = running.pop(future)
+                    trial.score = future.result()
+                    finished.append(trial)
+        return OptimizationResult(finished)
+
+
+def _parzen(u):
+    """Kernel centers and widths for points ``u`` in [0, 1], plus a wide prior kernel at 0.5."""
+    centers = np.append(u, 0.5)
+    if len(u) > 1:
+        width = max(1.06 * float(np.std(u)) * len(u) ** -0.2, 0.02)
+    else:
+        width = 0.25
+    widths = np.append(np.full(len(u), width), 1.0)
+    return centers, widths
+
+
+def _density(u, centers, widths):
+    z = (u[:, None] - centers[None, :]) / widths[None, :]
+    return np.maximum((np.exp(-0.5 * z * z) / widths[None, :]).mean(axis=1), 1e-12)
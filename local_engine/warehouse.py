@@ -0,0 +1,221 @@
+"""SQLite warehouse of sweep results.
+
+Every run is one ``runs`` row with its headline metrics, plus one
+``params`` row per swept ``StrategyConfig`` field and one ``combo_stats``
+row per signal combination (trade stats summed over symbols). ``params``
+is indexed on ``(name, value)`` and each metric column has its own index, so
+queries like "top 50 by Sharpe with ``ma_fast_period < 30``" are index scans
+even over millions of runs::
+
+    warehouse.top("sharpe_ratio", 50, ma_fast_period=("<", 30))
+
+The database runs in WAL mode with a busy timeout, so pool workers open
+their own connections and insert their batches concurrently; each
+``insert`` is one transaction. ``run_sweep`` runs a grid in chunks on a
+process pool (one shared ``MultiEngine`` pass per chunk) and has each
+worker write its chunk.
+"""
+import json
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .loader import cached_strategy, strategy_config
+from .metrics import max_drawdown, sharpe_ratio, total_return
+from .multi import run_configs
+from .shared import shared_store
+
+METRICS = ("total_return", "sharpe_ratio", "max_drawdown", "final_equity", "fills", "trades", "win_rate")
+OPERATORS = ("=", "!=", "<", "<=", ">", ">=")
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS sweeps (
+    id INTEGER PRIMARY KEY, name TEXT NOT NULL, created REAL NOT NULL, strategy TEXT, base TEXT
+);
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY, sweep_id INTEGER NOT NULL REFERENCES sweeps(id),
+    {", ".join(f"{metric} REAL" for metric in METRICS)}
+);
+CREATE TABLE IF NOT EXISTS params (
+    run_id INTEGER NOT NULL REFERENCES runs(id), name TEXT NOT NULL, value
+);
+CREATE TABLE IF NOT EXISTS combo_stats (
+    run_id INTEGER NOT NULL REFERENCES runs(id), combo TEXT NOT NULL, count INTEGER, wins INTEGER,
+    total_return REAL, total_pnl REAL, trailing_stop_exits INTEGER
+);
+CREATE INDEX IF NOT EXISTS params_name_value ON params (name, value, run_id);
+CREATE INDEX IF NOT EXISTS params_run ON params (run_id, name, value);
+CREATE INDEX IF NOT EXISTS combo_stats_run ON combo_stats (run_id);
+CREATE INDEX IF NOT EXISTS combo_stats_combo ON combo_stats (combo);
+CREATE INDEX IF NOT EXISTS runs_sweep ON runs (sweep_id);
+{"".join(f"CREATE INDEX IF NOT EXISTS runs_{metric} ON runs ({metric});" for metric in METRICS)}
+"""
+
+
+def run_metrics(result):
+    """Headline metrics of a ``BacktestResult`` (or ``cache.CachedResult``), keyed like ``METRICS``."""
+    equity = np.asarray(result.equity, dtype=np.float64)
+    trades = wins = 0
+    for combos in result.trade_stats.values():
+        for stats in combos.values():
+            trades += stats["count"]
+            wins += stats["wins"]
+    return {"total_return": total_return(equity), "sharpe_ratio": sharpe_ratio(equity),
+            "max_drawdown": max_drawdown(equity), "final_equity": result.final_equity, "fills": len(result.fills),
+            "trades": trades, "win_rate": wins / trades if trades else None}
+
+
+def combo_totals(trade_stats):
+    """Per signal combination: ``(count, wins, total_return, total_pnl, trailing_stop_exits)`` summed over symbols."""
+    totals = {}
+    for combos in trade_stats.values():
+        for combo, stats in combos.items():
+            row = totals.setdefault(combo, [0, 0, 0.0, 0.0, 0])
+            row[0] += stats["count"]
+            row[1] += stats["wins"]
+            row[2] += stats["total_return"]
+            row[3] += stats["total_pnl"]
+            row[4] += stats.get("trailing_stop_exits", 0)
+    return totals
+
+
+class ResultWarehouse:
+    """The results database at ``path``; picklable, each process connects on first use."""
+
+    def __init__(self, path):
+        self.path = path
+        self._connection = None
+        self.connection.executescript(SCHEMA)
+
+    def __getstate__(self):
+        return {"path": self.path}
+
+    def __setstate__(self, state):
+        self.path = state["path"]
+        self._connection = None
+
+    @property
+    def connection(self):
+        if self._connection is None:
+            connection = sqlite3.connect(self.path, timeout=60.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._connection = connection
+        return self._connection
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    def create_sweep(self, name, strategy=None, base=None):
+        cursor = self.connection.execute("INSERT INTO sweeps (name, created, strategy, base) VALUES (?, ?, ?, ?)",
+                                         (name, time.time(), strategy, json.dumps(base or {}, default=str)))
+        return cursor.lastrowid
+
+    def insert(self, sweep_id, rows):
+        """Insert ``rows`` of ``(params, metrics, trade_stats)`` in one transaction; returns the new run ids."""
+        connection = self.connection
+        ids = []
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            insert_run = f"INSERT INTO runs (sweep_id, {', '.join(METRICS)}) VALUES (?{', ?' * len(METRICS)})"
+            params_rows, combo_rows = [], []
+            for params, metrics, trade_stats in rows:
+                run_id = connection.execute(insert_run, (sweep_id, *(metrics.get(m) for m in METRICS))).lastrowid
+                ids.append(run_id)
+                params_rows.extend((run_id, name, _sql_value(value)) for name, value in params.items())
+                combo_rows.extend((run_id, combo, *totals) for combo, totals in combo_totals(trade_stats).items())
+            connection.executemany("INSERT INTO params (run_id, name, value) VALUES (?, ?, ?)", params_rows)
+            connection.executemany("INSERT INTO combo_stats (run_id, combo, count, wins, total_return, total_pnl, "
+                                   "trailing_stop_exits) VALUES (?, ?, ?, ?, ?, ?, ?)", combo_rows)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return ids
+
+    def top(self, metric="sharpe_ratio", n=50, sweep_id=None, ascending=False, **filters):
+        """The ``n`` best runs by ``metric`` whose params match ``filters``.
+
+        A filter is ``name=value`` or ``name=(operator, value)`` with an
+        operator from ``OPERATORS``. Returns dicts of the run's metrics with
+        its ``params`` and ``id``.
+        """
+        if metric not in METRICS:
+            raise ValueError(f"unknown metric {metric!r}; expected one of {METRICS}")
+        clauses, arguments = [f"r.{metric} IS NOT NULL"], []
+        if sweep_id is not None:
+            clauses.append("r.sweep_id = ?")
+            arguments.append(sweep_id)
+        for name, condition in filters.items():
+            operator, value = condition if isinstance(condition, tuple) else ("=", condition)
+            if operator not in OPERATORS:
+                raise ValueError(f"unknown operator {operator!r}; expected one of {OPERATORS}")
+            clauses.append(f"EXISTS (SELECT 1 FROM params p WHERE p.run_id = r.id AND p.name = ? AND p.value {operator} ?)")
+            arguments.extend((name, _sql_value(value)))
+        order = "ASC" if ascending else "DESC"
+        rows = self.connection.execute(
+            f"SELECT r.id, {', '.join(f'r.{m}' for m in METRICS)} FROM runs r WHERE {' AND '.join(clauses)} "
+            f"ORDER BY r.{metric} {order} LIMIT ?", (*arguments, n)).fetchall()
+        runs = [dict(zip(("id",) + METRICS, row), params={}) for row in rows]
+        by_id = {run["id"]: run for run in runs}
+        if by_id:
+            marks = ", ".join("?" * len(by_id))
+            for run_id, name, value in self.connection.execute(
+                    f"SELECT run_id, name, value FROM params WHERE run_id IN ({marks})", tuple(by_id)):
+                by_id[run_id]["params"][name] = value
+        return runs
+
+    def combo_stats(self, run_id):
+        """``{combo: {count, wins, win_rate, avg_return, total_pnl, trailing_stop_exits}}`` of one run."""
+        stats = {}
+        for combo, count, wins, total, pnl, exits in self.connection.execute(
+                "SELECT combo, count, wins, total_return, total_pnl, trailing_stop_exits FROM combo_stats "
+                "WHERE run_id = ?", (run_id,)):
+            stats[combo] = {"count": count, "wins": wins, "win_rate": wins / count if count else 0.0,
+                            "avg_return": total / count if count else 0.0, "total_pnl": pnl,
+                            "trailing_stop_exits": exits}
+        return stats
+
+
+def _sql_value(value):
+    return int(value) if isinstance(value, bool) else value if isinstance(value, (int, float, str)) else repr(value)
+
+
+def record_chunk(warehouse, sweep_id, strategy_path, store, overrides, base, grid, cache=None):
+    """Run ``grid`` in one shared pass and insert its rows in one transaction (pool task)."""
+    strategy = cached_strategy(strategy_path, overrides)
+    configs = [strategy_config(strategy, **dict(base, **params)) for params in grid]
+    results = run_configs(strategy, store, configs, cache=cache)
+    ids = warehouse.insert(sweep_id, [(params, run_metrics(result), result.trade_stats)
+                                      for params, result in zip(grid, results)])
+    warehouse.close()
+    return ids
+
+
+def run_sweep(warehouse, name, strategy_path, store, grid, base=None, overrides=None, chunk=16, workers=None,
+              cache=None):
+    """Run ``grid`` (field-change dicts) and record every run in ``warehouse`` under a new sweep ``name``.
+
+    ``chunk`` configs share one ``MultiEngine`` pass and one insert
+    transaction; ``workers`` processes run chunks (``1``: in this process).
+    Returns the sweep id.
+    """
+    base = dict(base or {})
+    sweep_id = warehouse.create_sweep(name, strategy_path, dict(base, overrides=overrides))
+    grid = [dict(params) for params in grid]
+    tasks = lambda store: [(warehouse, sweep_id, strategy_path, store, overrides, base, grid[i:i + chunk], cache)
+                           for i in range(0, len(grid), chunk)]
+    if workers == 1 or len(grid) <= chunk:
+        for task in tasks(store):
+            record_chunk(*task)
+    else:
+        strategy = cached_strategy(strategy_path, overrides)
+        symbols = dict.fromkeys(symbol for params in grid
+                                for symbol in strategy_config(strategy, **dict(base, **params)).symbols)
+        with shared_store(store, symbols) as shared, ProcessPoolExecutor(workers) as pool:
+            list(pool.map(record_chunk, *zip(*tasks(shared))))
+    return sweep_id
@@ -0,0 +1,263 @@
+"""Work queue for sweeps spread over many processes and hosts.
+
+The queue is one SQLite file (WAL mode) on a disk every worker can reach
+(WAL needs working file locks, so not every network file system will do).
+Each ``tasks`` row is a chunk of configs plus the strategy path, loader
+overrides and base field changes to run them with. A worker claims the
+oldest available task in an immediate transaction and takes a lease on it:
+the task is its own until ``lease_until``. While it runs the chunk, a
+heartbeat thread keeps moving ``lease_until`` forward. When the chunk is
+done, the worker stores its metrics on the row. A worker that dies stops
+heartbeating; its lease runs out and the next ``claim`` hands the task to
+someone else. A task whose attempts reach ``max_attempts`` is marked
+``failed`` instead. Completion only counts while the lease is still held,
+so a stalled worker that comes back after losing its task cannot overwrite
+the new owner's result.
+
+Coordinator side::
+
+    queue = WorkQueue("sweeps/queue.db")
+    queue.submit("fast-ma", "v2 Multi Symbol.py", grid, chunk=16)
+    ...
+    queue.export("fast-ma", ResultWarehouse("sweeps/results.db"))
+
+Worker side, on any host (``--data`` is that host's copy of the bars)::
+
+    python -m local_engine.workqueue sweeps/queue.db --data data/daily
+"""
+import argparse
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import traceback
+
+from .cache import ResultCache
+from .data import BarStore
+from .loader import cached_strategy, strategy_config
+from .multi import run_configs
+from .warehouse import run_metrics
+
+PENDING, LEASED, DONE, FAILED = "pending", "leased", "done", "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY, sweep TEXT NOT NULL, payload TEXT NOT NULL, state TEXT NOT NULL,
+    worker TEXT, lease_until REAL, attempts INTEGER NOT NULL DEFAULT 0, result TEXT, error TEXT, updated REAL
+);
+CREATE INDEX IF NOT EXISTS tasks_state ON tasks (state, lease_until, id);
+CREATE INDEX IF NOT EXISTS tasks_sweep ON tasks (sweep, state);
+"""
+
+
+class Task:
+    __slots__ = ("id", "sweep", "payload", "worker", "attempts")
+
+    def __init__(self, id, sweep, payload, worker, attempts):
+        self.id = id
+        self.sweep = sweep
+        self.payload = payload
+        self.worker = worker
+        self.attempts = attempts
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class WorkQueue:
+    """Lease-based task queue in the SQLite file ``path``; picklable, each process and thread connects separately."""
+
+    def __init__(self, path, lease_seconds=60.0, max_attempts=3):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        self.connection.executescript(SCHEMA)
+
+    def __getstate__(self):
+        return {"path": self.path, "lease_seconds": self.lease_seconds, "max_attempts": self.max_attempts}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=60.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def _transaction(self, body):
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            value = body(connection)
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return value
+
+    # Coordinator
+
+    def submit(self, sweep, strategy_path, grid, chunk=16, base=None, overrides=None):
+        """Queue ``grid`` (field-change dicts) in tasks of ``chunk`` configs; returns the task count."""
+        grid = [dict(params) for params in grid]
+        now = time.time()
+        rows = [(sweep, json.dumps({"strategy_path": os.path.abspath(strategy_path), "overrides": overrides or {},
+                                    "base": base or {}, "grid": grid[i:i + chunk]}), PENDING, now)
+                for i in range(0, len(grid), chunk)]
+        self._transaction(lambda connection: connection.executemany(
+            "INSERT INTO tasks (sweep, payload, state, updated) VALUES (?, ?, ?, ?)", rows))
+        return len(rows)
+
+    def progress(self, sweep=None):
+        """Task counts by state (expired leases still count as ``leased`` until reclaimed)."""
+        query = "SELECT state, COUNT(*) FROM tasks" + (" WHERE sweep = ?" if sweep is not None else "") + " GROUP BY state"
+        counts = dict.fromkeys((PENDING, LEASED, DONE, FAILED), 0)
+        counts.update(self.connection.execute(query, () if sweep is None else (sweep,)).fetchall())
+        return counts
+
+    def results(self, sweep):
+        """``(params, [metrics, trade_stats])`` of every finished config of ``sweep``, in submission order."""
+        rows = []
+        for payload, result in self.connection.execute(
+                "SELECT payload, result FROM tasks WHERE sweep = ? AND state = ? ORDER BY id", (sweep, DONE)):
+            rows.extend(zip(json.loads(payload)["grid"], json.loads(result)))
+        return rows
+
+    def failures(self, sweep):
+        return self.connection.execute("SELECT id, worker, attempts, error FROM tasks WHERE sweep = ? AND state = ?",
+                                       (sweep, FAILED)).fetchall()
+
+    def export(self, sweep, warehouse):
+        """Copy the finished results of ``sweep`` into a ``warehouse.ResultWarehouse``; returns its sweep id."""
+        sweep_id = warehouse.create_sweep(sweep)
+        rows = self.results(sweep)
+        for i in range(0, len(rows), 1000):
+            warehouse.insert(sweep_id, [(params, metrics, trade_stats)
+                                        for params, (metrics, trade_stats) in rows[i:i + 1000]])
+        return sweep_id
+
+    # Worker
+
+    def claim(self, worker):
+        """Lease the oldest pending task, or one whose lease has expired; ``None`` when there is nothing to do."""
+        def claim(connection):
+            now = time.time()
+            while True:
+                row = connection.execute(
+                    "SELECT id, sweep, payload, attempts FROM tasks WHERE state = ? OR (state = ? AND lease_until < ?) "
+                    "ORDER BY id LIMIT 1", (PENDING, LEASED, now)).fetchone()
+                if row is None:
+                    return None
+                task_id, sweep, payload, attempts = row
+                if attempts >= self.max_attempts:
+                    connection.execute("UPDATE tasks SET state = ?, error = COALESCE(error, 'lease expired'), updated = ? "
+                                       "WHERE id = ?", (FAILED, now, task_id))
+                    continue
+                connection.execute("UPDATE tasks SET state = ?, worker = ?, lease_until = ?, attempts = ?, updated = ? "
+                                   "WHERE id = ?", (LEASED, worker, now + self.lease_seconds, attempts + 1, now, task_id))
+                return Task(task_id, sweep, json.loads(payload), worker, attempts + 1)
+        return self._transaction(claim)
+
+    def _owned_update(self, task, assignments, arguments):
+        cursor = self.connection.execute(
+            f"UPDATE tasks SET {assignments}, updated = ? WHERE id = ? AND state = ? AND worker = ? AND attempts = ?",
+            (*arguments, time.time(), task.id, LEASED, task.worker, task.attempts))
+        return cursor.rowcount == 1
+
+    def heartbeat(self, task):
+        """Extend ``task``'s lease; ``False`` once the lease has been lost to another worker."""
+        return self._owned_update(task, "lease_until = ?", (time.time() + self.lease_seconds,))
+
+    def complete(self, task, result):
+        """Store ``result`` (JSON-serializable) and mark ``task`` done, if its lease is still held."""
+        return self._owned_update(task, "state = ?, result = ?, lease_until = NULL", (DONE, json.dumps(result)))
+
+    def fail(self, task, error):
+        """Give ``task`` back (or mark it failed after ``max_attempts``), if its lease is still held."""
+        state = FAILED if task.attempts >= self.max_attempts else PENDING
+        return self._owned_update(task, "state = ?, error = ?, lease_until = NULL", (state, error))
+
+
+class Heartbeat:
+    """Context manager that renews ``task``'s lease every third of ``queue.lease_seconds`` on a daemon thread."""
+
+    def __init__(self, queue, task):
+        self.queue = queue
+        self.task = task
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._beat, name=f"heartbeat-{task.id}", daemon=True)
+
+    def _beat(self):
+        while not self._stop.wait(self.queue.lease_seconds / 3.0):
+            if not self.queue.heartbeat(self.task):
+                self.lost = True
+                return
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._thread.join()
+
+
+def run_task(payload, store, cache=None):
+    """``[metrics, trade_stats]`` of every config of a task payload, in order."""
+    strategy = cached_strategy(payload["strategy_path"], payload["overrides"] or None)
+    configs = [strategy_config(strategy, **dict(payload["base"], **params)) for params in payload["grid"]]
+    results = run_configs(strategy, store, configs, cache=cache)
+    return [[run_metrics(result), {str(symbol): combos for symbol, combos in result.trade_stats.items()}]
+            for result in results]
+
+
+def run_worker(queue, store, worker=None, cache=None, poll=1.0, stop_when_idle=True):
+    """Claim and run tasks until the queue is drained (or forever with ``stop_when_idle=False``).
+
+    Returns the number of tasks this worker completed.
+    """
+    worker = worker or worker_name()
+    completed = 0
+    while True:
+        task = queue.claim(worker)
+        if task is None:
+            if stop_when_idle and not queue.progress()[LEASED]:
+                return completed
+            time.sleep(poll)
+            continue
+        with Heartbeat(queue, task):
+            try:
+                result = run_task(task.payload, store, cache)
+            except Exception:
+                queue.fail(task, traceback.format_exc())
+                continue
+        if queue.complete(task, result):
+            completed += 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run sweep tasks from a work queue.")
+    parser.add_argument("queue", help="queue database shared by all workers")
+    parser.add_argument("--data", required=True, help="bar store directory on this host")
+    parser.add_argument("--cache", help="result cache directory (local_engine.cache)")
+    parser.add_argument("--lease", type=float, default=60.0, help="lease length in seconds")
+    parser.add_argument("--forever", action="store_true", help="keep polling when the queue is empty")
+    args = parser.parse_args(argv)
+    queue = WorkQueue(args.queue, lease_seconds=args.lease)
+    cache = ResultCache(args.cache) if args.cache else None
+    completed = run_worker(queue, BarStore(args.data), cache=cache, stop_when_idle=not args.forever)
+    print(f"{worker_name()} completed {completed} tasks")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+"""Shared fixtures: the multi-symbol strategy and a small synthetic bar store."""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from local_engine.data import MemoryBarStore, synthetic_series  # noqa: E402
+
+SYMBOLS = ["AAA", "BBB", "CCC"]
+
+
+@pytest.fixture(scope="session")
+def strategy_path():
+    return os.path.join(ROOT, "v2 Multi Symbol.py")
+
+
+@pytest.fixture(scope="session")
+def overrides():
+    """All five indicators on three symbols, about two years of daily bars after warm-up."""
+    return dict(SYMBOLS=SYMBOLS, START_DATE="2015-01-01", END_DATE="2016-12-31", ENABLE_STOCH=True, ENABLE_MFI=True,
+                ENABLE_VOL=True, ENABLE_CHARTING=False)
+
+
+@pytest.fixture(scope="session")
+def store():
+    return MemoryBarStore([synthetic_series(symbol, 1100, start="2014-01-01", seed=seed, volatility=0.03)
+                           for seed, symbol in enumerate(SYMBOLS)])
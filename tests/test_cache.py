@@ -0,0 +1,82 @@
+import hashlib
+
+import numpy as np
+
+from local_engine import cache as cache_module
+from local_engine.cache import ResultCache, data_fingerprint, run_key
+from local_engine.data import MemoryBarStore, synthetic_series
+from local_engine.engine import run_backtest
+from local_engine.halving import SuccessiveHalving
+from local_engine.loader import load_strategy, strategy_config
+from local_engine.walkforward import WalkForward
+
+
+def test_run_key_is_stable_across_loads_and_equal_configs(strategy_path, store, overrides):
+    first, second = load_strategy(strategy_path, overrides), load_strategy(strategy_path, overrides)
+    assert run_key(first, store) == run_key(second, store)
+    assert run_key(first, store, strategy_config(first)) == run_key(second, store, strategy_config(second))
+    assert (run_key(first, store, strategy_config(first, trailing_stop_percent=0.1))
+            == run_key(second, store, strategy_config(second, trailing_stop_percent=0.1)))
+
+
+def test_run_key_changes_with_settings_config_and_data(strategy_path, store, overrides):
+    strategy = load_strategy(strategy_path, overrides)
+    key = run_key(strategy, store, strategy_config(strategy))
+    assert run_key(strategy, store, strategy_config(strategy, trailing_stop_percent=0.1)) != key
+    changed = load_strategy(strategy_path, dict(overrides, MA_FAST_PERIOD=20))
+    assert run_key(changed, store, strategy_config(changed)) != key
+    other_bars = MemoryBarStore([synthetic_series(symbol, 1100, start="2014-01-01", seed=seed + 1)
+                                 for seed, symbol in enumerate(store.symbols())])
+    assert run_key(strategy, other_bars, strategy_config(strategy)) != key
+
+
+def test_repeated_run_is_read_from_the_cache(tmp_path, strategy_path, store, overrides):
+    cache = ResultCache(str(tmp_path))
+    strategy = load_strategy(strategy_path, overrides)
+    config = strategy_config(strategy, end_date="2015-12-31")
+    ran = run_backtest(strategy, store, config=config, cache=cache)
+    cached = run_backtest(strategy, store, config=config, cache=cache)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert cached.algorithm is None
+    assert cached.equity_times == ran.equity_times
+    assert np.array_equal(cached.equity, ran.equity)
+    assert [fill[:3] + fill[4:] for fill in cached.fills] == [fill[:3] + fill[4:] for fill in ran.fills]
+    assert cached.trade_stats == ran.trade_stats
+
+
+def test_data_fingerprint_is_hashed_once_per_series(monkeypatch, store):
+    symbols = store.symbols()
+    first = data_fingerprint(store, symbols)
+    hashed, sha256 = [], hashlib.sha256
+    monkeypatch.setattr(cache_module.hashlib, "sha256", lambda *args: hashed.append(args) or sha256(*args))
+    assert data_fingerprint(store, symbols) == first
+    assert len(hashed) == 1  # only the outer digest
+    store.save(synthetic_series(symbols[0], 1100, start="2014-01-01", seed=99))
+    assert data_fingerprint(store, symbols) != first
+
+
+def test_halving_reads_cached_candidates(tmp_path, strategy_path, store, overrides):
+    grid = [{"trailing_stop_percent": value} for value in (0.05, 0.1, 0.15)]
+    base = {"end_date": "2015-12-31"}
+    cache = ResultCache(str(tmp_path))
+    first = SuccessiveHalving(strategy_path, store, grid, min_budget=1 / 3, base=base, overrides=overrides,
+                              cache=cache).run()
+    assert cache.misses == len(grid) and cache.hits == 0
+    second = SuccessiveHalving(strategy_path, store, grid, min_budget=1 / 3, base=base, overrides=overrides,
+                               cache=cache).run()
+    assert cache.hits == 1
+    assert second.params == first.params
+    assert second.scores == first.scores
+    assert [rung.scores for rung in second.rungs] == [rung.scores for rung in first.rungs]
+
+
+def test_walk_forward_reads_cached_windows(tmp_path, strategy_path, store, overrides):
+    grid = [{"trailing_stop_percent": value} for value in (0.1, 0.15)]
+    cache = ResultCache(str(tmp_path))
+    run = lambda: WalkForward(strategy_path, store, grid, train=180, test=90, start="2015-01-01", end="2015-12-31",
+                              overrides=overrides, workers=1, cache=cache).run()
+    first = run()
+    misses = cache.misses
+    second = run()
+    assert cache.hits == misses
+    assert second.equity == first.equity
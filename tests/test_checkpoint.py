@@ -0,0 +1,51 @@
+import threading
+import time
+
+from local_engine.algorithm_imports import ObjectStore
+from local_engine.checkpoint import Checkpointer
+from local_engine.engine import LocalEngine
+
+
+def trade_stats(result):
+    return {str(symbol): {combo: (stats["count"], stats["wins"], round(stats["total_pnl"], 6))
+                          for combo, stats in combos.items()}
+            for symbol, combos in result.trade_stats.items()}
+
+
+def test_resumed_run_matches_the_uninterrupted_run(tmp_path, strategy_path, store, overrides):
+    object_store = ObjectStore(str(tmp_path))
+    full_engine = LocalEngine(strategy_path, store, overrides=overrides, object_store=object_store,
+                              checkpoint_interval=300)
+    full = full_engine.run()
+    assert full_engine.checkpointer.written >= 1
+
+    resumed = LocalEngine(strategy_path, store, overrides=overrides, object_store=ObjectStore(str(tmp_path)),
+                          resume=True).run()
+    n = len(resumed.equity)
+    assert 0 < n < len(full.equity)
+    assert resumed.equity_times == full.equity_times[-n:]
+    assert resumed.equity == full.equity[-n:]
+    assert resumed.fills and resumed.fills == full.fills[-len(resumed.fills):]
+    assert trade_stats(resumed) == trade_stats(full)
+
+
+def test_resume_without_a_checkpoint_runs_from_the_start(tmp_path, strategy_path, store, overrides):
+    full = LocalEngine(strategy_path, store, overrides=overrides).run()
+    resumed = LocalEngine(strategy_path, store, overrides=overrides, object_store=ObjectStore(str(tmp_path)),
+                          resume=True).run()
+    assert resumed.equity == full.equity
+
+
+def test_locked_checkpointer_pickles_on_the_writer_thread(strategy_path, store, overrides):
+    algorithm = LocalEngine(strategy_path, store, overrides=overrides).run().algorithm
+    lock = threading.Lock()
+    checkpointer = Checkpointer(algorithm, lock=lock)
+    with lock:
+        checkpointer.save()
+        # The writer waits for the lock, so nothing is captured while the step that asked still holds it.
+        time.sleep(0.05)
+        assert checkpointer.written == 0
+        assert not algorithm.object_store.contains_key(checkpointer.key)
+    checkpointer.close()
+    assert checkpointer.written == 1
+    assert checkpointer.load()["time"] == algorithm.time
@@ -0,0 +1,54 @@
+import math
+import os
+
+from local_engine.loader import load_strategy_module
+
+_strategy = load_strategy_module(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                              "v2 Multi Symbol.py"))
+ChartDecimation = _strategy.ChartDecimation
+SeriesDecimator = _strategy.SeriesDecimator
+
+
+def feed(mode, values, size):
+    """``(bar index, value)`` of every point the decimator plots while ``values`` arrive one per bar."""
+    plotted = []
+    bar = [0]
+    decimator = SeriesDecimator(lambda value: plotted.append((bar[0], value)), mode, size)
+    for bar[0], value in enumerate(values):
+        decimator.add(value)
+    decimator.flush()
+    return plotted
+
+
+def wave(n):
+    return [math.sin(i / 7.0) * 10.0 + i * 0.1 for i in range(n)]
+
+
+def test_min_max_plots_each_bucket_when_it_closes():
+    values = wave(100)
+    plotted = feed(ChartDecimation.MIN_MAX, values, 10)
+    kept = [value for _, value in plotted]
+    for start in range(0, 100, 10):
+        bucket = values[start:start + 10]
+        assert min(bucket) in kept and max(bucket) in kept
+    # The first extreme is plotted on the bucket's last bar, the second on the bar after it.
+    assert all(bar < 100 for bar, _ in plotted)
+    assert plotted[0][0] == 9
+    assert len({bar for bar, _ in plotted[:-2]}) == len(plotted[:-2])
+
+
+def test_lttb_keeps_one_point_per_bucket_plus_the_ends():
+    values = wave(101)
+    plotted = feed(ChartDecimation.LTTB, values, 10)
+    assert plotted[0] == (0, values[0])
+    assert plotted[-1][1] == values[-1]
+    # The first point, one per bucket with a complete bucket after it, and the last point.
+    assert len(plotted) == 1 + 9 + 1
+    kept = [value for _, value in plotted[1:-1]]
+    for i, value in enumerate(kept):
+        assert value in values[1 + i * 10:1 + (i + 1) * 10]
+
+
+def test_lttb_plots_a_bucket_once_the_next_one_is_complete():
+    plotted = feed(ChartDecimation.LTTB, wave(41), 10)
+    assert [bar for bar, _ in plotted] == [0, 20, 30, 40, 40]
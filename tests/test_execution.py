@@ -0,0 +1,171 @@
+import asyncio
+import os
+import threading
+import time
+
+import pytest
+
+from local_engine.data import MemoryBarStore, synthetic_series
+from local_engine.execution import ExecutionWorker
+from local_engine.feed import ReplayServer
+from local_engine.live import LiveRunner
+from local_engine.loader import load_strategy_module
+
+STRATEGY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "v2 Multi Symbol.py")
+_strategy = load_strategy_module(STRATEGY)
+# ExecutionWorker builds its reports from the ExecutionReport of the algorithm's module.
+ExecutionReport = _strategy.ExecutionReport
+OrderIntent = _strategy.OrderIntent
+
+
+class GatedAlgorithm:
+    """Records the intents it executes; every execution waits until ``gate`` is set."""
+
+    def __init__(self):
+        self.executed = []
+        self.started = threading.Semaphore(0)
+        self.gate = threading.Event()
+        self.running = 0
+        self.overlap = 0
+        self._lock = threading.Lock()
+
+    def execute_intent(self, intent):
+        with self._lock:
+            self.running += 1
+            self.overlap = max(self.overlap, self.running)
+        self.started.release()
+        try:
+            assert self.gate.wait(5)
+            if intent.direction == 0:
+                raise RuntimeError("no direction")
+            self.executed.append((intent.symbol, intent.direction))
+            return ExecutionReport(intent)
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+def intent(symbol, direction):
+    return OrderIntent(symbol, direction, float(direction), [])
+
+
+@pytest.fixture
+def algorithm():
+    return GatedAlgorithm()
+
+
+def close(worker, algorithm):
+    algorithm.gate.set()
+    worker.close()
+
+
+def test_newer_intent_supersedes_the_queued_one(algorithm):
+    worker = ExecutionWorker(algorithm, threads=1)
+    try:
+        worker.submit(intent("A", 1))
+        assert algorithm.started.acquire(timeout=5)
+        worker.submit(intent("B", 1))
+        worker.submit(intent("A", -1))
+        worker.submit(intent("A", 1))
+        assert worker.coalesced == 1
+        algorithm.gate.set()
+        worker.join()
+    finally:
+        close(worker, algorithm)
+    assert algorithm.executed == [("A", 1), ("B", 1), ("A", 1)]
+    assert [report.status for report in worker.drain_reports()] == [ExecutionReport.DONE] * 3
+
+
+def test_one_symbol_never_executes_concurrently(algorithm):
+    worker = ExecutionWorker(algorithm, threads=4)
+    try:
+        worker.submit(intent("A", 1))
+        assert algorithm.started.acquire(timeout=5)
+        worker.submit(intent("A", -1))
+        assert not algorithm.started.acquire(timeout=0.1)
+        algorithm.gate.set()
+        worker.join()
+    finally:
+        close(worker, algorithm)
+    assert algorithm.executed == [("A", 1), ("A", -1)]
+    assert algorithm.overlap == 1
+
+
+def test_full_queue_rejects_without_waiting(algorithm):
+    worker = ExecutionWorker(algorithm, capacity=1, threads=1, timeout=0)
+    try:
+        assert worker.submit(intent("A", 1))
+        assert algorithm.started.acquire(timeout=5)
+        assert worker.submit(intent("B", 1))
+        assert not worker.submit(intent("C", 1))
+        assert worker.rejected == 1
+        reports = worker.drain_reports()
+        assert [(report.intent.symbol, report.status) for report in reports] == [("C", ExecutionReport.REJECTED)]
+        algorithm.gate.set()
+        worker.join()
+    finally:
+        close(worker, algorithm)
+    assert algorithm.executed == [("A", 1), ("B", 1)]
+
+
+def test_full_queue_waits_for_space_up_to_the_timeout(algorithm):
+    worker = ExecutionWorker(algorithm, capacity=1, threads=1, timeout=5)
+    try:
+        worker.submit(intent("A", 1))
+        assert algorithm.started.acquire(timeout=5)
+        worker.submit(intent("B", 1))
+        threading.Timer(0.05, algorithm.gate.set).start()
+        assert worker.submit(intent("C", 1))
+        worker.join()
+    finally:
+        close(worker, algorithm)
+    assert algorithm.executed == [("A", 1), ("B", 1), ("C", 1)]
+    assert worker.rejected == 0
+
+
+def test_failing_intent_is_reported(algorithm):
+    worker = ExecutionWorker(algorithm, threads=1)
+    algorithm.gate.set()
+    try:
+        worker.submit(intent("A", 0))
+        worker.join()
+    finally:
+        close(worker, algorithm)
+    (report,) = worker.drain_reports()
+    assert report.status == ExecutionReport.FAILED
+    assert "no direction" in report.message
+
+
+def test_live_worker_mode_keeps_the_event_loop_free():
+    tickers = ["AAA", "BBB", "CCC"]
+    store = MemoryBarStore(synthetic_series(ticker, 200, start="2024-01-02", step=1, seed=i, volatility=0.01)
+                           for i, ticker in enumerate(tickers))
+    overrides = dict(SYMBOLS=tickers, MA_FAST_PERIOD=3, MA_SLOW_PERIOD=10, MACD_FAST=3, MACD_SLOW=10, MACD_SIGNAL=5,
+                     REQUIRED_ENTRY_SIGNALS=1, REQUIRED_EXIT_SIGNALS=1, ENABLE_CHARTING=False)
+
+    async def run():
+        async with ReplayServer(store, tickers, interval=0) as server:
+            runner = LiveRunner(STRATEGY, server.host, server.port, overrides, warm_up_frames=20)
+            assert runner.execution is not None
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            # Hold the strategy lock for a while, as the execution worker does around broker calls.
+            runner._lock.acquire()
+            threading.Timer(0.5, runner._lock.release).start()
+            ticker = asyncio.create_task(tick())
+            started = time.perf_counter()
+            report = await runner.run()
+            ticker.cancel()
+            return report, ticks, time.perf_counter() - started
+
+    report, ticks, elapsed = asyncio.run(run())
+    assert report.bars == 600 and report.orders > 0
+    assert elapsed >= 0.5
+    # Steps waiting for the lock ran on the step thread; the loop kept running throughout.
+    assert ticks >= 0.5 * elapsed / 0.01
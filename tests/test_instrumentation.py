@@ -0,0 +1,70 @@
+from local_engine.instrumentation import Instrumentation
+
+
+class Clock:
+    """Fake nanosecond clock the stubs below advance by hand."""
+
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class Order:
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+
+class Intent:
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+
+class SlowFillBrokerage:
+    def __init__(self, clock):
+        self.clock = clock
+
+    def submit(self, algorithm, order):
+        self.clock.now += 1_000
+
+    def wait_for_fill(self, algorithm, order, timeout):
+        self.clock.now += 5_000_000
+
+
+class Algorithm:
+    def __init__(self, clock):
+        self.clock = clock
+        self._brokerage = SlowFillBrokerage(clock)
+        self._indicator_updates = {}
+
+    def execute_intent(self, intent):
+        # liquidate, then a market order that blocks until filled
+        self.clock.now += 10_000
+        order = Order(intent.symbol)
+        self._brokerage.submit(self, order)
+        self._brokerage.wait_for_fill(self, order, 5.0)
+        self.clock.now += 2_000
+
+
+def test_fill_wait_is_its_own_span():
+    clock = Clock()
+    algorithm = Algorithm(clock)
+    instrumentation = Instrumentation(algorithm, clock=clock).attach()
+    algorithm.execute_intent(Intent("AAA"))
+    algorithm.execute_intent(Intent("AAA"))
+    stages = instrumentation.stages
+    assert stages["order_fill_wait"].count == 2
+    assert stages["order_fill_wait"].max == 5_000_000
+    assert stages["order_construction"].count == 2
+    assert stages["order_construction"].max == 13_000
+    assert stages["order_submission"].max == 1_000
+
+
+def test_detach_restores_brokerage():
+    clock = Clock()
+    algorithm = Algorithm(clock)
+    instrumentation = Instrumentation(algorithm, clock=clock).attach()
+    instrumentation.detach()
+    assert "wait_for_fill" not in vars(algorithm._brokerage)
+    assert "execute_intent" not in vars(algorithm)
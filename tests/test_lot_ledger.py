@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from local_engine.loader import load_strategy_module
+
+T0 = datetime(2020, 1, 1)
+
+
+@pytest.fixture
+def ledger(strategy_path):
+    return load_strategy_module(strategy_path).LotLedger("AAA")
+
+
+@pytest.fixture
+def closed():
+    return []
+
+
+@pytest.fixture
+def on_close(closed):
+    def record(symbol, lot, quantity, price, time, exit_flag):
+        closed.append((lot.entry_price, quantity, price, exit_flag))
+    return record
+
+
+def lots(ledger):
+    return [(lot.entry_price, lot.quantity, lot.active_signals) for lot in ledger]
+
+
+def test_pyramided_lots_close_first_in_first_out(ledger, closed, on_close):
+    ledger.apply_fill(100, 10.0, T0, "MA:BUY", on_close)
+    ledger.apply_fill(50, 12.0, T0 + timedelta(days=1), "LBR:BUY", on_close)
+    assert lots(ledger) == [(10.0, 100, "MA:BUY"), (12.0, 50, "LBR:BUY")]
+    assert ledger.position == 150
+
+    ledger.apply_fill(-120, 15.0, T0 + timedelta(days=2), "NO_SIGNAL", on_close, exit_flag=True)
+    assert closed == [(10.0, 100, 15.0, True), (12.0, 20, 15.0, True)]
+    assert lots(ledger) == [(12.0, 30, "LBR:BUY")]
+    assert ledger.position == 30
+
+
+def test_partial_fills_open_and_close_piece_by_piece(ledger, closed, on_close):
+    # One entry order filled in two parts, then an exit filled in three.
+    ledger.apply_fill(60, 10.0, T0, "MA:BUY", on_close)
+    ledger.apply_fill(40, 10.5, T0, "MA:BUY", on_close)
+    for quantity in (-30, -30, -40):
+        ledger.apply_fill(quantity, 11.0, T0 + timedelta(days=1), "MA:SELL", on_close)
+    assert closed == [(10.0, 30, 11.0, False), (10.0, 30, 11.0, False), (10.5, 40, 11.0, False)]
+    assert len(ledger) == 0
+    assert ledger.position == 0
+
+
+def test_fill_through_zero_opens_an_opposite_lot(ledger, closed, on_close):
+    ledger.apply_fill(100, 10.0, T0, "MA:BUY", on_close)
+    ledger.apply_fill(-150, 11.0, T0 + timedelta(days=1), "MA:SELL, LBR:SELL", on_close)
+    assert closed == [(10.0, 100, 11.0, False)]
+    assert lots(ledger) == [(11.0, -50, "MA:SELL, LBR:SELL")]
+    assert ledger.position == -50
+
+    ledger.apply_fill(20, 9.0, T0 + timedelta(days=2), "MA:BUY", on_close)
+    assert closed[-1] == (11.0, -20, 9.0, False)
+    assert lots(ledger) == [(11.0, -30, "MA:SELL, LBR:SELL")]
+
+
+def test_consumed_lots_are_compacted_in_order(ledger, closed, on_close):
+    for i in range(100):
+        ledger.apply_fill(1, float(i), T0 + timedelta(days=i), "MA:BUY", on_close)
+    for i in range(90):
+        ledger.apply_fill(-1, 200.0, T0 + timedelta(days=100 + i), "MA:SELL", on_close)
+    assert [price for price, _, _, _ in closed] == [float(i) for i in range(90)]
+    assert [price for price, _, _ in lots(ledger)] == [float(i) for i in range(90, 100)]
+    assert len(ledger._lots) < 100
+    assert ledger.position == 10
@@ -0,0 +1,30 @@
+import numpy as np
+
+from local_engine.stress import METRICS, StressTest, synthetic_paths
+
+GRID = [{"trailing_stop_percent": 0.05, "required_entry_signals": 1}, {"trailing_stop_percent": 0.15}]
+
+
+def stress(strategy_path, seed, workers):
+    return StressTest(strategy_path, GRID, scenarios=3, bars=300, batch=2, workers=workers, seed=seed,
+                      overrides=dict(SYMBOLS=["AAA", "BBB"], ENABLE_CHARTING=False)).run()
+
+
+def scores(result):
+    return np.stack([getattr(result, metric) for metric in METRICS])
+
+
+def test_synthetic_paths_depend_only_on_the_seed():
+    first, second = synthetic_paths(4, 50, seed=(3, 1)), synthetic_paths(4, 50, seed=(3, 1))
+    assert all(np.array_equal(first[column], second[column]) for column in first)
+    assert not np.array_equal(first["close"], synthetic_paths(4, 50, seed=(3, 2))["close"])
+
+
+def test_seeded_batch_gives_the_same_scores(strategy_path):
+    result = stress(strategy_path, 7, workers=1)
+    assert result.scenarios == 3
+    assert result.fills[:, 0].min() > 0
+    # Same seed, in this process or split over a pool: identical scores.
+    assert np.array_equal(scores(result), scores(stress(strategy_path, 7, workers=1)))
+    assert np.array_equal(scores(result), scores(stress(strategy_path, 7, workers=2)))
+    assert not np.array_equal(scores(result), scores(stress(strategy_path, 8, workers=1)))
@@ -0,0 +1,24 @@
+import pytest
+
+from local_engine.tpe import Choice, Int, TPEOptimizer
+
+
+def test_symbols_cover_every_symbols_choice(strategy_path, store, overrides):
+    space = {"symbols": Choice([("AAA",), ("BBB", "CCC")]), "ma_fast_period": Int(5, 20)}
+    optimizer = TPEOptimizer(strategy_path, store, space, base={"symbols": ("AAA", "BBB")}, overrides=overrides)
+    assert sorted(optimizer.symbols()) == ["AAA", "BBB", "CCC"]
+
+
+def test_symbols_must_be_a_choice(strategy_path, store, overrides):
+    optimizer = TPEOptimizer(strategy_path, store, {"symbols": Int(1, 3)}, overrides=overrides)
+    with pytest.raises(ValueError):
+        optimizer.symbols()
+
+
+def test_pooled_trials_read_symbols_outside_the_base_config(strategy_path, store, overrides):
+    space = {"symbols": Choice([("AAA",), ("CCC",)])}
+    base = {"symbols": ("AAA",), "end_date": "2015-06-30"}
+    result = TPEOptimizer(strategy_path, store, space, base=base, overrides=overrides, workers=2,
+                          startup=4).run(trials=4)
+    assert len(result.trials) == 4
+    assert {trial.params["symbols"] for trial in result.trials} <= {("AAA",), ("CCC",)}
@@ -0,0 +1,25 @@
+from local_engine.walkforward import WalkForward
+
+GRID = [{"trailing_stop_percent": 0.05, "required_entry_signals": 1}, {"trailing_stop_percent": 0.15}]
+
+
+def walk_forward(strategy_path, store, overrides, workers=1, **options):
+    return WalkForward(strategy_path, store, GRID, train=240, test=90, step=60, overrides=overrides, workers=workers,
+                       **options).run()
+
+
+def summary(result):
+    return [(window.params, window.scores, window.test_equity) for window in result.windows], result.equity
+
+
+def test_reused_indicators_match_history_seeding_without_the_stochastic_rsi(strategy_path, store, overrides):
+    # Every other indicator is fully determined by its warm-up bars, so playback changes nothing.
+    overrides = dict(overrides, ENABLE_STOCH=False)
+    reused = walk_forward(strategy_path, store, overrides, reuse_indicators=True)
+    assert len(reused.windows) > 3
+    assert summary(reused) == summary(walk_forward(strategy_path, store, overrides))
+
+
+def test_reused_indicators_reach_pool_workers(strategy_path, store, overrides):
+    reused = walk_forward(strategy_path, store, overrides, reuse_indicators=True)
+    assert summary(walk_forward(strategy_path, store, overrides, workers=2, reuse_indicators=True)) == summary(reused)
@@ -0,0 +1,45 @@
+import pytest
+
+from local_engine.engine import LocalEngine
+
+# Per indicator: the dicts holding its indicators, its crossover windows, and whether the previous close matters.
+INDICATORS = {
+    "MA": (("short_sma_indicators", "long_sma_indicators"), ("ma9_window", "ma20_window"), ()),
+    "STOCH": (("srsi_indicators",), ("stoch_k_window", "stoch_d_window"), ("stoch_k_cross_window", "stoch_d_cross_window")),
+    "LBR": (("macd_indicators",), ("lbr_window", "lbr_signal_window"), ()),
+    "MFI": (("mfi_indicators",), ("mfi_window",), ()),
+    "VOL": (("sma_vol_indicators",), (), ()),
+}
+
+
+def only(indicator, overrides, **changes):
+    enabled = {f"ENABLE_{name}": name == indicator for name in INDICATORS}
+    return dict(overrides, **enabled, START_DATE="2015-06-01", END_DATE="2015-09-30", **changes)
+
+
+@pytest.mark.parametrize("indicator", list(INDICATORS))
+def test_history_warm_up_matches_replay_over_the_same_bars(indicator, strategy_path, store, overrides):
+    indicator_dicts, value_windows, cross_windows = INDICATORS[indicator]
+    seeded = LocalEngine(strategy_path, store, overrides=only(indicator, overrides, WARM_UP_MODE="HISTORY"))
+    history = seeded.create_algorithm()
+    # A REPLAY warm-up over exactly the bars the history seed reads gives the same indicator values.
+    bars = max(value.warm_up_period for name in indicator_dicts for value in getattr(history, name).values())
+
+    replay_overrides = only(indicator, overrides, WARM_UP_MODE="REPLAY", WARM_UP_BARS=bars)
+    replayed = LocalEngine(strategy_path, store, overrides=dict(replay_overrides, END_DATE="2015-05-31")).run().algorithm
+    for symbol in history.symbols:
+        for name in value_windows:
+            assert getattr(history, name)[symbol][0] == pytest.approx(getattr(replayed, name)[symbol][0], rel=1e-9)
+        for name in cross_windows:
+            assert list(getattr(history, name)[symbol]) == list(getattr(replayed, name)[symbol])
+        assert history.previous_close[symbol] == (replayed.previous_close[symbol] if indicator == "VOL" else None)
+
+    live_history = seeded.run()
+    live_replay = LocalEngine(strategy_path, store, overrides=replay_overrides).run()
+    assert live_history.equity_times == live_replay.equity_times
+    n = len(live_history.equity)
+    for symbol in history.symbols:
+        signals = live_history.algorithm.indicator_signal_lists[symbol][indicator]
+        expected = live_replay.algorithm.indicator_signal_lists[symbol][indicator]
+        assert signals[-n:] == expected[-n:]
+        assert len(signals) - len(expected) == -bars + (indicator == "VOL")
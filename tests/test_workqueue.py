@@ -0,0 +1,64 @@
+import time
+
+import pytest
+
+from local_engine.workqueue import DONE, FAILED, PENDING, WorkQueue
+
+GRID = [{"ma_fast_period": 20}, {"ma_fast_period": 30}]
+
+
+@pytest.fixture
+def queue_path(tmp_path):
+    return str(tmp_path / "queue.db")
+
+
+def test_expired_lease_goes_to_another_worker(queue_path, strategy_path):
+    queue = WorkQueue(queue_path, lease_seconds=0.05)
+    assert queue.submit("sweep", strategy_path, GRID, chunk=2) == 1
+    first = queue.claim("worker-1")
+    assert first.attempts == 1
+    assert queue.claim("worker-2") is None
+
+    time.sleep(0.1)
+    second = queue.claim("worker-2")
+    assert (second.id, second.attempts) == (first.id, 2)
+    # The stalled worker lost its lease: it can neither renew nor overwrite the new owner's result.
+    assert not queue.heartbeat(first)
+    assert not queue.complete(first, [["stale", {}]] * 2)
+    assert queue.complete(second, [[{"final_equity": 1.0}, {}], [{"final_equity": 2.0}, {}]])
+    assert queue.progress("sweep")[DONE] == 1
+    assert [metrics["final_equity"] for _, (metrics, _) in queue.results("sweep")] == [1.0, 2.0]
+
+
+def test_heartbeat_keeps_the_lease(queue_path, strategy_path):
+    queue = WorkQueue(queue_path, lease_seconds=0.2)
+    queue.submit("sweep", strategy_path, GRID)
+    task = queue.claim("worker-1")
+    for _ in range(3):
+        time.sleep(0.1)
+        assert queue.heartbeat(task)
+    assert queue.claim("worker-2") is None
+
+
+def test_failed_task_is_retried_until_max_attempts(queue_path, strategy_path):
+    queue = WorkQueue(queue_path, max_attempts=2)
+    queue.submit("sweep", strategy_path, GRID)
+    task = queue.claim("worker-1")
+    assert queue.fail(task, "boom")
+    assert queue.progress("sweep")[PENDING] == 1
+
+    retry = queue.claim("worker-2")
+    assert retry.attempts == 2
+    assert queue.fail(retry, "boom again")
+    assert queue.claim("worker-3") is None
+    assert queue.progress("sweep")[FAILED] == 1
+    assert queue.failures("sweep") == [(task.id, "worker-2", 2, "boom again")]
+
+
+def test_expired_lease_counts_as_an_attempt(queue_path, strategy_path):
+    queue = WorkQueue(queue_path, lease_seconds=0.05, max_attempts=1)
+    queue.submit("sweep", strategy_path, GRID)
+    task = queue.claim("worker-1")
+    time.sleep(0.1)
+    assert queue.claim("worker-2") is None
+    assert queue.failures("sweep") == [(task.id, "worker-1", 1, "lease expired")]
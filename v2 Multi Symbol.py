@@ -1,13 +1,35 @@
 from AlgorithmImports import *
+import heapq
+import json
 import math
+import struct
+from dataclasses import dataclass, field, fields, replace
+from datetime import datetime, timedelta
 
 class SignalMode:
     WEIGHTED = "WEIGHTED"
     COUNT = "COUNT"
+
+class WarmUpMode:
+    REPLAY = "REPLAY"      # replay WARM_UP_BARS bars through OnData before trading
+    HISTORY = "HISTORY"    # seed every indicator from one history read in Initialize; ready on the first bar
+
+class ChartSelection:
+    ALL = "ALL"
+    WATCHLIST = "WATCHLIST"  # only the tickers in CHART_WATCHLIST
+    TOP_PNL = "TOP_PNL"      # the CHART_TOP_N symbols with the highest realized PnL so far
+
+class ChartDecimation:
+    LTTB = "LTTB"          # largest-triangle-three-buckets: one point per bucket, keeps the visual shape
+    MIN_MAX = "MIN_MAX"    # lowest and highest point of every bucket, keeps extremes
+    NONE = "NONE"          # plot every point
+
 SYMBOLS = ["AAPL", "MSFT", "AMZN", "NVDA", "GOOGL", "META", "NFLX", "AVGO"]
 START_DATE = "2015-01-01"
 END_DATE = "2025-08-01"
 INITIAL_CASH = 1000000
+WARM_UP_MODE = WarmUpMode.REPLAY
+WARM_UP_BARS = 50   # REPLAY only: bars replayed before trading; only indicators and crossover state are updated during warm-up
 TRIGGER_WINDOW = 1
 SIGNAL_CALCULATION_MODE = SignalMode.COUNT
 WEIGHTED_THRESHOLD_FACTOR = 1.0   # kept for completeness (ignored in COUNT mode)
@@ -51,22 +73,507 @@ ENABLE_LBR_CHART = True
 ENABLE_MFI_CHART = False
 ENABLE_VOL_CHART = False
 ENABLE_TRADE_CHART = True
+CHART_SELECTION = ChartSelection.ALL
+CHART_WATCHLIST = ["AAPL", "NVDA"]
+CHART_TOP_N = 10
+CHART_DECIMATION = ChartDecimation.LTTB
+CHART_POINTS_PER_SERIES = 4000   # line series are thinned to about this many points; signal markers are always kept
+ENABLE_EVENT_LOG = True          # structured binary trade/fill log in the ObjectStore instead of per-trade debug strings
+EVENT_LOG_KEY = "v2-multi-symbol/events"
+EVENT_LOG_CHUNK_RECORDS = 65536
+CHECKPOINT_STATE_VERSION = 1     # bump when checkpoint_state() changes shape
+
+INDICATORS = ("MA", "STOCH", "LBR", "MFI", "VOL")
+
+@dataclass(frozen=True)
+class StrategyConfig:
+    """Immutable, hashable settings of one strategy run; one field per module-level setting above.
+
+    ``from_settings()`` reads the module-level settings, so on QuantConnect the
+    constants stay the place to configure the strategy. Off-platform runners
+    can set ``algorithm.config`` before ``Initialize`` to run many configs from
+    one loaded module; equal configs hash equally, so they work as cache keys.
+    Values the per-bar loop needs are derived once in ``__post_init__``:
+    ``indicators`` (the enabled indicators in signal order), ``signal_weights``
+    (what a BUY/SELL of each adds to the net signal: its weight in WEIGHTED
+    mode, 1 in COUNT mode) and the ``entry_threshold``/``exit_threshold`` the
+    net signal is compared against.
+    """
+    symbols: tuple
+    start_date: str
+    end_date: str
+    initial_cash: float
+    warm_up_mode: str
+    warm_up_bars: int
+    trigger_window: int
+    signal_calculation_mode: str
+    weighted_threshold_factor: float
+    required_entry_signals: int
+    required_exit_signals: int
+    first_trade_allocation: float
+    repeat_trade_allocation: float
+    max_allocation_per_symbol: float
+    enable_trailing_stops: bool
+    trailing_stop_percent: float
+    enable_ma: bool
+    enable_stoch: bool
+    enable_lbr: bool
+    enable_mfi: bool
+    enable_vol: bool
+    ma_weight: float
+    stoch_weight: float
+    lbr_weight: float
+    mfi_weight: float
+    vol_weight: float
+    ma_fast_period: int
+    ma_slow_period: int
+    stoch_period: int
+    stoch_smooth_k: int
+    stoch_smooth_d: int
+    stoch_upper: float
+    stoch_lower: float
+    stoch_lookback: int
+    mfi_period: int
+    mfi_upper: float
+    mfi_lower: float
+    macd_fast: int
+    macd_slow: int
+    macd_signal: int
+    volume_spike_multiplier: float
+    volume_lookback: int
+    enable_charting: bool
+    enable_ma_chart: bool
+    enable_stoch_chart: bool
+    enable_lbr_chart: bool
+    enable_mfi_chart: bool
+    enable_vol_chart: bool
+    enable_trade_chart: bool
+    chart_selection: str
+    chart_watchlist: tuple
+    chart_top_n: int
+    chart_decimation: str
+    chart_points_per_series: int
+    enable_event_log: bool
+    event_log_key: str
+    event_log_chunk_records: int
+    indicators: tuple = field(init=False, repr=False, compare=False)
+    signal_weights: tuple = field(init=False, repr=False, compare=False)
+    entry_threshold: float = field(init=False, repr=False, compare=False)
+    exit_threshold: float = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.trigger_window < 1:
+            raise ValueError("trigger_window must be at least 1")
+        if self.signal_calculation_mode not in (SignalMode.WEIGHTED, SignalMode.COUNT):
+            raise ValueError(f"unknown signal calculation mode {self.signal_calculation_mode!r}")
+        derive = lambda name, value: object.__setattr__(self, name, value)
+        derive("symbols", tuple(self.symbols))
+        derive("chart_watchlist", tuple(self.chart_watchlist))
+        enabled = (self.enable_ma, self.enable_stoch, self.enable_lbr, self.enable_mfi, self.enable_vol)
+        weights = (self.ma_weight, self.stoch_weight, self.lbr_weight, self.mfi_weight, self.vol_weight)
+        weighted = self.signal_calculation_mode == SignalMode.WEIGHTED
+        derive("indicators", tuple(name for name, on in zip(INDICATORS, enabled) if on))
+        derive("signal_weights", tuple(weight if weighted else 1 for weight, on in zip(weights, enabled) if on))
+        if weighted:
+            derive("entry_threshold", self.weighted_threshold_factor)
+            derive("exit_threshold", -self.weighted_threshold_factor)
+        else:
+            derive("entry_threshold", self.required_entry_signals)
+            derive("exit_threshold", -self.required_exit_signals)
+
+    @classmethod
+    def from_settings(cls, **changes):
+        """The module-level settings as read now (after any loader overrides), with ``changes`` by field name."""
+        settings = globals()
+        return cls(**{f.name: changes.pop(f.name, settings[f.name.upper()]) for f in fields(cls) if f.init}, **changes)
+
+    def replace(self, **changes):
+        return replace(self, **changes)
+
+class Lot:
+    __slots__ = ("entry_time", "entry_price", "quantity", "active_signals")
+
+    def __init__(self, entry_time, entry_price, quantity, active_signals):
+        self.entry_time = entry_time
+        self.entry_price = entry_price
+        self.quantity = quantity
+        self.active_signals = active_signals
+
+class LotLedger:
+    """FIFO ledger of the open lots of one symbol.
+
+    Lots live in a plain list consumed from a head index, so opening a lot is an
+    append and matching a fill against the oldest lots is amortized O(1).
+    """
+    __slots__ = ("symbol", "_lots", "_head", "position")
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+        self._lots = []
+        self._head = 0
+        self.position = 0.0
+
+    def __len__(self):
+        return len(self._lots) - self._head
+
+    def __iter__(self):
+        for i in range(self._head, len(self._lots)):
+            yield self._lots[i]
+
+    def apply_fill(self, fill_quantity, fill_price, fill_time, active_signals, on_close, exit_flag=False):
+        """Apply one (partial) fill; calls on_close(symbol, lot, closed_quantity, fill_price, fill_time, exit_flag) per matched piece."""
+        remaining = fill_quantity
+        lots = self._lots
+        while remaining != 0 and self._head < len(lots):
+            lot = lots[self._head]
+            if (lot.quantity > 0) == (remaining > 0):
+                break
+            if abs(remaining) >= abs(lot.quantity):
+                closed = lot.quantity
+                self._head += 1
+            else:
+                closed = -remaining
+                lot.quantity -= closed
+            remaining += closed
+            self.position -= closed
+            on_close(self.symbol, lot, closed, fill_price, fill_time, exit_flag)
+
+        if self._head == len(lots):
+            lots.clear()
+            self._head = 0
+        elif self._head > 32 and self._head * 2 > len(lots):
+            del lots[:self._head]
+            self._head = 0
+
+        if remaining != 0:
+            lots.append(Lot(fill_time, fill_price, remaining, active_signals))
+            self.position += remaining
+
+class EventType:
+    FLIP = 1
+    ENTER = 2
+    INCREASE = 3
+    REJECTED = 4
+    FAILED = 5
+    FILL = 6
+    TRAILING_STOP_FILL = 7
+    NAMES = {1: "FLIP", 2: "ENTER", 3: "INCREASE", 4: "REJECTED", 5: "FAILED", 6: "FILL", 7: "TRAILING_STOP_FILL"}
+
+# Bit of each "<indicator>:<direction>" entry of active_signals in an event's combo mask.
+SIGNAL_BITS = {f"{indicator}:{direction}": 1 << (2 * i + j)
+               for i, indicator in enumerate(("MA", "STOCH", "LBR", "MFI", "VOL"))
+               for j, direction in enumerate(("BUY", "SELL"))}
+EVENT_EPOCH = datetime(1970, 1, 1)
+
+class EventLog:
+    """Append-only log of fixed-size binary event records in the ObjectStore.
+
+    Each record is ``RECORD``: time (microseconds since 1970, algorithm time),
+    symbol id (index into the ``symbols`` list of the metadata object), event
+    type, net signal, combo bitmask, price and quantity. Records are packed
+    into a preallocated buffer and written as numbered chunk objects
+    ``<key>/<n>`` every ``chunk_records`` records and on ``flush``;
+    ``<key>/meta`` describes the schema. ``local_engine.event_log`` reads a log
+    back as a table.
+    """
+    VERSION = 1
+    RECORD = struct.Struct("<qIHfIdd")
+    FIELDS = ("time_us", "symbol_id", "event_type", "net_signal", "combo_mask", "price", "quantity")
+
+    def __init__(self, store, key, symbols, chunk_records):
+        self.store = store
+        self.key = key
+        self.symbol_ids = {symbol: i for i, symbol in enumerate(symbols)}
+        self.chunk_records = chunk_records
+        self._buffer = bytearray(self.RECORD.size * chunk_records)
+        self._offset = 0
+        self._chunk = 0
+        self._masks = {}
+        store.save(f"{key}/meta", json.dumps({
+            "version": self.VERSION,
+            "format": self.RECORD.format,
+            "fields": self.FIELDS,
+            "symbols": [symbol.Value for symbol in symbols],
+            "event_types": EventType.NAMES,
+            "signal_bits": SIGNAL_BITS,
+        }))
+
+    def combo_mask(self, active_signals):
+        """Bitmask of an ``active_signals`` list or a ``combo_key`` string (memoized per distinct key)."""
+        key = active_signals if isinstance(active_signals, str) else ", ".join(active_signals)
+        mask = self._masks.get(key)
+        if mask is None:
+            mask = 0
+            for signal in key.split(", "):
+                mask |= SIGNAL_BITS.get(signal, 0)
+            self._masks[key] = mask
+        return mask
+
+    def write(self, time, symbol, event_type, net_signal, combo_mask, price, quantity):
+        self.RECORD.pack_into(self._buffer, self._offset, (time - EVENT_EPOCH) // timedelta(microseconds=1),
+                              self.symbol_ids[symbol], event_type, net_signal, combo_mask, price, quantity)
+        self._offset += self.RECORD.size
+        if self._offset == len(self._buffer):
+            self.flush()
+
+    def flush(self):
+        if self._offset:
+            self.store.save_bytes(f"{self.key}/{self._chunk:06d}", bytes(self._buffer[:self._offset]))
+            self._chunk += 1
+            self._offset = 0
+
+    def checkpoint_state(self):
+        return {"chunk": self._chunk, "pending": bytes(self._buffer[:self._offset])}
+
+    def restore_state(self, state):
+        """Continue a checkpointed log; chunks written after the checkpoint are dropped."""
+        self._chunk = state["chunk"]
+        pending = state["pending"]
+        self._buffer[:len(pending)] = pending
+        self._offset = len(pending)
+        chunk = self._chunk
+        while self.store.delete(f"{self.key}/{chunk:06d}"):
+            chunk += 1
+
+class OrderIntent:
+    __slots__ = ("symbol", "direction", "net_signal", "active_signals", "combo_key")
+
+    def __init__(self, symbol, direction, net_signal, active_signals):
+        self.symbol = symbol
+        self.direction = direction
+        self.net_signal = net_signal
+        self.active_signals = active_signals
+        self.combo_key = ", ".join(sorted(active_signals)) if active_signals else "NO_SIGNAL"
+
+class ExecutionReport:
+    DONE = "DONE"
+    REJECTED = "REJECTED"
+    FAILED = "FAILED"
+    __slots__ = ("intent", "action", "target", "status", "message")
+
+    def __init__(self, intent, status=DONE, message=""):
+        self.intent = intent
+        self.action = None
+        self.target = None
+        self.status = status
+        self.message = message
+
+class InlineExecution:
+    """Executes order intents on the algorithm thread as they are submitted (the QuantConnect default).
+
+    Off-platform runners swap in a queued worker (``local_engine.execution``) by
+    setting ``algorithm.execution`` before ``Initialize``.
+    """
+
+    def __init__(self, algorithm):
+        self.algorithm = algorithm
+
+    def submit(self, intent):
+        self.algorithm.on_execution_report(self.algorithm.execute_intent(intent))
+        return True
+
+    def drain_reports(self):
+        return ()
+
+class ChartPolicy:
+    """Decides which symbols are charted; ``selected`` is the current set."""
+
+    def __init__(self, mode, symbols, watchlist=(), top_n=0):
+        self.mode = mode
+        self.top_n = top_n
+        self.realized_pnl = {}
+        if mode == ChartSelection.ALL:
+            self.selected = set(symbols)
+        elif mode == ChartSelection.WATCHLIST:
+            tickers = set(watchlist)
+            self.selected = {symbol for symbol in symbols if symbol.Value in tickers}
+        else:
+            self.selected = set()
+
+    def record_pnl(self, symbol, pnl):
+        if self.mode != ChartSelection.TOP_PNL:
+            return
+        realized = self.realized_pnl
+        realized[symbol] = realized.get(symbol, 0.0) + pnl
+        if len(realized) <= self.top_n:
+            self.selected.add(symbol)
+        else:
+            self.selected = set(heapq.nlargest(self.top_n, realized, key=realized.get))
+
+SIGNAL_SERIES = {"BUY": "Buy Signal", "SELL": "Sell Signal"}
+TRADE_SERIES = {"BUY": "Entry", "SELL": "Exit"}
+
+class PlotTarget:
+    """Chart/series name pair of one line series, plus its decimator once the chart exists."""
+    __slots__ = ("chart", "series", "decimator")
+
+    def __init__(self, chart, series):
+        self.chart = chart
+        self.series = series
+        self.decimator = None
+
+class SymbolCharts:
+    """Chart and series names of one symbol, formatted once so the per-bar plots build no strings."""
+    __slots__ = ("ma", "stochrsi", "lbrosc", "mfi", "volume", "trade",
+                 "ma_fast", "ma_slow", "stoch_k", "stoch_d", "macd", "macd_signal",
+                 "mfi_value", "volume_bar", "volume_threshold", "price")
+
+    def __init__(self, ticker):
+        self.ma = f"{ticker}_MA"
+        self.stochrsi = f"{ticker}_STOCHRSI"
+        self.lbrosc = f"{ticker}_LBROSC"
+        self.mfi = f"{ticker}_MFI"
+        self.volume = f"{ticker}_VOLUME"
+        self.trade = f"{ticker}_TradeSignals"
+        self.ma_fast = PlotTarget(self.ma, "9 Period Value")
+        self.ma_slow = PlotTarget(self.ma, "20 Period Value")
+        self.stoch_k = PlotTarget(self.stochrsi, "K Value")
+        self.stoch_d = PlotTarget(self.stochrsi, "D Value")
+        self.macd = PlotTarget(self.lbrosc, "MACD Value")
+        self.macd_signal = PlotTarget(self.lbrosc, "MACD Signal Value")
+        self.mfi_value = PlotTarget(self.mfi, "MFI Value")
+        self.volume_bar = PlotTarget(self.volume, "Volume")
+        self.volume_threshold = PlotTarget(self.volume, "SMA Volume * Multiplier")
+        self.price = PlotTarget(self.trade, "Price")
+
+BARS_PER_CALENDAR_DAY = {
+    Resolution.DAILY: 252 / 365,
+    Resolution.HOUR: 7 * 252 / 365,
+    Resolution.MINUTE: 390 * 252 / 365,
+    Resolution.SECOND: 23400 * 252 / 365,
+}
+
+class SeriesDecimator:
+    """Thins the values of one line series in buckets of ``bucket_size`` and passes the kept ones to ``plot``.
+
+    LTTB picks, per bucket, the point forming the largest triangle with the
+    previously kept point and the mean of the next bucket, so a bucket is
+    plotted as soon as the bucket after it is complete. MIN_MAX keeps the
+    bucket's extremes in their order and plots them when the bucket closes,
+    the second one on the next bar so that each point gets its own time.
+    ``plot`` stamps the current bar, so a kept point is shown up to two
+    buckets after the bar it came from.
+    """
+    __slots__ = ("plot", "mode", "bucket_size", "_values", "_offset", "_anchor", "_pending")
+
+    def __init__(self, plot, mode, bucket_size):
+        self.plot = plot
+        self.mode = mode
+        self.bucket_size = bucket_size
+        self._values = []
+        self._offset = 0
+        self._anchor = None
+        self._pending = None
+
+    def add(self, value):
+        if self._pending is not None:
+            self.plot(self._pending)
+            self._pending = None
+        values = self._values
+        if self.mode == ChartDecimation.MIN_MAX:
+            values.append(value)
+            if len(values) == self.bucket_size:
+                self._plot_extremes(False)
+        elif self._anchor is None:
+            self.plot(value)
+            self._anchor = (0, value)
+            self._offset = 1
+        else:
+            values.append(value)
+            if len(values) == 2 * self.bucket_size:
+                self._plot_largest_triangle()
+
+    def flush(self):
+        if self._pending is not None:
+            self.plot(self._pending)
+            self._pending = None
+        values = self._values
+        if not values:
+            return
+        if self.mode == ChartDecimation.MIN_MAX:
+            self._plot_extremes(True)
+            return
+        if len(values) > self.bucket_size:
+            self._plot_largest_triangle()
+        if values:
+            self.plot(values[-1])
+            self._anchor = (self._offset + len(values) - 1, values[-1])
+            self._offset += len(values)
+            values.clear()
+
+    def _plot_extremes(self, final):
+        values = self._values
+        low = values.index(min(values))
+        high = values.index(max(values))
+        self.plot(values[min(low, high)])
+        if low != high:
+            if final:
+                self.plot(values[max(low, high)])
+            else:
+                self._pending = values[max(low, high)]
+        values.clear()
+
+    def _plot_largest_triangle(self):
+        values, size, offset = self._values, self.bucket_size, self._offset
+        count = len(values)
+        next_x = offset + (size + count - 1) / 2.0
+        next_y = sum(values[size:]) / (count - size)
+        anchor_x, anchor_y = self._anchor
+        dx = anchor_x - next_x
+        dy = next_y - anchor_y
+        best, best_area = 0, -1.0
+        for i in range(size):
+            area = abs(dx * (values[i] - anchor_y) - (anchor_x - offset - i) * dy)
+            if area > best_area:
+                best, best_area = i, area
+        self.plot(values[best])
+        self._anchor = (offset + best, values[best])
+        del values[:size]
+        self._offset += size
+
+def line_cross(line, other):
+    """``BUY`` when the newest entry of ``line`` crossed above ``other``, ``SELL`` when it crossed below."""
+    if line[0] > other[0] and line[1] < other[1]:
+        return "BUY"
+    if line[0] < other[0] and line[1] > other[1]:
+        return "SELL"
+    return None
+
+def level_cross(window, lower, upper):
+    """``BUY`` when the newest entry of ``window`` rose through ``lower``, ``SELL`` when it fell through ``upper``."""
+    if window[0] > lower and window[1] < lower:
+        return "BUY"
+    if window[0] < upper and window[1] > upper:
+        return "SELL"
+    return None
+
+def chart_bucket_size(config, span_days, resolution):
+    """Points per decimation bucket so a series spanning ``span_days`` stays near ``config.chart_points_per_series``."""
+    if config.chart_decimation == ChartDecimation.NONE:
+        return 1
+    expected = span_days * BARS_PER_CALENDAR_DAY.get(resolution, 1.0)
+    points_per_bucket = 2 if config.chart_decimation == ChartDecimation.MIN_MAX else 1
+    return max(int(math.ceil(expected * points_per_bucket / config.chart_points_per_series)), 1)
 
 class HighCapMultiIndicatorStrategy(QCAlgorithm):
     def Initialize(self):
-        start_year, start_month, start_day = map(int, START_DATE.split("-"))
-        end_year, end_month, end_day = map(int, END_DATE.split("-"))
+        if getattr(self, "config", None) is None:
+            self.config = StrategyConfig.from_settings()
+        config = self.config
+        start_year, start_month, start_day = map(int, config.start_date.split("-"))
+        end_year, end_month, end_day = map(int, config.end_date.split("-"))
         self.set_start_date(start_year, start_month, start_day)
         self.set_end_date(end_year, end_month, end_day)
-        self.set_cash(INITIAL_CASH)
+        self.set_cash(config.initial_cash)
         self.resolution = Resolution.DAILY
         
         self.set_brokerage_model(BrokerageName.QUANT_CONNECT_BROKERAGE)
         
-        self.set_warm_up(50, self.resolution)
+        if config.warm_up_mode == WarmUpMode.REPLAY:
+            self.set_warm_up(config.warm_up_bars, self.resolution)
 
         self.symbols = []
-        for ticker in SYMBOLS:
+        for ticker in config.symbols:
             symbol = self.add_equity(ticker, self.resolution).Symbol
             self.symbols.append(symbol)
 
@@ -78,17 +585,17 @@ class HighCapMultiIndicatorStrategy(QCAlgorithm):
         self.sma_vol_indicators = {}
 
         for symbol in self.symbols:
-            if ENABLE_MA:
-                self.short_sma_indicators[symbol] = self.sma(symbol, MA_FAST_PERIOD, self.resolution)
-                self.long_sma_indicators[symbol] = self.sma(symbol, MA_SLOW_PERIOD, self.resolution)
-            if ENABLE_STOCH:
-                self.srsi_indicators[symbol] = self.srsi(symbol, STOCH_PERIOD, STOCH_PERIOD, STOCH_SMOOTH_K, STOCH_SMOOTH_D, MovingAverageType.SIMPLE, self.resolution)
-            if ENABLE_LBR:
-                self.macd_indicators[symbol] = self.macd(symbol, MACD_FAST, MACD_SLOW, MACD_SIGNAL, MovingAverageType.SIMPLE, self.resolution)
-            if ENABLE_MFI:
-                self.mfi_indicators[symbol] = self.mfi(symbol, MFI_PERIOD)
-            if ENABLE_VOL:
-                self.sma_vol_indicators[symbol] = self.sma(symbol, VOLUME_LOOKBACK, self.resolution, Field.VOLUME)
+            if config.enable_ma:
+                self.short_sma_indicators[symbol] = self.sma(symbol, config.ma_fast_period, self.resolution)
+                self.long_sma_indicators[symbol] = self.sma(symbol, config.ma_slow_period, self.resolution)
+            if config.enable_stoch:
+                self.srsi_indicators[symbol] = self.srsi(symbol, config.stoch_period, config.stoch_period, config.stoch_smooth_k, config.stoch_smooth_d, MovingAverageType.SIMPLE, self.resolution)
+            if config.enable_lbr:
+                self.macd_indicators[symbol] = self.macd(symbol, config.macd_fast, config.macd_slow, config.macd_signal, MovingAverageType.SIMPLE, self.resolution)
+            if config.enable_mfi:
+                self.mfi_indicators[symbol] = self.mfi(symbol, config.mfi_period)
+            if config.enable_vol:
+                self.sma_vol_indicators[symbol] = self.sma(symbol, config.volume_lookback, self.resolution, Field.VOLUME)
 
         self.ma_indicator_signals = {}
         self.stoch_indicator_signals = {}
@@ -118,16 +625,16 @@ class HighCapMultiIndicatorStrategy(QCAlgorithm):
         self.previous_close = {}
 
         for symbol in self.symbols:
-            if ENABLE_MA:
-                self.ma_indicator_signals[symbol] = [None] * TRIGGER_WINDOW
-            if ENABLE_STOCH:
-                self.stoch_indicator_signals[symbol] = [None] * TRIGGER_WINDOW
-            if ENABLE_LBR:
-                self.lbr_indicator_signals[symbol] = [None] * TRIGGER_WINDOW
-            if ENABLE_MFI:
-                self.mfi_indicator_signals[symbol] = [None] * TRIGGER_WINDOW
-            if ENABLE_VOL:
-                self.vol_indicator_signals[symbol] = [None] * TRIGGER_WINDOW
+            if config.enable_ma:
+                self.ma_indicator_signals[symbol] = [None] * config.trigger_window
+            if config.enable_stoch:
+                self.stoch_indicator_signals[symbol] = [None] * config.trigger_window
+            if config.enable_lbr:
+                self.lbr_indicator_signals[symbol] = [None] * config.trigger_window
+            if config.enable_mfi:
+                self.mfi_indicator_signals[symbol] = [None] * config.trigger_window
+            if config.enable_vol:
+                self.vol_indicator_signals[symbol] = [None] * config.trigger_window
 
             self.ma9_values[symbol] = []
             self.ma20_values[symbol] = []
@@ -143,300 +650,489 @@ class HighCapMultiIndicatorStrategy(QCAlgorithm):
             self.ma20_window[symbol] = RollingWindow[float](2)
             self.stoch_k_window[symbol] = RollingWindow[float](2)
             self.stoch_d_window[symbol] = RollingWindow[float](2)
-            self.stoch_k_cross_window[symbol] = RollingWindow[bool](STOCH_LOOKBACK)
-            self.stoch_d_cross_window[symbol] = RollingWindow[bool](STOCH_LOOKBACK)
+            self.stoch_k_cross_window[symbol] = RollingWindow[bool](config.stoch_lookback)
+            self.stoch_d_cross_window[symbol] = RollingWindow[bool](config.stoch_lookback)
             self.lbr_window[symbol] = RollingWindow[float](2)
             self.lbr_signal_window[symbol] = RollingWindow[float](2)
             self.mfi_window[symbol] = RollingWindow[float](2)
             self.previous_close[symbol] = None
 
-        self.indicator_signal_lists = {}
-        for symbol in self.symbols:
-            self.indicator_signal_lists[symbol] = {}
-            if ENABLE_MA:
-                self.indicator_signal_lists[symbol]["MA"] = self.ma_indicator_signals[symbol]
-            if ENABLE_STOCH:
-                self.indicator_signal_lists[symbol]["STOCH"] = self.stoch_indicator_signals[symbol]
-            if ENABLE_LBR:
-                self.indicator_signal_lists[symbol]["LBR"] = self.lbr_indicator_signals[symbol]
-            if ENABLE_MFI:
-                self.indicator_signal_lists[symbol]["MFI"] = self.mfi_indicator_signals[symbol]
-            if ENABLE_VOL:
-                self.indicator_signal_lists[symbol]["VOL"] = self.vol_indicator_signals[symbol]
-
-        self.indicator_weights = {}
-        if ENABLE_MA:
-            self.indicator_weights["MA"] = MA_WEIGHT
-        if ENABLE_STOCH:
-            self.indicator_weights["STOCH"] = STOCH_WEIGHT
-        if ENABLE_LBR:
-            self.indicator_weights["LBR"] = LBR_WEIGHT
-        if ENABLE_MFI:
-            self.indicator_weights["MFI"] = MFI_WEIGHT
-        if ENABLE_VOL:
-            self.indicator_weights["VOL"] = VOL_WEIGHT
+        if config.warm_up_mode == WarmUpMode.HISTORY:
+            for symbol in self.symbols:
+                self.warm_up_from_history(symbol)
+
+        signal_dicts = {"MA": self.ma_indicator_signals, "STOCH": self.stoch_indicator_signals, "LBR": self.lbr_indicator_signals,
+                        "MFI": self.mfi_indicator_signals, "VOL": self.vol_indicator_signals}
+        self.indicator_signal_lists = {symbol: {indicator: signal_dicts[indicator][symbol] for indicator in config.indicators}
+                                       for symbol in self.symbols}
+        # Signal lists of each symbol in config.indicators order, for calculate_net_signal_value.
+        self.signal_list_rows = {symbol: tuple(lists.values()) for symbol, lists in self.indicator_signal_lists.items()}
 
         self.trade_stats = {symbol: {} for symbol in self.symbols}
-        self.current_trades = {symbol: None for symbol in self.symbols}
+        self.lot_ledgers = {symbol: LotLedger(symbol) for symbol in self.symbols}
+        self.active_signals = []
+        if getattr(self, "execution", None) is None:
+            self.execution = InlineExecution(self)
         
         self._TrailingStopOrderTicket = {symbol: None for symbol in self.symbols}
+        self.event_log = EventLog(self.object_store, config.event_log_key, self.symbols, config.event_log_chunk_records) if config.enable_event_log else None
 
-        for symbol in self.symbols:
-            sym_str = symbol.Value
-            
-            if ENABLE_CHARTING:
-                if ENABLE_MA_CHART:
-                    ma_chart = Chart(f"{sym_str}_MA")
-                    ma_chart.add_series(Series("Buy Signal", SeriesType.SCATTER, "$", Color.GREEN, ScatterMarkerSymbol.TRIANGLE))
-                    ma_chart.add_series(Series("Sell Signal", SeriesType.SCATTER, "$", Color.RED, ScatterMarkerSymbol.TRIANGLE_DOWN))
-                    ma_chart.add_series(Series("9 Period Value", SeriesType.LINE, "$", Color.ORANGE))
-                    ma_chart.add_series(Series("20 Period Value", SeriesType.LINE, "$", Color.BLUE))
-                    self.add_chart(ma_chart)
-
-                if ENABLE_STOCH_CHART:
-                    stochrsi_chart = Chart(f"{sym_str}_STOCHRSI")
-                    stochrsi_chart.add_series(Series("Buy Signal", SeriesType.SCATTER, "$", Color.GREEN, ScatterMarkerSymbol.TRIANGLE))
-                    stochrsi_chart.add_series(Series("Sell Signal", SeriesType.SCATTER, "$", Color.RED, ScatterMarkerSymbol.TRIANGLE_DOWN))
-                    stochrsi_chart.add_series(Series("K Value", SeriesType.LINE, "$", Color.BLUE))
-                    stochrsi_chart.add_series(Series("D Value", SeriesType.LINE, "$", Color.ORANGE))
-                    self.add_chart(stochrsi_chart)
-
-                if ENABLE_LBR_CHART:
-                    lbrosc_chart = Chart(f"{sym_str}_LBROSC")
-                    lbrosc_chart.add_series(Series("Buy Signal", SeriesType.SCATTER, "$", Color.GREEN, ScatterMarkerSymbol.TRIANGLE))
-                    lbrosc_chart.add_series(Series("Sell Signal", SeriesType.SCATTER, "$", Color.RED, ScatterMarkerSymbol.TRIANGLE_DOWN))
-                    lbrosc_chart.add_series(Series("MACD Value", SeriesType.LINE, "$", Color.BLUE))
-                    lbrosc_chart.add_series(Series("MACD Signal Value", SeriesType.LINE, "$", Color.ORANGE))
-                    self.add_chart(lbrosc_chart)
-
-                if ENABLE_MFI_CHART:
-                    mfi_chart = Chart(f"{sym_str}_MFI")
-                    mfi_chart.add_series(Series("Buy Signal", SeriesType.SCATTER, "$", Color.GREEN, ScatterMarkerSymbol.TRIANGLE))
-                    mfi_chart.add_series(Series("Sell Signal", SeriesType.SCATTER, "$", Color.RED, ScatterMarkerSymbol.TRIANGLE_DOWN))
-                    mfi_chart.add_series(Series("MFI Value", SeriesType.LINE, "$", Color.PURPLE))
-                    self.add_chart(mfi_chart)
-
-                if ENABLE_VOL_CHART:
-                    volume_chart = Chart(f"{sym_str}_VOLUME")
-                    volume_chart.add_series(Series("Buy Signal", SeriesType.SCATTER, "$", Color.GREEN, ScatterMarkerSymbol.TRIANGLE))
-                    volume_chart.add_series(Series("Sell Signal", SeriesType.SCATTER, "$", Color.RED, ScatterMarkerSymbol.TRIANGLE_DOWN))
-                    volume_chart.add_series(Series("Volume", SeriesType.BAR, "$", Color.BLUE))
-                    volume_chart.add_series(Series("SMA Volume * Multiplier", SeriesType.LINE, "$", Color.RED))
-                    self.add_chart(volume_chart)
-
-                if ENABLE_TRADE_CHART:
-                    trade_chart = Chart(f"{sym_str}_TradeSignals")
-                    trade_chart.add_series(Series("Price", SeriesType.LINE, "$", Color.WHITE))
-                    trade_chart.add_series(Series("Entry", SeriesType.SCATTER, "$", Color.GREEN, ScatterMarkerSymbol.TRIANGLE))
-                    trade_chart.add_series(Series("Exit", SeriesType.SCATTER, "$", Color.RED, ScatterMarkerSymbol.TRIANGLE_DOWN))
-                    trade_chart.add_series(Series("Trailing Stop", SeriesType.SCATTER, "$", Color.ORANGE, ScatterMarkerSymbol.CIRCLE))
-                    self.add_chart(trade_chart)
+        self.chart_decimators = []
+        self.chart_handles = {symbol: SymbolCharts(symbol.Value) for symbol in self.symbols} if config.enable_charting else {}
+        span_days = (self.end_date - self.start_date).days
+        self.chart_bucket_size = chart_bucket_size(config, span_days, self.resolution)
+        self.chart_policy = ChartPolicy(config.chart_selection, self.symbols, config.chart_watchlist, config.chart_top_n)
+        self.charted_symbols = set()
+
+    def warm_up_from_history(self, symbol):
+        """Seed the symbol's indicators from history and rebuild the crossover state of the last history bars.
+
+        The crossover windows end with the indicators' current values, so the
+        first live bar is compared against the last history bar. The previous
+        close is the last history close. The K/D cross windows come from a
+        stand-alone stochastic RSI updated bar by bar over the same history
+        bars the seeded one was computed from, so they hold what a REPLAY
+        warm-up over those bars would leave. Signals of history bars are not
+        added to the signal lists.
+        """
+        config = self.config
+        if config.enable_ma:
+            self.warm_up_indicator(symbol, self.short_sma_indicators[symbol], self.resolution)
+            self.warm_up_indicator(symbol, self.long_sma_indicators[symbol], self.resolution)
+            self.moving_average_cross(symbol, self.short_sma_indicators[symbol].Current.Value, self.long_sma_indicators[symbol].Current.Value)
+        if config.enable_stoch:
+            srsi = self.srsi_indicators[symbol]
+            self.warm_up_indicator(symbol, srsi, self.resolution)
+            replica = StochasticRelativeStrengthIndex(config.stoch_period, config.stoch_period, config.stoch_smooth_k, config.stoch_smooth_d, MovingAverageType.SIMPLE)
+            for bar in self.history[TradeBar](symbol, srsi.warm_up_period, self.resolution):
+                replica.update(bar.EndTime, bar.Close)
+                self.stochrsi_cross(symbol, replica.K.Current.Value, replica.D.Current.Value)
+        if config.enable_lbr:
+            self.warm_up_indicator(symbol, self.macd_indicators[symbol], self.resolution)
+            self.lbr_cross(symbol, self.macd_indicators[symbol].Current.Value, self.macd_indicators[symbol].Signal.Current.Value)
+        if config.enable_mfi:
+            self.warm_up_indicator(symbol, self.mfi_indicators[symbol], self.resolution)
+            self.mfi_cross(symbol, self.mfi_indicators[symbol].Current.Value)
+        if config.enable_vol:
+            self.warm_up_indicator(symbol, self.sma_vol_indicators[symbol], self.resolution, Field.VOLUME)
+            last_bars = self.history[TradeBar](symbol, 1, self.resolution)
+            if last_bars:
+                self.previous_close[symbol] = last_bars[-1].Close
+
+    def checkpoint_state(self):
+        """Per-symbol state for ``local_engine.checkpoint``, as live references.
+
+        Indicators, crossover windows, signal lists, previous closes, open lots,
+        trade statistics, trailing stop order ids, chart selection PnL and the
+        event log position. Signal lists keep their last ``trigger_window`` entries
+        and the BUY/SELL counts of the rest, which is all that
+        ``calculate_net_signal_value`` and ``OnEndOfAlgorithm`` read; value
+        histories and charts start over on restore.
+        """
+        config = self.config
+        return {
+            "version": CHECKPOINT_STATE_VERSION,
+            "signature": self.checkpoint_signature(),
+            "indicators": {
+                "short_sma_indicators": self.short_sma_indicators,
+                "long_sma_indicators": self.long_sma_indicators,
+                "srsi_indicators": self.srsi_indicators,
+                "macd_indicators": self.macd_indicators,
+                "mfi_indicators": self.mfi_indicators,
+                "sma_vol_indicators": self.sma_vol_indicators,
+            },
+            "windows": {
+                "ma9_window": self.ma9_window,
+                "ma20_window": self.ma20_window,
+                "stoch_k_window": self.stoch_k_window,
+                "stoch_d_window": self.stoch_d_window,
+                "stoch_k_cross_window": self.stoch_k_cross_window,
+                "stoch_d_cross_window": self.stoch_d_cross_window,
+                "lbr_window": self.lbr_window,
+                "lbr_signal_window": self.lbr_signal_window,
+                "mfi_window": self.mfi_window,
+            },
+            "signals": {symbol: {indicator: (len(signals), signals.count("BUY"), signals.count("SELL"), signals[-config.trigger_window:])
+                                 for indicator, signals in lists.items()}
+                        for symbol, lists in self.indicator_signal_lists.items()},
+            "previous_close": self.previous_close,
+            "lot_ledgers": self.lot_ledgers,
+            "trade_stats": self.trade_stats,
+            "trailing_stop_order_ids": {symbol: ticket.OrderId for symbol, ticket in self._TrailingStopOrderTicket.items() if ticket is not None},
+            "realized_pnl": self.chart_policy.realized_pnl,
+            "chart_selected": self.chart_policy.selected,
+            "event_log": self.event_log.checkpoint_state() if self.event_log is not None else None,
+        }
+
+    def checkpoint_signature(self):
+        """Settings that shape the checkpointed state; a checkpoint only restores into the same ones."""
+        config = self.config
+        return [[symbol.Value for symbol in self.symbols], config.enable_ma, config.enable_stoch, config.enable_lbr, config.enable_mfi, config.enable_vol,
+                config.ma_fast_period, config.ma_slow_period, config.stoch_period, config.stoch_smooth_k, config.stoch_smooth_d, config.stoch_lookback, config.mfi_period,
+                config.macd_fast, config.macd_slow, config.macd_signal, config.volume_lookback, config.trigger_window]
+
+    def restore_checkpoint_state(self, state):
+        if state["version"] != CHECKPOINT_STATE_VERSION:
+            raise ValueError(f"checkpoint state version {state['version']} is not {CHECKPOINT_STATE_VERSION}")
+        if state["signature"] != self.checkpoint_signature():
+            raise ValueError("checkpoint was taken with different symbols or indicator settings")
+        # Indicators are updated in place: the engine's update callbacks hold the current objects.
+        for name, saved in state["indicators"].items():
+            indicators = getattr(self, name)
+            for symbol, indicator in saved.items():
+                indicators[symbol].__dict__.update(indicator.__dict__)
+        for name, saved in state["windows"].items():
+            getattr(self, name).update(saved)
+        for symbol, lists in state["signals"].items():
+            for indicator, (length, buys, sells, tail) in lists.items():
+                buys -= tail.count("BUY")
+                sells -= tail.count("SELL")
+                head = ["BUY"] * buys + ["SELL"] * sells + [None] * (length - len(tail) - buys - sells)
+                self.indicator_signal_lists[symbol][indicator][:] = head + tail
+        self.previous_close.update(state["previous_close"])
+        self.lot_ledgers.update(state["lot_ledgers"])
+        self.trade_stats.update(state["trade_stats"])
+        for symbol, order_id in state["trailing_stop_order_ids"].items():
+            self._TrailingStopOrderTicket[symbol] = self.transactions.get_order_ticket(order_id)
+        self.chart_policy.realized_pnl = state["realized_pnl"]
+        self.chart_policy.selected = state["chart_selected"]
+        if self.event_log is not None and state["event_log"] is not None:
+            self.event_log.restore_state(state["event_log"])
+
+    def charts_for(self, symbol):
+        """Whether ``symbol`` is charted right now; its charts are created on the first ``True``."""
+        if symbol not in self.chart_policy.selected:
+            return False
+        if symbol not in self.charted_symbols:
+            self.charted_symbols.add(symbol)
+            self._create_charts(symbol)
+        return True
+
+    def _create_charts(self, symbol):
+        config = self.config
+        handles = self.chart_handles[symbol]
+        if config.enable_ma_chart:
+            ma_chart = Chart(handles.ma)
+            ma_chart.add_series(Series("Buy Signal", SeriesType.SCATTER, "$", Color.GREEN, ScatterMarkerSymbol.TRIANGLE))
+            ma_chart.add_series(Series("Sell Signal", SeriesType.SCATTER, "$", Color.RED, ScatterMarkerSymbol.TRIANGLE_DOWN))
+            self._add_line(ma_chart, handles.ma_fast, SeriesType.LINE, Color.ORANGE)
+            self._add_line(ma_chart, handles.ma_slow, SeriesType.LINE, Color.BLUE)
+            self.add_chart(ma_chart)
+
+        if config.enable_stoch_chart:
+            stochrsi_chart = Chart(handles.stochrsi)
+            stochrsi_chart.add_series(Series("Buy Signal", SeriesType.SCATTER, "$", Color.GREEN, ScatterMarkerSymbol.TRIANGLE))
+            stochrsi_chart.add_series(Series("Sell Signal", SeriesType.SCATTER, "$", Color.RED, ScatterMarkerSymbol.TRIANGLE_DOWN))
+            self._add_line(stochrsi_chart, handles.stoch_k, SeriesType.LINE, Color.BLUE)
+            self._add_line(stochrsi_chart, handles.stoch_d, SeriesType.LINE, Color.ORANGE)
+            self.add_chart(stochrsi_chart)
+
+        if config.enable_lbr_chart:
+            lbrosc_chart = Chart(handles.lbrosc)
+            lbrosc_chart.add_series(Series("Buy Signal", SeriesType.SCATTER, "$", Color.GREEN, ScatterMarkerSymbol.TRIANGLE))
+            lbrosc_chart.add_series(Series("Sell Signal", SeriesType.SCATTER, "$", Color.RED, ScatterMarkerSymbol.TRIANGLE_DOWN))
+            self._add_line(lbrosc_chart, handles.macd, SeriesType.LINE, Color.BLUE)
+            self._add_line(lbrosc_chart, handles.macd_signal, SeriesType.LINE, Color.ORANGE)
+            self.add_chart(lbrosc_chart)
+
+        if config.enable_mfi_chart:
+            mfi_chart = Chart(handles.mfi)
+            mfi_chart.add_series(Series("Buy Signal", SeriesType.SCATTER, "$", Color.GREEN, ScatterMarkerSymbol.TRIANGLE))
+            mfi_chart.add_series(Series("Sell Signal", SeriesType.SCATTER, "$", Color.RED, ScatterMarkerSymbol.TRIANGLE_DOWN))
+            self._add_line(mfi_chart, handles.mfi_value, SeriesType.LINE, Color.PURPLE)
+            self.add_chart(mfi_chart)
+
+        if config.enable_vol_chart:
+            volume_chart = Chart(handles.volume)
+            volume_chart.add_series(Series("Buy Signal", SeriesType.SCATTER, "$", Color.GREEN, ScatterMarkerSymbol.TRIANGLE))
+            volume_chart.add_series(Series("Sell Signal", SeriesType.SCATTER, "$", Color.RED, ScatterMarkerSymbol.TRIANGLE_DOWN))
+            self._add_line(volume_chart, handles.volume_bar, SeriesType.BAR, Color.BLUE)
+            self._add_line(volume_chart, handles.volume_threshold, SeriesType.LINE, Color.RED)
+            self.add_chart(volume_chart)
+
+        if config.enable_trade_chart:
+            trade_chart = Chart(handles.trade)
+            self._add_line(trade_chart, handles.price, SeriesType.LINE, Color.WHITE)
+            trade_chart.add_series(Series("Entry", SeriesType.SCATTER, "$", Color.GREEN, ScatterMarkerSymbol.TRIANGLE))
+            trade_chart.add_series(Series("Exit", SeriesType.SCATTER, "$", Color.RED, ScatterMarkerSymbol.TRIANGLE_DOWN))
+            trade_chart.add_series(Series("Trailing Stop", SeriesType.SCATTER, "$", Color.ORANGE, ScatterMarkerSymbol.CIRCLE))
+            self.add_chart(trade_chart)
+
+    def _add_line(self, chart, target, series_type, color):
+        series = Series(target.series, series_type, "$", color)
+        chart.add_series(series)
+        if self.chart_bucket_size > 1:
+            plot = lambda value, chart=target.chart, name=target.series: self.plot(chart, name, value)
+            target.decimator = SeriesDecimator(plot, self.config.chart_decimation, self.chart_bucket_size)
+            self.chart_decimators.append(target.decimator)
+
+    def plot_line(self, target, value):
+        """``plot`` for line/bar series; goes through the series' decimator when it has one."""
+        decimator = target.decimator
+        if decimator is None:
+            self.plot(target.chart, target.series, value)
+        else:
+            decimator.add(value)
 
     def OnData(self, data):
+        config = self.config
+        for report in self.execution.drain_reports():
+            self.on_execution_report(report)
+
+        if self.is_warming_up:
+            self.warm_up_data(data)
+            return
+
         for symbol in self.symbols:
             if symbol not in data.Bars:
                 continue
 
             bar = data.Bars[symbol]
-            if ENABLE_CHARTING and ENABLE_TRADE_CHART:
-                self.plot(f"{symbol.Value}_TradeSignals", "Price", bar.Close)
+            if config.enable_charting and config.enable_trade_chart and self.charts_for(symbol):
+                self.plot_line(self.chart_handles[symbol].price, bar.Close)
 
-            if ENABLE_MA:
+            if config.enable_ma:
                 self.check_moving_average_crossovers(symbol, bar)
-            if ENABLE_STOCH:
+            if config.enable_stoch:
                 self.check_stochrsi_crossovers(symbol, bar)
-            if ENABLE_LBR:
+            if config.enable_lbr:
                 self.check_lbr_crossovers(symbol, bar)
-            if ENABLE_MFI:
+            if config.enable_mfi:
                 self.check_mfi_crossovers(symbol, bar)
-            if ENABLE_VOL:
+            if config.enable_vol:
                 self.check_volume_spikes(symbol, bar)
 
-            if not self.is_warming_up:
-                net_signal = self.calculate_net_signal_value(symbol)
-                
-                if SIGNAL_CALCULATION_MODE == SignalMode.WEIGHTED:
-                    entry_threshold = WEIGHTED_SCORE_THRESHOLD
-                    exit_threshold = -WEIGHTED_SCORE_THRESHOLD
-                else: # COUNT
-                    entry_threshold = REQUIRED_ENTRY_SIGNALS
-                    exit_threshold = -REQUIRED_EXIT_SIGNALS
-
-                if net_signal >= entry_threshold:
-                    if self.portfolio[symbol].quantity < 0:
-                        self.liquidate(symbol)
-                        if self._TrailingStopOrderTicket[symbol] is not None:
-                            self._TrailingStopOrderTicket[symbol].cancel("canceled TrailingStopOrder")
-                        self.set_holdings(symbol, FIRST_TRADE_ALLOCATION)
-                        self.debug(f"Liquidated short position and entered long on {symbol} for Net Signal {net_signal}. Active signals: {self.active_signals}")
-                        if ENABLE_TRAILING_STOPS:
-                            self._TrailingStopOrderTicket[symbol] = self.trailing_stop_order(symbol, -self.portfolio[symbol].quantity, TRAILING_STOP_PERCENT, True)
-                    else:
-                        if not self.portfolio[symbol].invested:
-                            self.set_holdings(symbol, FIRST_TRADE_ALLOCATION)
-                            self.debug(f"Entered long trade on {symbol} for Net Signal {net_signal}. Active signals: {self.active_signals}")
-                            if ENABLE_TRAILING_STOPS:
-                                self._TrailingStopOrderTicket[symbol] = self.trailing_stop_order(symbol, -self.portfolio[symbol].quantity, TRAILING_STOP_PERCENT, True)
-                        else:
-                            current_weight = self.portfolio[symbol].holdings_value / self.portfolio.total_portfolio_value
-                            new_target = min(current_weight + REPEAT_TRADE_ALLOCATION, MAX_ALLOCATION_PER_SYMBOL)
-                            self.set_holdings(symbol, new_target)
-                            self.debug(f"Increased long position on {symbol} to {new_target:.2f} for Net Signal {net_signal}. Active signals: {self.active_signals}")
-                    
-                    if self.current_trades[symbol] is None or self.portfolio[symbol].quantity > 0:
-                        combo_key = ", ".join(sorted(self.active_signals)) if self.active_signals else "NO_SIGNAL"
-                        self.current_trades[symbol] = {
-                            "entry_time": self.time,
-                            "entry_price": self.securities[symbol].price,
-                            "quantity": self.portfolio[symbol].quantity,
-                            "active_signals": combo_key
-                        }
-                
-                elif net_signal <= exit_threshold:
-                    if self.portfolio[symbol].quantity > 0:
-                        self.liquidate(symbol)
-                        if self._TrailingStopOrderTicket[symbol] is not None:
-                            self._TrailingStopOrderTicket[symbol].cancel("canceled TrailingStopOrder")
-                        self.set_holdings(symbol, -FIRST_TRADE_ALLOCATION)
-                        self.debug(f"Liquidated long position and entered short on {symbol} for Net Signal {net_signal}. Active signals: {self.active_signals}")
-                        if ENABLE_TRAILING_STOPS:
-                            self._TrailingStopOrderTicket[symbol] = self.trailing_stop_order(symbol, -self.portfolio[symbol].quantity, TRAILING_STOP_PERCENT, True)
-                    else:
-                        if not self.portfolio[symbol].invested:
-                            self.set_holdings(symbol, -FIRST_TRADE_ALLOCATION)
-                            self.debug(f"Entered short trade on {symbol} for Net Signal {net_signal}. Active signals: {self.active_signals}")
-                            if ENABLE_TRAILING_STOPS:
-                                self._TrailingStopOrderTicket[symbol] = self.trailing_stop_order(symbol, -self.portfolio[symbol].quantity, TRAILING_STOP_PERCENT, True)
-                        else:
-                            current_weight = self.portfolio[symbol].holdings_value / self.portfolio.total_portfolio_value
-                            new_target = max(current_weight - REPEAT_TRADE_ALLOCATION, -1.0)
-                            self.set_holdings(symbol, new_target)
-                            self.debug(f"Increased short position on {symbol} to {new_target:.2f} for Net Signal {net_signal}. Active signals: {self.active_signals}")
-                    
-                    
-                    if self.current_trades[symbol] is None or self.portfolio[symbol].quantity < 0:
-                        combo_key = ", ".join(sorted(self.active_signals)) if self.active_signals else "NO_SIGNAL"
-                        self.current_trades[symbol] = {
-                            "entry_time": self.time,
-                            "entry_price": self.securities[symbol].price,
-                            "quantity": self.portfolio[symbol].quantity,
-                            "active_signals": combo_key
-                        }
+            net_signal = self.calculate_net_signal_value(symbol)
+
+            if net_signal >= config.entry_threshold:
+                self.execution.submit(OrderIntent(symbol, 1, net_signal, self.active_signals))
+            elif net_signal <= config.exit_threshold:
+                self.execution.submit(OrderIntent(symbol, -1, net_signal, self.active_signals))
+
+    def warm_up_data(self, data):
+        """Warm-up fast path: the crossover windows and signal lists the first live bars read, nothing else.
+
+        Indicators are already updated by their subscriptions. The full ``check_*`` methods
+        additionally record value histories and plot, which only matters once trading starts.
+        """
+        config = self.config
+        bars = data.Bars
+        for symbol in self.symbols:
+            if symbol not in bars:
+                continue
+            bar = bars[symbol]
+            if config.enable_ma:
+                self.warm_up_moving_averages(symbol)
+            if config.enable_stoch:
+                self.warm_up_stochrsi(symbol)
+            if config.enable_lbr:
+                self.warm_up_lbr(symbol)
+            if config.enable_mfi:
+                self.warm_up_mfi(symbol)
+            if config.enable_vol:
+                self.warm_up_volume(symbol, bar)
+
+    def warm_up_moving_averages(self, symbol):
+        self.ma_indicator_signals[symbol].append(self.moving_average_cross(
+            symbol, self.short_sma_indicators[symbol].Current.Value, self.long_sma_indicators[symbol].Current.Value))
+
+    def warm_up_stochrsi(self, symbol):
+        srsi = self.srsi_indicators[symbol]
+        self.stoch_indicator_signals[symbol].append(self.stochrsi_cross(symbol, srsi.K.Current.Value, srsi.D.Current.Value)[0])
+
+    def warm_up_lbr(self, symbol):
+        macd = self.macd_indicators[symbol]
+        self.lbr_indicator_signals[symbol].append(self.lbr_cross(symbol, macd.Current.Value, macd.Signal.Current.Value))
+
+    def warm_up_mfi(self, symbol):
+        self.mfi_indicator_signals[symbol].append(self.mfi_cross(symbol, self.mfi_indicators[symbol].Current.Value))
+
+    def warm_up_volume(self, symbol, bar):
+        previous_close = self.previous_close[symbol]
+        self.previous_close[symbol] = bar.Close
+        if previous_close is None:
+            return
+        if bar.Volume > self.config.volume_spike_multiplier * self.sma_vol_indicators[symbol].Current.Value:
+            price_change = bar.Close - previous_close
+            if price_change > 0:
+                self.vol_indicator_signals[symbol].append("BUY")
+            elif price_change < 0:
+                self.vol_indicator_signals[symbol].append("SELL")
+        else:
+            self.vol_indicator_signals[symbol].append(None)
+
+    def execute_intent(self, intent):
+        config = self.config
+        symbol = intent.symbol
+        report = ExecutionReport(intent)
+        place_trailing_stop = False
+        if intent.direction > 0:
+            if self.portfolio[symbol].quantity < 0:
+                self.liquidate(symbol)
+                if self._TrailingStopOrderTicket[symbol] is not None:
+                    self._TrailingStopOrderTicket[symbol].cancel("canceled TrailingStopOrder")
+                self.set_holdings(symbol, config.first_trade_allocation, tag=intent.combo_key)
+                report.action, report.target = "FLIP", config.first_trade_allocation
+                place_trailing_stop = True
+            elif not self.portfolio[symbol].invested:
+                self.set_holdings(symbol, config.first_trade_allocation, tag=intent.combo_key)
+                report.action, report.target = "ENTER", config.first_trade_allocation
+                place_trailing_stop = True
+            else:
+                current_weight = self.portfolio[symbol].holdings_value / self.portfolio.total_portfolio_value
+                new_target = min(current_weight + config.repeat_trade_allocation, config.max_allocation_per_symbol)
+                self.set_holdings(symbol, new_target, tag=intent.combo_key)
+                report.action, report.target = "INCREASE", new_target
+        else:
+            if self.portfolio[symbol].quantity > 0:
+                self.liquidate(symbol)
+                if self._TrailingStopOrderTicket[symbol] is not None:
+                    self._TrailingStopOrderTicket[symbol].cancel("canceled TrailingStopOrder")
+                self.set_holdings(symbol, -config.first_trade_allocation, tag=intent.combo_key)
+                report.action, report.target = "FLIP", -config.first_trade_allocation
+                place_trailing_stop = True
+            elif not self.portfolio[symbol].invested:
+                self.set_holdings(symbol, -config.first_trade_allocation, tag=intent.combo_key)
+                report.action, report.target = "ENTER", -config.first_trade_allocation
+                place_trailing_stop = True
+            else:
+                current_weight = self.portfolio[symbol].holdings_value / self.portfolio.total_portfolio_value
+                new_target = max(current_weight - config.repeat_trade_allocation, -1.0)
+                self.set_holdings(symbol, new_target, tag=intent.combo_key)
+                report.action, report.target = "INCREASE", new_target
+
+        if place_trailing_stop and config.enable_trailing_stops:
+            self._TrailingStopOrderTicket[symbol] = self.trailing_stop_order(symbol, -self.portfolio[symbol].quantity, config.trailing_stop_percent, True, tag=intent.combo_key)
+        return report
+
+    def on_execution_report(self, report):
+        intent = report.intent
+        if self.event_log is not None:
+            if report.status != ExecutionReport.DONE:
+                event_type = EventType.REJECTED if report.status == ExecutionReport.REJECTED else EventType.FAILED
+            else:
+                event_type = EventType.FLIP if report.action == "FLIP" else EventType.ENTER if report.action == "ENTER" else EventType.INCREASE
+            self.event_log.write(self.time, intent.symbol, event_type, intent.net_signal, self.event_log.combo_mask(intent.combo_key),
+                                 self.securities[intent.symbol].price, self.portfolio[intent.symbol].quantity)
+            return
+        side, other_side = ("long", "short") if intent.direction > 0 else ("short", "long")
+        if report.status != ExecutionReport.DONE:
+            self.debug(f"Order intent {side} on {intent.symbol} for Net Signal {intent.net_signal} was {report.status.lower()}: {report.message}")
+        elif report.action == "FLIP":
+            self.debug(f"Liquidated {other_side} position and entered {side} on {intent.symbol} for Net Signal {intent.net_signal}. Active signals: {intent.active_signals}")
+        elif report.action == "ENTER":
+            self.debug(f"Entered {side} trade on {intent.symbol} for Net Signal {intent.net_signal}. Active signals: {intent.active_signals}")
+        else:
+            self.debug(f"Increased {side} position on {intent.symbol} to {report.target:.2f} for Net Signal {intent.net_signal}. Active signals: {intent.active_signals}")
+
+    # Crossover detection shared by the warm-up fast path and the live checks: each helper adds the
+    # newest values to the symbol's windows and returns the signal they give.
+
+    def moving_average_cross(self, symbol, fast, slow):
+        self.ma9_window[symbol].add(fast)
+        self.ma20_window[symbol].add(slow)
+        return line_cross(self.ma9_window[symbol], self.ma20_window[symbol])
+
+    def stochrsi_cross(self, symbol, k_value, d_value):
+        """``(signal, value)``: a D cross wins over a K cross, and either only counts after a K cross within ``stoch_lookback`` bars."""
+        config = self.config
+        k, d = self.stoch_k_window[symbol], self.stoch_d_window[symbol]
+        k.add(k_value)
+        d.add(d_value)
+        k_signal = level_cross(k, config.stoch_lower, config.stoch_upper)
+        d_signal = level_cross(d, config.stoch_lower, config.stoch_upper)
+        k_crosses = self.stoch_k_cross_window[symbol]
+        k_crosses.add(k_signal is not None)
+        self.stoch_d_cross_window[symbol].add(d_signal is not None)
+        if True in k_crosses:
+            if d_signal is not None:
+                return d_signal, d_value
+            if k_signal is not None:
+                return k_signal, k_value
+        return None, None
+
+    def lbr_cross(self, symbol, macd_value, signal_value):
+        self.lbr_window[symbol].add(macd_value)
+        self.lbr_signal_window[symbol].add(signal_value)
+        return line_cross(self.lbr_window[symbol], self.lbr_signal_window[symbol])
+
+    def mfi_cross(self, symbol, value):
+        self.mfi_window[symbol].add(value)
+        return level_cross(self.mfi_window[symbol], self.config.mfi_lower, self.config.mfi_upper)
 
     def check_moving_average_crossovers(self, symbol, bar):
+        config = self.config
+        charted = config.enable_charting and config.enable_ma_chart and self.charts_for(symbol)
+        handles = self.chart_handles[symbol] if charted else None
         short_sma = self.short_sma_indicators[symbol].Current.Value
         long_sma = self.long_sma_indicators[symbol].Current.Value
-        self.ma9_window[symbol].add(short_sma)
-        self.ma20_window[symbol].add(long_sma)
+        signal = self.moving_average_cross(symbol, short_sma, long_sma)
 
         self.ma9_values[symbol].append(short_sma)
-        if ENABLE_CHARTING and ENABLE_MA_CHART:
-            self.plot(f"{symbol.Value}_MA", "9 Period Value", short_sma)
+        if charted:
+            self.plot_line(handles.ma_fast, short_sma)
         self.ma20_values[symbol].append(long_sma)
-        if ENABLE_CHARTING and ENABLE_MA_CHART:
-            self.plot(f"{symbol.Value}_MA", "20 Period Value", long_sma)
-
-        signal = None
-        if self.ma9_window[symbol][0] > self.ma20_window[symbol][0] and self.ma9_window[symbol][1] < self.ma20_window[symbol][1]:
-            signal = "BUY"
-        elif self.ma9_window[symbol][0] < self.ma20_window[symbol][0] and self.ma9_window[symbol][1] > self.ma20_window[symbol][1]:
-            signal = "SELL"
-        
+        if charted:
+            self.plot_line(handles.ma_slow, long_sma)
+
         self.ma_indicator_signals[symbol].append(signal)
-        if signal and ENABLE_CHARTING and ENABLE_MA_CHART:
-            self.plot(f"{symbol.Value}_MA", f"{signal.capitalize()} Signal", short_sma)
+        if signal and charted:
+            self.plot(handles.ma, SIGNAL_SERIES[signal], short_sma)
 
     def check_stochrsi_crossovers(self, symbol, bar):
-        self.stoch_k_window[symbol].add(self.srsi_indicators[symbol].K.Current.Value)
-        self.stoch_d_window[symbol].add(self.srsi_indicators[symbol].D.Current.Value)
-
-        self.stoch_k_values[symbol].append(self.srsi_indicators[symbol].K.Current.Value)
-        if ENABLE_CHARTING and ENABLE_STOCH_CHART:
-            self.plot(f"{symbol.Value}_STOCHRSI", "K Value", self.srsi_indicators[symbol].K.Current.Value)
-        self.stoch_d_values[symbol].append(self.srsi_indicators[symbol].D.Current.Value)
-        if ENABLE_CHARTING and ENABLE_STOCH_CHART:
-            self.plot(f"{symbol.Value}_STOCHRSI", "D Value", self.srsi_indicators[symbol].D.Current.Value)
-
-        k_buy = k_sell = d_buy = d_sell = False
-
-        if self.stoch_k_window[symbol][0] > 20 and self.stoch_k_window[symbol][1] < 20:
-            self.stoch_k_cross_window[symbol].add(True)
-            k_buy = True
-        elif self.stoch_k_window[symbol][0] < 80 and self.stoch_k_window[symbol][1] > 80:
-            self.stoch_k_cross_window[symbol].add(True)
-            k_sell = True
-        else:
-            self.stoch_k_cross_window[symbol].add(False)
-
-        if self.stoch_d_window[symbol][0] > 20 and self.stoch_d_window[symbol][1] < 20:
-            self.stoch_d_cross_window[symbol].add(True)
-            d_buy = True
-        elif self.stoch_d_window[symbol][0] < 80 and self.stoch_d_window[symbol][1] > 80:
-            self.stoch_d_cross_window[symbol].add(True)
-            d_sell = True
-        else:
-            self.stoch_d_cross_window[symbol].add(False)
-
-        if d_buy and True in self.stoch_k_cross_window[symbol]:
-            self.stoch_indicator_signals[symbol].append("BUY")
-            if ENABLE_CHARTING and ENABLE_STOCH_CHART:
-                self.plot(f"{symbol.Value}_STOCHRSI", "Buy Signal", self.srsi_indicators[symbol].D.Current.Value)
-        elif d_sell and True in self.stoch_k_cross_window[symbol]:
-            self.stoch_indicator_signals[symbol].append("SELL")
-            if ENABLE_CHARTING and ENABLE_STOCH_CHART:
-                self.plot(f"{symbol.Value}_STOCHRSI", "Sell Signal", self.srsi_indicators[symbol].D.Current.Value)
-        elif k_buy and True in self.stoch_k_cross_window[symbol]:
-            self.stoch_indicator_signals[symbol].append("BUY")
-            if ENABLE_CHARTING and ENABLE_STOCH_CHART:
-                self.plot(f"{symbol.Value}_STOCHRSI", "Buy Signal", self.srsi_indicators[symbol].K.Current.Value)
-        elif k_sell and True in self.stoch_k_cross_window[symbol]:
-            self.stoch_indicator_signals[symbol].append("SELL")
-            if ENABLE_CHARTING and ENABLE_STOCH_CHART:
-                self.plot(f"{symbol.Value}_STOCHRSI", "Sell Signal", self.srsi_indicators[symbol].K.Current.Value)
-        else:
-            self.stoch_indicator_signals[symbol].append(None)
+        config = self.config
+        charted = config.enable_charting and config.enable_stoch_chart and self.charts_for(symbol)
+        handles = self.chart_handles[symbol] if charted else None
+        k_value = self.srsi_indicators[symbol].K.Current.Value
+        d_value = self.srsi_indicators[symbol].D.Current.Value
+        signal, signal_value = self.stochrsi_cross(symbol, k_value, d_value)
+
+        self.stoch_k_values[symbol].append(k_value)
+        if charted:
+            self.plot_line(handles.stoch_k, k_value)
+        self.stoch_d_values[symbol].append(d_value)
+        if charted:
+            self.plot_line(handles.stoch_d, d_value)
+
+        self.stoch_indicator_signals[symbol].append(signal)
+        if signal and charted:
+            self.plot(handles.stochrsi, SIGNAL_SERIES[signal], signal_value)
 
     def check_lbr_crossovers(self, symbol, bar):
+        config = self.config
+        charted = config.enable_charting and config.enable_lbr_chart and self.charts_for(symbol)
+        handles = self.chart_handles[symbol] if charted else None
         macd_val = self.macd_indicators[symbol].Current.Value
         signal_val = self.macd_indicators[symbol].Signal.Current.Value
-        self.lbr_window[symbol].add(macd_val)
-        self.lbr_signal_window[symbol].add(signal_val)
+        signal = self.lbr_cross(symbol, macd_val, signal_val)
 
         self.lbr_values[symbol].append(macd_val)
-        if ENABLE_CHARTING and ENABLE_LBR_CHART:
-            self.plot(f"{symbol.Value}_LBROSC", "MACD Value", macd_val)
+        if charted:
+            self.plot_line(handles.macd, macd_val)
         self.lbr_signal_values[symbol].append(signal_val)
-        if ENABLE_CHARTING and ENABLE_LBR_CHART:
-            self.plot(f"{symbol.Value}_LBROSC", "MACD Signal Value", signal_val)
-
-        signal = None
-        if self.lbr_window[symbol][0] > self.lbr_signal_window[symbol][0] and self.lbr_window[symbol][1] < self.lbr_signal_window[symbol][1]:
-            signal = "BUY"
-        elif self.lbr_window[symbol][0] < self.lbr_signal_window[symbol][0] and self.lbr_window[symbol][1] > self.lbr_signal_window[symbol][1]:
-            signal = "SELL"
+        if charted:
+            self.plot_line(handles.macd_signal, signal_val)
 
         self.lbr_indicator_signals[symbol].append(signal)
-        if signal and ENABLE_CHARTING and ENABLE_LBR_CHART:
-            self.plot(f"{symbol.Value}_LBROSC", f"{signal.capitalize()} Signal", signal_val)
+        if signal and charted:
+            self.plot(handles.lbrosc, SIGNAL_SERIES[signal], signal_val)
 
     def check_mfi_crossovers(self, symbol, bar):
-        self.mfi_window[symbol].add(self.mfi_indicators[symbol].Current.Value)
-        self.mfi_values[symbol].append(self.mfi_indicators[symbol].Current.Value)
-        if ENABLE_CHARTING and ENABLE_MFI_CHART:
-            self.plot(f"{symbol.Value}_MFI", "MFI Value", self.mfi_indicators[symbol].Current.Value)
-
-        if self.mfi_window[symbol][0] > 20 and self.mfi_window[symbol][1] < 20:
-            self.mfi_indicator_signals[symbol].append("BUY")
-            if ENABLE_CHARTING and ENABLE_MFI_CHART:
-                self.plot(f"{symbol.Value}_MFI", "Buy Signal", self.mfi_indicators[symbol].Current.Value)
-        elif self.mfi_window[symbol][0] < 80 and self.mfi_window[symbol][1] > 80:
-            self.mfi_indicator_signals[symbol].append("SELL")
-            if ENABLE_CHARTING and ENABLE_MFI_CHART:
-                self.plot(f"{symbol.Value}_MFI", "Sell Signal", self.mfi_indicators[symbol].Current.Value)
-        else:
-            self.mfi_indicator_signals[symbol].append(None)
+        config = self.config
+        charted = config.enable_charting and config.enable_mfi_chart and self.charts_for(symbol)
+        handles = self.chart_handles[symbol] if charted else None
+        mfi_value = self.mfi_indicators[symbol].Current.Value
+        signal = self.mfi_cross(symbol, mfi_value)
+        self.mfi_values[symbol].append(mfi_value)
+        if charted:
+            self.plot_line(handles.mfi_value, mfi_value)
+
+        self.mfi_indicator_signals[symbol].append(signal)
+        if signal and charted:
+            self.plot(handles.mfi, SIGNAL_SERIES[signal], mfi_value)
 
     def check_volume_spikes(self, symbol, bar):
+        config = self.config
         if bar is None:
             return
 
@@ -445,55 +1141,54 @@ class HighCapMultiIndicatorStrategy(QCAlgorithm):
             return
 
         price_change = bar.Close - self.previous_close[symbol]
+        charted = config.enable_charting and config.enable_vol_chart and self.charts_for(symbol)
+        handles = self.chart_handles[symbol] if charted else None
 
         self.vol_values[symbol].append(bar.Volume)
-        if ENABLE_CHARTING and ENABLE_VOL_CHART:
-            self.plot(f"{symbol.Value}_VOLUME", "Volume", bar.Volume)
+        if charted:
+            self.plot_line(handles.volume_bar, bar.Volume)
 
         self.vol_sma_values[symbol].append(self.sma_vol_indicators[symbol].Current.Value)
-        sma_vol_multiplier = self.sma_vol_indicators[symbol].Current.Value * VOLUME_SPIKE_MULTIPLIER
-        if ENABLE_CHARTING and ENABLE_VOL_CHART:
-            self.plot(f"{symbol.Value}_VOLUME", "SMA Volume * Multiplier", sma_vol_multiplier)
+        sma_vol_multiplier = self.sma_vol_indicators[symbol].Current.Value * config.volume_spike_multiplier
+        if charted:
+            self.plot_line(handles.volume_threshold, sma_vol_multiplier)
 
-        if bar.Volume > VOLUME_SPIKE_MULTIPLIER * self.sma_vol_indicators[symbol].Current.Value:
+        if bar.Volume > config.volume_spike_multiplier * self.sma_vol_indicators[symbol].Current.Value:
             if price_change > 0:
                 self.vol_indicator_signals[symbol].append("BUY")
-                if ENABLE_CHARTING and ENABLE_VOL_CHART:
-                    self.plot(f"{symbol.Value}_VOLUME", "Buy Signal", bar.Volume)
+                if charted:
+                    self.plot(handles.volume, "Buy Signal", bar.Volume)
             elif price_change < 0:
                 self.vol_indicator_signals[symbol].append("SELL")
-                if ENABLE_CHARTING and ENABLE_VOL_CHART:
-                    self.plot(f"{symbol.Value}_VOLUME", "Sell Signal", bar.Volume)
+                if charted:
+                    self.plot(handles.volume, "Sell Signal", bar.Volume)
         else:
             self.vol_indicator_signals[symbol].append(None)
 
         self.previous_close[symbol] = bar.Close
 
     def calculate_net_signal_value(self, symbol):
+        config = self.config
+        trigger_window = config.trigger_window
         net_signal = 0.0
         active_signals = []
-        for indicator, signals in self.indicator_signal_lists[symbol].items():
-            for i in range(TRIGGER_WINDOW):
+        for indicator, weight, signals in zip(config.indicators, config.signal_weights, self.signal_list_rows[symbol]):
+            for i in range(trigger_window):
                 signal = signals[-(i+1)]
                 if signal == "BUY":
-                    if SIGNAL_CALCULATION_MODE == SignalMode.WEIGHTED:
-                        net_signal += self.indicator_weights[indicator]
-                    else: # COUNT
-                        net_signal += 1
+                    net_signal += weight
                     active_signals.append(f"{indicator}:BUY")
                     break
                 elif signal == "SELL":
-                    if SIGNAL_CALCULATION_MODE == SignalMode.WEIGHTED:
-                        net_signal -= self.indicator_weights[indicator]
-                    else: # COUNT
-                        net_signal -= 1
+                    net_signal -= weight
                     active_signals.append(f"{indicator}:SELL")
                     break
         self.active_signals = active_signals
         return net_signal
 
     def OnOrderEvent(self, orderEvent):
-        if orderEvent.Status != OrderStatus.FILLED:
+        config = self.config
+        if orderEvent.Status != OrderStatus.FILLED and orderEvent.Status != OrderStatus.PARTIALLY_FILLED:
             return
 
         symbol = orderEvent.Symbol
@@ -501,78 +1196,72 @@ class HighCapMultiIndicatorStrategy(QCAlgorithm):
         
         is_trailing_stop = order.type == OrderType.TRAILING_STOP
         
-        if orderEvent.Direction == OrderDirection.BUY:
-            if self.current_trades[symbol] is None:
-                combo_key = ", ".join(sorted(self.active_signals)) if self.active_signals else "NO_SIGNAL"
-                self.current_trades[symbol] = {
-                    "entry_time": self.time,
-                    "entry_price": orderEvent.FillPrice,
-                    "quantity": orderEvent.FillQuantity,
-                    "active_signals": combo_key
-                }
-            
-            if ENABLE_CHARTING and ENABLE_TRADE_CHART:
-                if is_trailing_stop:
-                    self.plot(f"{symbol.Value}_TradeSignals", "Trailing Stop", orderEvent.FillPrice)
-                    self.debug(f"Trailing stop buy triggered at {orderEvent.FillPrice} for {symbol}")
-                else:
-                    self.plot(f"{symbol.Value}_TradeSignals", "Entry", orderEvent.FillPrice)
-                
-        elif orderEvent.Direction == OrderDirection.SELL:
-            if ENABLE_CHARTING and ENABLE_TRADE_CHART:
-                if is_trailing_stop:
-                    self.plot(f"{symbol.Value}_TradeSignals", "Trailing Stop", orderEvent.FillPrice)
-                    self.debug(f"Trailing stop sell triggered at {orderEvent.FillPrice} for {symbol}")
-                else:
-                    self.plot(f"{symbol.Value}_TradeSignals", "Exit", orderEvent.FillPrice)
-                
-            if self.current_trades[symbol] is not None:
-                exit_price = orderEvent.FillPrice
-                entry_price = self.current_trades[symbol]["entry_price"]
-                quantity = self.current_trades[symbol]["quantity"]
-                base_value = entry_price * quantity
-                trade_return = 0 if base_value == 0 else ((exit_price * quantity) - base_value) / base_value * 100
-                pnl = (exit_price * quantity) - (entry_price * quantity)
-                trade_key = self.current_trades[symbol]["active_signals"] if self.current_trades[symbol]["active_signals"] else "NO_SIGNAL"
-                
-                if trade_key not in self.trade_stats[symbol]:
-                    self.trade_stats[symbol][trade_key] = {
-                        "count": 0,
-                        "wins": 0,
-                        "total_return": 0.0,
-                        "total_pnl": 0.0,
-                        "total_duration": 0.0,
-                        "returns": [],
-                        "max_return": None,
-                        "min_return": None,
-                        "trailing_stop_exits": 0
-                    }
-                
-                stats = self.trade_stats[symbol][trade_key]
-                stats["count"] += 1
-                if trade_return > 0:
-                    stats["wins"] += 1
-                stats["total_return"] += trade_return
-                stats["total_pnl"] += pnl
-                duration = (self.time - self.current_trades[symbol]["entry_time"]).total_seconds() / 3600.0
-                stats["total_duration"] += duration
-                stats["returns"].append(trade_return)
-                
-                if is_trailing_stop:
-                    stats["trailing_stop_exits"] += 1
-                    
-                stats["max_return"] = trade_return if stats["max_return"] is None or trade_return > stats["max_return"] else stats["max_return"]
-                stats["min_return"] = trade_return if stats["min_return"] is None or trade_return < stats["min_return"] else stats["min_return"]
-                
-                self.current_trades[symbol] = None
+        if config.enable_charting and config.enable_trade_chart:
+            charted = self.charts_for(symbol)
+            direction = "BUY" if orderEvent.Direction == OrderDirection.BUY else "SELL"
+            if is_trailing_stop:
+                if charted:
+                    self.plot(self.chart_handles[symbol].trade, "Trailing Stop", orderEvent.FillPrice)
+                if self.event_log is None:
+                    self.debug(f"Trailing stop {direction.lower()} triggered at {orderEvent.FillPrice} for {symbol}")
+            elif charted:
+                self.plot(self.chart_handles[symbol].trade, TRADE_SERIES[direction], orderEvent.FillPrice)
+
+        combo_key = order.tag if order.tag else "NO_SIGNAL"
+        self.lot_ledgers[symbol].apply_fill(orderEvent.FillQuantity, orderEvent.FillPrice, self.time, combo_key, self._record_closed_lot, is_trailing_stop)
 
-        if is_trailing_stop and symbol in self._TrailingStopOrderTicket:
+        if is_trailing_stop and orderEvent.Status == OrderStatus.FILLED and symbol in self._TrailingStopOrderTicket:
             if self._TrailingStopOrderTicket[symbol] is not None and self._TrailingStopOrderTicket[symbol].OrderId == orderEvent.OrderId:
                 self._TrailingStopOrderTicket[symbol] = None
 
-        self.debug(f"Order filled for {symbol} at {orderEvent.FillPrice} as a {orderEvent.Direction} order. Order type: {order.type}")
+        if self.event_log is not None:
+            self.event_log.write(self.time, symbol, EventType.TRAILING_STOP_FILL if is_trailing_stop else EventType.FILL, 0.0,
+                                 self.event_log.combo_mask(combo_key), orderEvent.FillPrice, orderEvent.FillQuantity)
+        else:
+            self.debug(f"Order filled for {symbol} at {orderEvent.FillPrice} as a {orderEvent.Direction} order. Order type: {order.type}")
+
+    def _record_closed_lot(self, symbol, lot, closed_quantity, exit_price, exit_time, is_trailing_stop):
+        entry_price = lot.entry_price
+        pnl = (exit_price - entry_price) * closed_quantity
+        base_value = abs(entry_price * closed_quantity)
+        trade_return = 0 if base_value == 0 else pnl / base_value * 100
+        trade_key = lot.active_signals if lot.active_signals else "NO_SIGNAL"
+        self.chart_policy.record_pnl(symbol, pnl)
+
+        if trade_key not in self.trade_stats[symbol]:
+            self.trade_stats[symbol][trade_key] = {
+                "count": 0,
+                "wins": 0,
+                "total_return": 0.0,
+                "total_pnl": 0.0,
+                "total_duration": 0.0,
+                "returns": [],
+                "max_return": None,
+                "min_return": None,
+                "trailing_stop_exits": 0
+            }
+
+        stats = self.trade_stats[symbol][trade_key]
+        stats["count"] += 1
+        if trade_return > 0:
+            stats["wins"] += 1
+        stats["total_return"] += trade_return
+        stats["total_pnl"] += pnl
+        duration = (exit_time - lot.entry_time).total_seconds() / 3600.0
+        stats["total_duration"] += duration
+        stats["returns"].append(trade_return)
+
+        if is_trailing_stop:
+            stats["trailing_stop_exits"] += 1
+
+        stats["max_return"] = trade_return if stats["max_return"] is None or trade_return > stats["max_return"] else stats["max_return"]
+        stats["min_return"] = trade_return if stats["min_return"] is None or trade_return < stats["min_return"] else stats["min_return"]
 
     def OnEndOfAlgorithm(self):
+        if self.event_log is not None:
+            self.event_log.flush()
+        for decimator in self.chart_decimators:
+            decimator.flush()
         for symbol in self.symbols:
             for key, signals in self.indicator_signal_lists[symbol].items():
                 buy_count = signals.count("BUY")